@@ -25,12 +25,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "sample_app.metrics.metrics_middleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django_htmx.middleware.HtmxMiddleware",
+    "sample_app.run_queues.run_origin_middleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "sample_app.admission.AdmissionMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django.middleware.csp.ContentSecurityPolicyMiddleware",
@@ -57,9 +60,27 @@ TEMPLATES = [
 WSGI_APPLICATION = "agentic_django_example.wsgi.application"
 ASGI_APPLICATION = "agentic_django_example.asgi.application"
 
+# Applied to every SQLite connection. WAL lets the web process read while the
+# RQ worker writes; IMMEDIATE transactions take the write lock up front, so
+# writers wait for each other (up to busy_timeout) instead of failing with
+# "database is locked" when a read lock cannot be upgraded.
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_INIT_COMMAND = (
+    "PRAGMA journal_mode=WAL;"
+    "PRAGMA synchronous=NORMAL;"
+    f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}"
+)
+SQLITE_OPTIONS = {
+    "init_command": SQLITE_INIT_COMMAND,
+    "transaction_mode": "IMMEDIATE",
+}
+
 DATABASE_URL = os.environ.get("DATABASE_URL")
 if DATABASE_URL:
     parsed = urlparse(DATABASE_URL)
+    # DATABASE_POOL=true uses psycopg's connection pool (requires psycopg[pool]);
+    # otherwise connections persist for DATABASE_CONN_MAX_AGE seconds.
+    DATABASE_POOL = os.environ.get("DATABASE_POOL", "false").lower() == "true"
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.postgresql",
@@ -68,6 +89,21 @@ if DATABASE_URL:
             "PASSWORD": parsed.password,
             "HOST": parsed.hostname,
             "PORT": parsed.port or 5432,
+            "CONN_MAX_AGE": (
+                0 if DATABASE_POOL else int(os.environ.get("DATABASE_CONN_MAX_AGE", "60"))
+            ),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": (
+                {
+                    "pool": {
+                        "min_size": int(os.environ.get("DATABASE_POOL_MIN_SIZE", "2")),
+                        "max_size": int(os.environ.get("DATABASE_POOL_MAX_SIZE", "10")),
+                        "timeout": float(os.environ.get("DATABASE_POOL_TIMEOUT", "10")),
+                    }
+                }
+                if DATABASE_POOL
+                else {}
+            ),
         }
     }
 else:
@@ -76,9 +112,31 @@ else:
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": sqlite_path or (BASE_DIR / "db.sqlite3"),
+            "OPTIONS": dict(SQLITE_OPTIONS),
         }
     }
 
+# Redis, when configured for RQ, also backs the cache so sessions and shared
+# render/tool results stay off the database. Without REDIS_URL each process
+# keeps a local-memory cache.
+REDIS_CACHE_ENABLED = bool(os.environ.get("REDIS_URL"))
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+CACHES = {
+    "default": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "agentic-django-example",
+        }
+        if REDIS_CACHE_ENABLED
+        else {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "agentic-django-example",
+        }
+    )
+}
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -124,10 +182,116 @@ AGENTIC_DJANGO_DEFAULT_AGENT_KEY = "demo"
 AGENTIC_DJANGO_DEFAULT_RUN_OPTIONS = {
     "max_turns": 4,
 }
-AGENTIC_DJANGO_ENABLE_EVENTS = False
-AGENTIC_DJANGO_CONCURRENCY_LIMIT = None
+AGENTIC_DJANGO_ENABLE_EVENTS = (
+    os.environ.get("AGENTIC_DJANGO_ENABLE_EVENTS", "false").lower() == "true"
+)
+AGENTIC_DJANGO_EVENT_SERIALIZER = "sample_app.events.DeltaStreamEventSerializer"
+# Runs allowed in the RUNNING state across all workers (unset: CPU count).
+# Raise it to at least the total run_agent_worker concurrency.
+AGENTIC_DJANGO_CONCURRENCY_LIMIT = (
+    int(os.environ["AGENTIC_DJANGO_CONCURRENCY_LIMIT"])
+    if os.environ.get("AGENTIC_DJANGO_CONCURRENCY_LIMIT")
+    else None
+)
+
+# "scripted" and "replay" run agents without network access; "record" saves
+# real model exchanges for replay. See sample_app.offline_model.
+SAMPLE_APP_MODEL_MODE = os.environ.get("SAMPLE_APP_MODEL_MODE", "openai")
+SAMPLE_APP_MODEL_LATENCY = float(os.environ.get("SAMPLE_APP_MODEL_LATENCY", "0"))
+SAMPLE_APP_MODEL_CASSETTE_DIR = os.environ.get(
+    "SAMPLE_APP_MODEL_CASSETTE_DIR",
+    str(BASE_DIR / "cassettes"),
+)
+SAMPLE_APP_PROMPT_BUNDLE = os.environ.get("SAMPLE_APP_PROMPT_BUNDLE") or None
+SAMPLE_APP_PREBUILD_AGENTS = (
+    os.environ.get("SAMPLE_APP_PREBUILD_AGENTS", "false").lower() == "true"
+)
+SAMPLE_APP_CONVERSATION_PAGE_SIZE = int(
+    os.environ.get("SAMPLE_APP_CONVERSATION_PAGE_SIZE", "50")
+)
+SAMPLE_APP_RENDER_CACHE_MAX_ENTRIES = int(
+    os.environ.get("SAMPLE_APP_RENDER_CACHE_MAX_ENTRIES", "1024")
+)
+SAMPLE_APP_RENDER_CACHE_ALIAS = (
+    os.environ.get("SAMPLE_APP_RENDER_CACHE_ALIAS", "default" if REDIS_CACHE_ENABLED else "")
+    or None
+)
+SAMPLE_APP_RENDER_CACHE_TIMEOUT = int(
+    os.environ.get("SAMPLE_APP_RENDER_CACHE_TIMEOUT", "86400")
+)
+SAMPLE_APP_TOOL_CACHE_MAX_ENTRIES = int(
+    os.environ.get("SAMPLE_APP_TOOL_CACHE_MAX_ENTRIES", "512")
+)
+SAMPLE_APP_TOOL_CACHE_ALIAS = (
+    os.environ.get("SAMPLE_APP_TOOL_CACHE_ALIAS", "default" if REDIS_CACHE_ENABLED else "")
+    or None
+)
+SAMPLE_APP_COMPACTION_ENABLED = (
+    os.environ.get("SAMPLE_APP_COMPACTION_ENABLED", "true").lower() == "true"
+)
+SAMPLE_APP_COMPACTION_MAX_ITEMS = int(os.environ.get("SAMPLE_APP_COMPACTION_MAX_ITEMS", "60"))
+SAMPLE_APP_COMPACTION_MAX_TOKENS = int(
+    os.environ.get("SAMPLE_APP_COMPACTION_MAX_TOKENS", "12000")
+)
+SAMPLE_APP_COMPACTION_KEEP_ITEMS = int(os.environ.get("SAMPLE_APP_COMPACTION_KEEP_ITEMS", "20"))
+SAMPLE_APP_COMPACTION_TOOL_OUTPUT_CHARS = int(
+    os.environ.get("SAMPLE_APP_COMPACTION_TOOL_OUTPUT_CHARS", "1500")
+)
+SAMPLE_APP_PURGE_BATCH_SIZE = int(os.environ.get("SAMPLE_APP_PURGE_BATCH_SIZE", "500"))
+SAMPLE_APP_EXPORT_CHUNK_SIZE = int(os.environ.get("SAMPLE_APP_EXPORT_CHUNK_SIZE", "500"))
+# Admission control for run creation: "<count>/<s|m|h|d>" token buckets per
+# user and across all users (empty disables one) and a cap on pending or
+# running runs per agent session (0 disables). The backend defaults to Redis
+# with the RQ task backend and to process memory otherwise.
+SAMPLE_APP_ADMISSION_BACKEND = os.environ.get("SAMPLE_APP_ADMISSION_BACKEND", "")
+SAMPLE_APP_ADMISSION_USER_RATE = os.environ.get("SAMPLE_APP_ADMISSION_USER_RATE", "20/m")
+SAMPLE_APP_ADMISSION_GLOBAL_RATE = os.environ.get("SAMPLE_APP_ADMISSION_GLOBAL_RATE", "600/m")
+SAMPLE_APP_ADMISSION_SESSION_MAX_ACTIVE = int(
+    os.environ.get("SAMPLE_APP_ADMISSION_SESSION_MAX_ACTIVE", "1")
+)
+# Run queues, highest priority first. New runs go to the queue mapped to their
+# agent key, else to the one mapped to where the request came from ("browser"
+# for the HTMX form, "api" for JSON clients), else the default run queue.
+# Mappings are "<name>=<queue>" pairs separated by commas.
+SAMPLE_APP_QUEUE_PRIORITY = os.environ.get(
+    "SAMPLE_APP_QUEUE_PRIORITY", "interactive,default,batch,maintenance"
+).split(",")
+SAMPLE_APP_RUN_QUEUES_BY_AGENT = dict(
+    pair.split("=", 1)
+    for pair in os.environ.get("SAMPLE_APP_RUN_QUEUES_BY_AGENT", "").split(",")
+    if "=" in pair
+)
+SAMPLE_APP_RUN_QUEUES_BY_ORIGIN = dict(
+    pair.split("=", 1)
+    for pair in os.environ.get(
+        "SAMPLE_APP_RUN_QUEUES_BY_ORIGIN", "browser=interactive,api=batch"
+    ).split(",")
+    if "=" in pair
+)
+SAMPLE_APP_DEFAULT_RUN_QUEUE = os.environ.get("SAMPLE_APP_DEFAULT_RUN_QUEUE", "interactive")
+# Runs a run_agent_batch command keeps in flight at once.
+SAMPLE_APP_BATCH_WINDOW = int(os.environ.get("SAMPLE_APP_BATCH_WINDOW", "50"))
+SAMPLE_APP_WORKER_CONCURRENCY = int(os.environ.get("SAMPLE_APP_WORKER_CONCURRENCY", "20"))
+SAMPLE_APP_TOOL_THREADS = int(os.environ.get("SAMPLE_APP_TOOL_THREADS", "8"))
+SAMPLE_APP_TOOL_TIMEOUT = float(os.environ.get("SAMPLE_APP_TOOL_TIMEOUT", "10"))
+# The run stream only arrives incrementally under ASGI; WSGI (runserver, the
+# Docker image) buffers it until the run ends, so it is opt-in.
+SAMPLE_APP_RUN_STREAM_ENABLED = (
+    os.environ.get("SAMPLE_APP_RUN_STREAM_ENABLED", "false").lower() == "true"
+)
+SAMPLE_APP_RUN_STREAM_POLL_INTERVAL = float(
+    os.environ.get("SAMPLE_APP_RUN_STREAM_POLL_INTERVAL", "0.5")
+)
+SAMPLE_APP_RUN_STREAM_MAX_POLL_INTERVAL = float(
+    os.environ.get("SAMPLE_APP_RUN_STREAM_MAX_POLL_INTERVAL", "2")
+)
+SAMPLE_APP_RUN_STREAM_DELTA_INTERVAL = float(
+    os.environ.get("SAMPLE_APP_RUN_STREAM_DELTA_INTERVAL", "0.25")
+)
+# When set, /metrics requires "Authorization: Bearer <token>".
+SAMPLE_APP_METRICS_TOKEN = os.environ.get("SAMPLE_APP_METRICS_TOKEN", "")
+SAMPLE_APP_RUN_STREAM_TIMEOUT = float(os.environ.get("SAMPLE_APP_RUN_STREAM_TIMEOUT", "300"))
 
-REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
 TASKS_BACKEND = os.environ.get(
     "TASKS_BACKEND",
     "django_tasks.backends.immediate.ImmediateBackend",
@@ -135,12 +299,17 @@ TASKS_BACKEND = os.environ.get(
 TASKS = {
     "default": {
         "BACKEND": TASKS_BACKEND,
+        "QUEUES": SAMPLE_APP_QUEUE_PRIORITY,
     }
 }
 
 RQ_QUEUES = {
-    "default": {
+    name: {
         "URL": REDIS_URL,
         "DEFAULT_TIMEOUT": 360,
     }
+    for name in SAMPLE_APP_QUEUE_PRIORITY
 }
+# Jobs run in the worker process rather than a fork per job, so metric files
+# under PROMETHEUS_MULTIPROC_DIR do not pile up (see docs/OPERATIONS.md).
+RQ = {"WORKER_CLASS": "sample_app.rq_worker.MetricsWorker"}
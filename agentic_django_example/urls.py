@@ -5,6 +5,6 @@ from django.urls import include, path
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("agents/", include("agentic_django.urls")),
+    path("agents/", include("sample_app.agent_urls")),
     path("", include("sample_app.urls")),
 ]
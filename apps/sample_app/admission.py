@@ -0,0 +1,394 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+import threading
+import time
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Protocol
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.template.loader import render_to_string
+
+from agentic_django.conf import parse_rate_limit
+from agentic_django.models import AgentRun, AgentSession
+from sample_app.metrics import RUNS_REJECTED
+from sample_app.run_queues import uses_rq_backend
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_BACKENDS = ("memory", "redis")
+KEY_PREFIX = "sample_app:admission"
+# A session's active run usually finishes within a few model turns.
+SESSION_RETRY_AFTER = 5.0
+REJECTED_TEMPLATE = "sample_app/partials/run_rejected.html"
+RUN_CREATE_VIEW = "agents:run-create"
+ACTIVE_STATUSES = (AgentRun.Status.PENDING, AgentRun.Status.RUNNING)
+
+# Session cap enforced on runs created by the request being admitted; 0 when
+# no run-create request is in flight on this context.
+_session_cap: ContextVar[int] = ContextVar("sample_app_admission_session_cap", default=0)
+
+# Refills every bucket to now, then takes one token from each only if all of
+# them have one, so a request rejected by the global bucket does not also use
+# up the caller's own allowance. Returns {admitted, seconds until admissible}.
+TOKEN_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local wait = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[2 * i - 1])
+  local rate = tonumber(ARGV[2 * i])
+  local state = redis.call('HMGET', key, 'tokens', 'ts')
+  local tokens = tonumber(state[1]) or capacity
+  local ts = tonumber(state[2]) or now
+  tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+  levels[i] = tokens
+  if tokens < 1 then
+    wait = math.max(wait, (1 - tokens) / rate)
+  end
+end
+if wait > 0 then
+  return {0, tostring(wait)}
+end
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[2 * i - 1])
+  local rate = tonumber(ARGV[2 * i])
+  redis.call('HSET', key, 'tokens', tostring(levels[i] - 1), 'ts', tostring(now))
+  redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+end
+return {1, '0'}
+"""
+
+# Gives back the token taken from each bucket, capped at its capacity. Buckets
+# that expired in the meantime are already full.
+REFUND_SCRIPT = """
+for i, key in ipairs(KEYS) do
+  local tokens = tonumber(redis.call('HGET', key, 'tokens'))
+  if tokens then
+    redis.call('HSET', key, 'tokens', tostring(math.min(tonumber(ARGV[i]), tokens + 1)))
+  end
+end
+return 1
+"""
+
+
+@dataclass(frozen=True)
+class Bucket:
+    """A token bucket holding up to ``capacity`` tokens, refilled at ``rate`` per second."""
+
+    key: str
+    capacity: int
+    rate: float
+
+    @classmethod
+    def from_setting(cls, key: str, value: str | None) -> Bucket | None:
+        """Build a bucket from a ``"20/m"`` style limit; empty disables it."""
+
+        parsed = parse_rate_limit(value)
+        if parsed is None:
+            return None
+        count, period_seconds = parsed
+        return cls(key=key, capacity=count, rate=count / period_seconds)
+
+
+@dataclass(frozen=True)
+class Rejection:
+    reason: str
+    retry_after: float
+
+
+class SessionLimitExceeded(Exception):
+    """A run lost the race for its session's last active slot."""
+
+
+class RateLimiter(Protocol):
+    def acquire(self, buckets: list[Bucket]) -> float:
+        """Take a token from every bucket, or return seconds until that is possible."""
+        ...
+
+    def refund(self, buckets: list[Bucket]) -> None:
+        """Give back a token taken by ``acquire`` for a request that created no run."""
+        ...
+
+
+class MemoryRateLimiter:
+    """Process-local token buckets, for the immediate task backend and tests."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._levels: dict[str, tuple[float, float]] = {}
+
+    def acquire(self, buckets: list[Bucket]) -> float:
+        with self._lock:
+            now = self._clock()
+            levels: list[float] = []
+            wait = 0.0
+            for bucket in buckets:
+                tokens, updated = self._levels.get(bucket.key, (bucket.capacity, now))
+                tokens = min(bucket.capacity, tokens + max(0.0, now - updated) * bucket.rate)
+                levels.append(tokens)
+                if tokens < 1:
+                    wait = max(wait, (1 - tokens) / bucket.rate)
+            if wait:
+                return wait
+            for bucket, tokens in zip(buckets, levels):
+                self._levels[bucket.key] = (tokens - 1, now)
+            return 0.0
+
+    def refund(self, buckets: list[Bucket]) -> None:
+        with self._lock:
+            for bucket in buckets:
+                level = self._levels.get(bucket.key)
+                if level is not None:
+                    tokens, updated = level
+                    self._levels[bucket.key] = (min(bucket.capacity, tokens + 1), updated)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._levels.clear()
+
+
+class RedisRateLimiter:
+    """Token buckets shared by every web process, updated atomically by a Lua script."""
+
+    def __init__(self, client: Any) -> None:
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._refund_script = client.register_script(REFUND_SCRIPT)
+
+    def acquire(self, buckets: list[Bucket]) -> float:
+        args: list[float] = []
+        for bucket in buckets:
+            args.extend((bucket.capacity, bucket.rate))
+        admitted, wait = self._script(keys=[bucket.key for bucket in buckets], args=args)
+        return 0.0 if int(admitted) else float(wait)
+
+    def refund(self, buckets: list[Bucket]) -> None:
+        self._refund_script(
+            keys=[bucket.key for bucket in buckets],
+            args=[bucket.capacity for bucket in buckets],
+        )
+
+
+def admission_backend() -> str:
+    backend = getattr(settings, "SAMPLE_APP_ADMISSION_BACKEND", "") or ""
+    if not backend:
+        # Runs only share a queue worth protecting when they go through RQ.
+        backend = "redis" if uses_rq_backend() else "memory"
+    if backend not in ADMISSION_BACKENDS:
+        raise ImproperlyConfigured(
+            f"SAMPLE_APP_ADMISSION_BACKEND must be one of {', '.join(ADMISSION_BACKENDS)}"
+        )
+    return backend
+
+
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> RateLimiter:
+    if admission_backend() == "redis":
+        import redis
+
+        return RedisRateLimiter(redis.Redis.from_url(settings.REDIS_URL))
+    return MemoryRateLimiter()
+
+
+def run_buckets(user_id: Any) -> list[Bucket]:
+    buckets = [
+        Bucket.from_setting(
+            f"{KEY_PREFIX}:user:{user_id}",
+            getattr(settings, "SAMPLE_APP_ADMISSION_USER_RATE", "20/m"),
+        ),
+        Bucket.from_setting(
+            f"{KEY_PREFIX}:global",
+            getattr(settings, "SAMPLE_APP_ADMISSION_GLOBAL_RATE", "600/m"),
+        ),
+    ]
+    return [bucket for bucket in buckets if bucket is not None]
+
+
+def session_active_limit() -> int:
+    return int(getattr(settings, "SAMPLE_APP_ADMISSION_SESSION_MAX_ACTIVE", 1))
+
+
+def admit_run(user: Any, session_key: str | None) -> Rejection | None:
+    """Return why a new run for ``user`` in ``session_key`` must wait, if it must."""
+
+    limit = session_active_limit()
+    if session_key and limit > 0:
+        active = AgentRun.objects.filter(
+            owner=user,
+            session__session_key=session_key,
+            status__in=ACTIVE_STATUSES,
+        )[:limit].count()
+        if active >= limit:
+            return Rejection("session", SESSION_RETRY_AFTER)
+    buckets = run_buckets(user.pk)
+    if not buckets:
+        return None
+    try:
+        wait = get_rate_limiter().acquire(buckets)
+    except Exception:
+        # Admission control must not take run creation down with Redis.
+        logger.warning("Admission check failed; admitting run", exc_info=True)
+        return None
+    if wait > 0:
+        return Rejection("rate", wait)
+    return None
+
+
+@receiver(post_save, sender=AgentRun, dispatch_uid="sample_app.admission.session_cap")
+def recheck_session_cap(
+    sender: type[AgentRun],
+    instance: AgentRun,
+    created: bool,
+    **kwargs: Any,
+) -> None:
+    """Undo a run created past its session's cap by a request racing another.
+
+    ``admit_run`` counts before the view creates the run, so two requests for
+    one session can both pass it. The check is repeated here with the session
+    row locked: the oldest active runs keep their slots and a newer one over
+    the cap is deleted before the view enqueues it.
+    """
+
+    limit = _session_cap.get()
+    if not created or limit <= 0:
+        return
+    with transaction.atomic():
+        AgentSession.objects.select_for_update().filter(pk=instance.session_id).first()
+        admitted = list(
+            AgentRun.objects.filter(session_id=instance.session_id, status__in=ACTIVE_STATUSES)
+            .order_by("created_at", "id")
+            .values_list("id", flat=True)[:limit]
+        )
+        if instance.pk in admitted:
+            return
+        instance.delete()
+    raise SessionLimitExceeded(str(instance.session_id))
+
+
+def rejection_response(request: HttpRequest, rejection: Rejection) -> HttpResponse:
+    retry_after = max(1, math.ceil(rejection.retry_after))
+    if getattr(request, "htmx", False):
+        response = HttpResponse(
+            render_to_string(
+                REJECTED_TEMPLATE,
+                {"reason": rejection.reason, "retry_after": retry_after},
+                request=request,
+            ),
+            status=429,
+        )
+        # Show the notice next to the form and keep the current run in view.
+        response["HX-Retarget"] = "#run-notice"
+        response["HX-Reswap"] = "innerHTML"
+    else:
+        response = JsonResponse(
+            {"error": "too many runs", "reason": rejection.reason, "retry_after": retry_after},
+            status=429,
+        )
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
+def _payload_session_key(request: HttpRequest) -> str | None:
+    """Read ``session_key`` the way the run-create view parses its payload."""
+
+    if request.content_type and "application/json" in request.content_type:
+        if not request.body:
+            return None
+        payload = json.loads(request.body)
+        if not isinstance(payload, dict):
+            raise ValueError("JSON payload must be an object")
+    else:
+        payload = request.POST
+    session_key = payload.get("session_key")
+    return str(session_key) if session_key else None
+
+
+class AdmissionMiddleware:
+    """Answer ``agents:run-create`` with 429 instead of queueing an over-limit run.
+
+    Runs in ``process_view`` after the CSRF check, so a forged request cannot
+    spend someone else's tokens. Tokens taken for a request the view then
+    refuses (any non-2xx answer) are given back.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> Any:
+        try:
+            response = self.get_response(request)
+        finally:
+            cap_token = getattr(request, "_admission_cap_token", None)
+            if cap_token is not None:
+                _session_cap.reset(cap_token)
+        buckets = getattr(request, "_admission_buckets", None)
+        if buckets and not 200 <= response.status_code < 300:
+            try:
+                get_rate_limiter().refund(buckets)
+            except Exception:
+                logger.warning("Admission refund failed", exc_info=True)
+        return response
+
+    def process_view(
+        self,
+        request: HttpRequest,
+        view_func: Callable[..., Any],
+        view_args: Any,
+        view_kwargs: Any,
+    ) -> HttpResponse | None:
+        if request.method != "POST" or not request.user.is_authenticated:
+            return None
+        match = request.resolver_match
+        if match is None or match.view_name != RUN_CREATE_VIEW:
+            return None
+        try:
+            session_key = _payload_session_key(request)
+        except ValueError:
+            # The view answers malformed payloads with 400.
+            return None
+        rejection = admit_run(request.user, session_key)
+        if rejection is not None:
+            RUNS_REJECTED.labels(rejection.reason).inc()
+            return rejection_response(request, rejection)
+        request._admission_buckets = run_buckets(request.user.pk)  # type: ignore[attr-defined]
+        request._admission_cap_token = _session_cap.set(session_active_limit())  # type: ignore[attr-defined]
+        return None
+
+    def process_exception(
+        self,
+        request: HttpRequest,
+        exception: Exception,
+    ) -> HttpResponse | None:
+        if not isinstance(exception, SessionLimitExceeded):
+            return None
+        RUNS_REJECTED.labels("session").inc()
+        return rejection_response(request, Rejection("session", SESSION_RETRY_AFTER))
+
+
+__all__ = [
+    "AdmissionMiddleware",
+    "Bucket",
+    "MemoryRateLimiter",
+    "RateLimiter",
+    "RedisRateLimiter",
+    "Rejection",
+    "SessionLimitExceeded",
+    "admission_backend",
+    "admit_run",
+    "get_rate_limiter",
+    "recheck_session_cap",
+    "rejection_response",
+    "run_buckets",
+]
@@ -1,23 +1,90 @@
 from __future__ import annotations
 
+import threading
 from collections.abc import Callable
+from functools import partial
 from typing import Any
 
 from agents import Agent
 from agents.models import get_default_model
 
-from sample_app.prompts import load_prompt, prompt_to_text
-from sample_app.tools import book_flight, find_flight, get_flight_price
+from sample_app.offline_model import get_agent_model, model_mode
+from sample_app.prompts import prompt_fingerprint, prompt_text
+from sample_app.sessions import CompactingModel
+from sample_app.tools import (
+    book_flight,
+    find_flight,
+    find_flights,
+    get_flight_price,
+    get_flight_prices,
+)
 
+AgentFactory = Callable[[], Agent[Any]]
 
-def get_agent_registry() -> dict[str, Callable[[], Agent[Any]]]:
-    def build_demo_agent() -> Agent[Any]:
-        instructions = prompt_to_text(load_prompt("demo_agent"))
-        return Agent(
-            name="Demo Agent",
-            instructions=instructions,
-            model=get_default_model(),
-            tools=[find_flight, get_flight_price, book_flight],
-        )
 
-    return {"demo": build_demo_agent}
+def build_demo_agent() -> Agent[Any]:
+    instructions = prompt_text("demo_agent")
+    return Agent(
+        name="Demo Agent",
+        instructions=instructions,
+        # Long histories are compacted in each model request; stored items stay whole.
+        model=CompactingModel(get_agent_model(), "demo"),
+        tools=[find_flight, find_flights, get_flight_price, get_flight_prices, book_flight],
+    )
+
+
+# Each agent key maps to its builder and the prompt files it reads, so a cached
+# agent is rebuilt when one of those prompts changes.
+AGENT_BUILDERS: dict[str, tuple[AgentFactory, tuple[str, ...]]] = {
+    "demo": (build_demo_agent, ("demo_agent",)),
+}
+
+_agent_cache: dict[str, tuple[tuple[str, ...], Agent[Any]]] = {}
+_agent_cache_lock = threading.Lock()
+
+
+def _agent_fingerprint(prompt_names: tuple[str, ...]) -> tuple[str, ...]:
+    return (
+        get_default_model(),
+        model_mode(),
+        *(prompt_fingerprint(name) for name in prompt_names),
+    )
+
+
+def get_cached_agent(agent_key: str) -> Agent[Any]:
+    """Return the agent for ``agent_key``, building it at most once per version."""
+
+    builder, prompt_names = AGENT_BUILDERS[agent_key]
+    fingerprint = _agent_fingerprint(prompt_names)
+    cached = _agent_cache.get(agent_key)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    with _agent_cache_lock:
+        cached = _agent_cache.get(agent_key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        agent = builder()
+        _agent_cache[agent_key] = (fingerprint, agent)
+        return agent
+
+
+def prebuild_agents() -> list[str]:
+    """Build every registered agent now, e.g. when a worker process starts."""
+
+    for agent_key in AGENT_BUILDERS:
+        get_cached_agent(agent_key)
+    return list(AGENT_BUILDERS)
+
+
+def clear_agent_cache() -> None:
+    with _agent_cache_lock:
+        _agent_cache.clear()
+
+
+_REGISTRY: dict[str, AgentFactory] = {
+    agent_key: partial(get_cached_agent, agent_key) for agent_key in AGENT_BUILDERS
+}
+
+
+def get_agent_registry() -> dict[str, AgentFactory]:
+    return _REGISTRY
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from django.urls import path
+
+from agentic_django import urls as package_urls
+from sample_app.conditional import conditional_poll, run_fragment_etag, session_items_etag
+
+app_name = "agents"
+
+# Polled package views answer unchanged requests with 304; every other route
+# is the package's own.
+ETAG_FUNCS = {
+    "run-fragment": run_fragment_etag,
+    "session-items": session_items_etag,
+}
+
+urlpatterns = [
+    path(
+        str(pattern.pattern),
+        conditional_poll(ETAG_FUNCS[pattern.name])(pattern.callback),
+        name=pattern.name,
+    )
+    if pattern.name in ETAG_FUNCS
+    else pattern
+    for pattern in package_urls.urlpatterns
+]
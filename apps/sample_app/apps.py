@@ -1,9 +1,29 @@
 from __future__ import annotations
 
+from pathlib import Path
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class SampleAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "sample_app"
     verbose_name = "Sample App"
+
+    def ready(self) -> None:
+        # Connects the run lifecycle signal receivers.
+        from sample_app import admission, metrics, run_queues, tool_calls  # noqa: F401
+        from sample_app.offline_model import configure_tracing
+
+        configure_tracing()
+
+        bundle_path = getattr(settings, "SAMPLE_APP_PROMPT_BUNDLE", None)
+        if bundle_path and Path(bundle_path).is_file():
+            from sample_app.prompts import prompt_store
+
+            prompt_store.load_bundle(bundle_path)
+        if getattr(settings, "SAMPLE_APP_PREBUILD_AGENTS", False):
+            from sample_app.agent_registry import prebuild_agents
+
+            prebuild_agents()
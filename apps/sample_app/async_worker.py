@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import traceback
+import uuid
+from typing import Any, Protocol
+
+from agents import Runner
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from agentic_django.conf import get_settings
+from agentic_django.models import AgentRun
+from agentic_django.registry import get_agent
+from agentic_django.services import (
+    _build_context,
+    _build_run_options,
+    _consume_stream_events,
+    _format_error,
+    _get_event_serializer,
+    _get_serializer,
+    _next_event_sequence,
+    _reserve_run_slot,
+    dispatch_pending_runs,
+    maybe_recover_stuck_runs,
+)
+from agentic_django.sessions import get_session
+from agentic_django.signals import agent_run_completed, agent_run_failed, agent_run_started
+from sample_app.run_queues import RUN_TASK_PATH
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_CLASS = "django_tasks.backends.rq.Job"
+# Seconds between heartbeats for in-flight jobs, like rq's job_monitoring_interval.
+HEARTBEAT_INTERVAL = 30
+
+
+def worker_concurrency() -> int:
+    return int(getattr(settings, "SAMPLE_APP_WORKER_CONCURRENCY", 20))
+
+
+async def execute_run_async(run_id: str) -> None:
+    """Execute one agent run on the running event loop.
+
+    Mirrors ``agentic_django.services.execute_run``, which blocks its thread
+    in ``async_to_sync`` for the whole run, so many runs can wait on the model
+    API from one process. ORM work goes through ``sync_to_async``. A run
+    cancelled by a forced shutdown is put back to pending for another worker.
+    """
+
+    # The worker outlives many runs, so drop connections past CONN_MAX_AGE.
+    await sync_to_async(close_old_connections)()
+    await sync_to_async(maybe_recover_stuck_runs)()
+    run = await AgentRun.objects.select_related("session", "owner").aget(id=run_id)
+    if run.status != AgentRun.Status.PENDING:
+        return
+    if not await sync_to_async(_reserve_run_slot)(run):
+        await AgentRun.objects.filter(id=run_id).aupdate(task_id="", updated_at=timezone.now())
+        return
+
+    # Signals are sent from sync_to_async so receivers may use the ORM; context
+    # variables they set (the tool call recorder) still apply to this run.
+    await sync_to_async(agent_run_started.send)(sender=AgentRun, run=run)
+    serializer = _get_serializer()
+    try:
+        agent = await sync_to_async(get_agent)(run.agent_key)
+        session = await sync_to_async(get_session)(run.session.session_key, run.owner)
+        run_options = _build_run_options(run)
+        context = await sync_to_async(_build_context)(run)
+        if get_settings().enable_events:
+            result = await _run_streamed(run, agent, session, context, run_options)
+        else:
+            result = await Runner.run(
+                agent,
+                run.input_payload,
+                session=session,
+                context=context,
+                **run_options,
+            )
+        run.final_output = serializer.serialize(result.final_output)
+        run.raw_responses = serializer.serialize(result.raw_responses)
+        run.last_response_id = result.last_response_id or ""
+        run.error = ""
+        run.task_id = ""
+        run.status = AgentRun.Status.COMPLETED
+        run.finished_at = timezone.now()
+        result.release_agents()
+        await sync_to_async(run.save)(
+            update_fields=[
+                "final_output",
+                "raw_responses",
+                "last_response_id",
+                "error",
+                "task_id",
+                "status",
+                "finished_at",
+                "updated_at",
+            ]
+        )
+        await sync_to_async(agent_run_completed.send)(sender=AgentRun, run=run, result=result)
+    except asyncio.CancelledError:
+        await AgentRun.objects.filter(id=run_id, status=AgentRun.Status.RUNNING).aupdate(
+            status=AgentRun.Status.PENDING,
+            started_at=None,
+            task_id="",
+            updated_at=timezone.now(),
+        )
+        raise
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Agent run failed", extra={"run_id": str(run.id)})
+        run.task_id = ""
+        run.status = AgentRun.Status.FAILED
+        run.error = _format_error(exc)
+        run.finished_at = timezone.now()
+        await sync_to_async(run.save)(
+            update_fields=["error", "task_id", "status", "finished_at", "updated_at"]
+        )
+        await sync_to_async(agent_run_failed.send)(sender=AgentRun, run=run, exception=exc)
+        raise
+    finally:
+        await sync_to_async(dispatch_pending_runs)()
+
+
+async def _run_streamed(
+    run: AgentRun,
+    agent: Any,
+    session: Any,
+    context: Any | None,
+    run_options: dict[str, Any],
+) -> Any:
+    event_serializer = _get_event_serializer()
+    starting_sequence = await sync_to_async(_next_event_sequence)(run)
+    result = Runner.run_streamed(
+        agent,
+        run.input_payload,
+        session=session,
+        context=context,
+        **run_options,
+    )
+    await _consume_stream_events(
+        run=run,
+        result=result,
+        event_serializer=event_serializer,
+        starting_sequence=starting_sequence,
+    )
+    return result
+
+
+def run_id_for_job(job: Any) -> str | None:
+    """Return the run id of an agent run job, or ``None`` for any other job."""
+
+    if getattr(job, "func_name", None) == RUN_TASK_PATH and job.args:
+        return str(job.args[0])
+    return None
+
+
+class JobSource(Protocol):
+    def dequeue(self, timeout: int) -> Any | None: ...
+
+    def started(self, job: Any) -> None: ...
+
+    def heartbeat(self, jobs: list[Any]) -> None: ...
+
+    def finished(self, job: Any, error: BaseException | None) -> None: ...
+
+
+class RQJobSource:
+    """Pop jobs from the RQ queues ``rqworker`` would read and record their status.
+
+    Does the bookkeeping of ``rq.Worker``: a started job leaves the queue's
+    intermediate list and gets an execution in the ``StartedJobRegistry``
+    (kept alive by ``heartbeat``), then moves to the finished or failed
+    registry. A job whose worker dies expires from the started registry and
+    is failed by RQ's own cleanup, as it would be for ``rqworker``.
+    """
+
+    def __init__(
+        self,
+        queue_names: list[str],
+        job_class: str = DEFAULT_JOB_CLASS,
+        *,
+        heartbeat_ttl: int = HEARTBEAT_INTERVAL + 60,
+        connection: Any | None = None,
+    ) -> None:
+        import django_rq
+
+        self.job_class = import_string(job_class)
+        self.queues = [
+            django_rq.get_queue(name, connection=connection, job_class=self.job_class)
+            for name in queue_names
+        ]
+        self.connection = self.queues[0].connection
+        self.heartbeat_ttl = heartbeat_ttl
+        self.name = f"async-{uuid.uuid4().hex}"
+        self._executions: dict[str, Any] = {}
+
+    def dequeue(self, timeout: int) -> Any | None:
+        from rq import Queue
+        from rq.exceptions import DequeueTimeout
+
+        try:
+            result = Queue.dequeue_any(
+                self.queues,
+                timeout,
+                connection=self.connection,
+                job_class=self.job_class,
+            )
+        except DequeueTimeout:
+            return None
+        return result[0] if result else None
+
+    def started(self, job: Any) -> None:
+        from rq.executions import Execution
+        from rq.utils import now
+
+        queue = next(queue for queue in self.queues if queue.name == job.origin)
+        with self.connection.pipeline() as pipeline:
+            execution = Execution.create(
+                job, self.heartbeat_ttl, pipeline=pipeline, worker_name=self.name
+            )
+            job.heartbeat(now(), self.heartbeat_ttl, pipeline=pipeline)
+            job.prepare_for_execution(self.name, pipeline=pipeline)
+            pipeline.lrem(queue.intermediate_queue_key, 1, job.id)
+            pipeline.execute()
+        self._executions[job.id] = execution
+
+    def heartbeat(self, jobs: list[Any]) -> None:
+        from rq.utils import now
+
+        with self.connection.pipeline() as pipeline:
+            for job in jobs:
+                execution = self._executions.get(job.id)
+                if execution is None:
+                    continue
+                execution.heartbeat(job.started_job_registry, self.heartbeat_ttl, pipeline)
+                job.heartbeat(now(), self.heartbeat_ttl, pipeline=pipeline, xx=True)
+            pipeline.execute()
+
+    def finished(self, job: Any, error: BaseException | None) -> None:
+        from rq.defaults import DEFAULT_RESULT_TTL
+        from rq.job import JobStatus
+        from rq.utils import now
+
+        execution = self._executions.pop(job.id, None)
+        job.ended_at = now()
+        execution_details = {
+            "worker_name": self.name,
+            "execution_id": execution.id if execution else None,
+            "execution_started_at": execution.created_at if execution else None,
+            "execution_ended_at": job.ended_at,
+        }
+        with self.connection.pipeline() as pipeline:
+            if execution is not None:
+                execution.delete(job=job, pipeline=pipeline)
+            if error is None:
+                result_ttl = job.get_result_ttl(DEFAULT_RESULT_TTL)
+                if result_ttl != 0:
+                    job._handle_success(result_ttl, pipeline=pipeline, **execution_details)
+                job.cleanup(result_ttl, pipeline=pipeline, remove_from_queue=False)
+            else:
+                job.set_status(JobStatus.FAILED, pipeline=pipeline)
+                exc_string = "".join(traceback.format_exception(error))
+                job._handle_failure(exc_string, pipeline=pipeline, **execution_details)
+            pipeline.execute()
+
+
+class AsyncRunWorker:
+    """Run up to ``concurrency`` queued jobs at once on one event loop.
+
+    Agent runs execute as asyncio tasks through ``execute_run_async``; any
+    other job is performed in a thread so the queue can be shared with
+    ``rqworker``. In-flight jobs get a source heartbeat every
+    ``heartbeat_interval`` seconds. ``stop()`` stops taking jobs and lets
+    in-flight ones finish; a second ``stop()`` cancels them.
+    """
+
+    def __init__(
+        self,
+        source: JobSource,
+        *,
+        concurrency: int,
+        poll_timeout: int = 1,
+        drain_timeout: float | None = None,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        self.source = source
+        self.concurrency = concurrency
+        self.poll_timeout = poll_timeout
+        self.drain_timeout = drain_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.processed = 0
+        self.failed = 0
+        self._stopping = False
+        self._tasks: dict[asyncio.Task[None], Any] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    def stop(self) -> None:
+        if self._stopping:
+            self.cancel_in_flight()
+        self._stopping = True
+
+    def cancel_in_flight(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+
+    async def run(self, *, burst: bool = False) -> None:
+        """Take jobs until stopped (or, with ``burst``, until the queue is empty)."""
+
+        slots = asyncio.Semaphore(self.concurrency)
+        heartbeats = asyncio.create_task(self._heartbeat())
+        while not self._stopping:
+            await slots.acquire()
+            if self._stopping:
+                slots.release()
+                break
+            job = await asyncio.to_thread(self.source.dequeue, self.poll_timeout)
+            if job is None:
+                slots.release()
+                if burst and not self._tasks:
+                    break
+                continue
+            task = asyncio.create_task(self._perform(job))
+            self._tasks[task] = job
+            task.add_done_callback(lambda done: self._tasks.pop(done, None))
+            task.add_done_callback(lambda _: slots.release())
+        try:
+            await self.drain()
+        finally:
+            heartbeats.cancel()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            jobs = list(self._tasks.values())
+            if not jobs:
+                continue
+            try:
+                await asyncio.to_thread(self.source.heartbeat, jobs)
+            except Exception:  # noqa: BLE001
+                logger.warning("Heartbeat for %d in-flight jobs failed", len(jobs), exc_info=True)
+
+    async def drain(self) -> None:
+        if not self._tasks:
+            return
+        logger.info("Waiting for %d in-flight jobs", len(self._tasks))
+        _, pending = await asyncio.wait(set(self._tasks), timeout=self.drain_timeout)
+        if pending:
+            logger.warning("Cancelling %d jobs still running after drain timeout", len(pending))
+            for task in pending:
+                task.cancel()
+            await asyncio.wait(pending)
+
+    async def _perform(self, job: Any) -> None:
+        error: BaseException | None = None
+        await asyncio.to_thread(self.source.started, job)
+        try:
+            run_id = run_id_for_job(job)
+            if run_id is None:
+                await asyncio.to_thread(job.perform)
+            else:
+                await execute_run_async(run_id)
+        except asyncio.CancelledError as exc:
+            error = exc
+            raise
+        except Exception as exc:  # noqa: BLE001
+            # Agent run failures are already logged and stored on the run.
+            error = exc
+            logger.warning("Job %s failed: %s", getattr(job, "id", "?"), exc)
+        finally:
+            self.processed += 1
+            if error is not None:
+                self.failed += 1
+            await asyncio.to_thread(self.source.finished, job, error)
+
+
+__all__ = [
+    "AsyncRunWorker",
+    "JobSource",
+    "RQJobSource",
+    "execute_run_async",
+    "run_id_for_job",
+    "worker_concurrency",
+]
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Any, TextIO
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+
+from agentic_django.models import AgentRun, AgentSession
+from agentic_django.services import enqueue_agent_run
+from sample_app.metrics import RUNS_CREATED
+from sample_app.run_queues import RUN_QUEUE_KEY
+
+BATCH_KEY = "batch"
+BATCH_ITEM_KEY = "batch_item"
+BATCH_QUEUE = "batch"
+DEFAULT_BATCH_WINDOW = 50
+FINISHED_STATUSES = (AgentRun.Status.COMPLETED, AgentRun.Status.FAILED)
+
+
+def batch_window() -> int:
+    return int(getattr(settings, "SAMPLE_APP_BATCH_WINDOW", DEFAULT_BATCH_WINDOW))
+
+
+@dataclass(frozen=True)
+class BatchItem:
+    item_id: str
+    input: str | list[Any]
+    agent_key: str
+    session_key: str = ""
+
+
+def read_items(path: Path, default_agent_key: str) -> Iterator[BatchItem]:
+    """Yield prompts from a ``.csv`` file or a JSONL file, one per row or line.
+
+    Rows need ``input``; ``id``, ``agent_key``, and ``session_key`` are
+    optional. Without an ``id`` the row or line number is used.
+    """
+
+    with path.open(newline="", encoding="utf-8") as handle:
+        if path.suffix.lower() == ".csv":
+            rows: Iterable[tuple[int, Any]] = enumerate(csv.DictReader(handle), start=1)
+        else:
+            rows = (
+                (number, _parse_line(number, line))
+                for number, line in enumerate(handle, start=1)
+                if line.strip()
+            )
+        for number, row in rows:
+            yield _to_item(number, row, default_agent_key)
+
+
+def _parse_line(number: int, line: str) -> Any:
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"line {number}: {exc.msg}") from exc
+
+
+def _to_item(number: int, row: Any, default_agent_key: str) -> BatchItem:
+    if not isinstance(row, dict):
+        raise ValueError(f"line {number}: expected an object")
+    prompt = row.get("input")
+    if not isinstance(prompt, (str, list)) or not prompt:
+        raise ValueError(f"line {number}: input must be a non-empty string or list")
+    return BatchItem(
+        item_id=str(row.get("id") or number),
+        input=prompt,
+        agent_key=row.get("agent_key") or default_agent_key,
+        session_key=row.get("session_key") or "",
+    )
+
+
+@dataclass
+class Checkpoint:
+    """How far through the input file a batch has created runs.
+
+    Written atomically after every chunk, so an interrupted batch resumes
+    reading where it stopped instead of re-checking every earlier row.
+    """
+
+    path: Path
+    batch: str
+    consumed: int = 0
+
+    @classmethod
+    def load(cls, path: Path, batch: str) -> Checkpoint:
+        if not path.exists():
+            return cls(path=path, batch=batch)
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("batch") != batch:
+            raise ValueError(f"{path} belongs to batch {data.get('batch')!r}, not {batch!r}")
+        return cls(path=path, batch=batch, consumed=int(data.get("consumed", 0)))
+
+    def save(self) -> None:
+        tmp = self.path.with_name(f"{self.path.name}.tmp")
+        tmp.write_text(json.dumps({"batch": self.batch, "consumed": self.consumed}))
+        os.replace(tmp, self.path)
+
+
+def written_ids(path: Path) -> set[str]:
+    """Item ids already in an output file; a torn last line is ignored."""
+
+    if not path.exists():
+        return set()
+    ids = set()
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                ids.add(str(json.loads(line)["id"]))
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue
+    return ids
+
+
+def batch_runs(owner: Any, batch: str) -> QuerySet[AgentRun]:
+    return AgentRun.objects.filter(owner=owner, metadata__batch=batch)
+
+
+def create_runs(items: list[BatchItem], *, owner: Any, batch: str) -> list[AgentRun]:
+    """Create sessions and runs for ``items`` with one ``bulk_create`` each.
+
+    Items that already have a run in this batch (created before an
+    interruption) are skipped. ``bulk_create`` sends no ``post_save`` or
+    ``pre_save``, so the queue and the created-runs metric are set here.
+    """
+
+    existing = set(
+        batch_runs(owner, batch)
+        .filter(metadata__batch_item__in=[item.item_id for item in items])
+        .values_list("metadata__batch_item", flat=True)
+    )
+    items = [item for item in items if item.item_id not in existing]
+    if not items:
+        return []
+    session_keys = {
+        item.item_id: item.session_key or f"batch:{batch}:{item.item_id}" for item in items
+    }
+    with transaction.atomic():
+        AgentSession.objects.bulk_create(
+            [AgentSession(owner=owner, session_key=key) for key in set(session_keys.values())],
+            ignore_conflicts=True,
+        )
+        sessions = dict(
+            AgentSession.objects.filter(
+                owner=owner,
+                session_key__in=set(session_keys.values()),
+            ).values_list("session_key", "pk")
+        )
+        runs = AgentRun.objects.bulk_create(
+            [
+                AgentRun(
+                    session_id=sessions[session_keys[item.item_id]],
+                    owner=owner,
+                    agent_key=item.agent_key,
+                    input_payload=item.input,
+                    metadata={
+                        BATCH_KEY: batch,
+                        BATCH_ITEM_KEY: item.item_id,
+                        RUN_QUEUE_KEY: BATCH_QUEUE,
+                    },
+                    task_id="",
+                )
+                for item in items
+            ]
+        )
+    for run in runs:
+        RUNS_CREATED.labels(run.agent_key).inc()
+    return runs
+
+
+def result_line(run: AgentRun) -> dict[str, Any]:
+    seconds = None
+    if run.started_at and run.finished_at:
+        seconds = round((run.finished_at - run.started_at).total_seconds(), 3)
+    return {
+        "id": run.metadata.get(BATCH_ITEM_KEY),
+        "run_id": str(run.pk),
+        "agent_key": run.agent_key,
+        "status": run.status,
+        "output": run.final_output,
+        "error": run.error,
+        "seconds": seconds,
+    }
+
+
+@dataclass
+class BatchStats:
+    created: int = 0
+    completed: int = 0
+    failed: int = 0
+    resumed: int = 0
+
+
+@dataclass
+class BatchRunner:
+    """Feed a batch through the task backend with at most ``window`` runs in flight.
+
+    Runs are created only as window slots free up: ``agentic_django`` hands
+    any pending, unqueued run to the next free worker, so creating the whole
+    batch up front would bypass the window.
+    """
+
+    owner: Any
+    batch: str
+    output: TextIO
+    checkpoint: Checkpoint
+    window: int = DEFAULT_BATCH_WINDOW
+    poll_interval: float = 1.0
+    enqueue: Callable[[str], None] = enqueue_agent_run
+    sleep: Callable[[float], None] = time.sleep
+    stats: BatchStats = field(default_factory=BatchStats)
+    in_flight: set[str] = field(default_factory=set)
+
+    def resume(self, done: set[str]) -> None:
+        """Pick up runs from an earlier attempt whose results were not written."""
+
+        runs = batch_runs(self.owner, self.batch)
+        for pk, item_id, status, task_id in runs.values_list(
+            "pk", "metadata__batch_item", "status", "task_id"
+        ):
+            if str(item_id) in done:
+                continue
+            self.in_flight.add(str(pk))
+            self.stats.resumed += 1
+            # Created but never handed to the backend before the interruption.
+            if status == AgentRun.Status.PENDING and not task_id:
+                self.enqueue(str(pk))
+
+    def run(self, items: Iterator[BatchItem]) -> BatchStats:
+        items = islice(items, self.checkpoint.consumed, None)
+        exhausted = False
+        while True:
+            if not exhausted and len(self.in_flight) < self.window:
+                chunk = list(islice(items, self.window - len(self.in_flight)))
+                exhausted = not chunk
+                if chunk:
+                    self._start(chunk)
+                    continue
+            if not self.in_flight:
+                return self.stats
+            if not self._collect():
+                self.sleep(self.poll_interval)
+
+    def _start(self, chunk: list[BatchItem]) -> None:
+        runs = create_runs(chunk, owner=self.owner, batch=self.batch)
+        self.checkpoint.consumed += len(chunk)
+        self.checkpoint.save()
+        self.stats.created += len(runs)
+        for run in runs:
+            self.in_flight.add(str(run.pk))
+            self.enqueue(str(run.pk))
+
+    def _collect(self) -> int:
+        finished = AgentRun.objects.filter(
+            pk__in=self.in_flight,
+            status__in=FINISHED_STATUSES,
+        )
+        count = 0
+        for run in finished:
+            self.output.write(json.dumps(result_line(run)) + "\n")
+            self.in_flight.discard(str(run.pk))
+            if run.status == AgentRun.Status.COMPLETED:
+                self.stats.completed += 1
+            else:
+                self.stats.failed += 1
+            count += 1
+        if count:
+            self.output.flush()
+        return count
+
+
+__all__ = [
+    "BatchItem",
+    "BatchRunner",
+    "BatchStats",
+    "Checkpoint",
+    "batch_runs",
+    "batch_window",
+    "create_runs",
+    "read_items",
+    "result_line",
+    "written_ids",
+]
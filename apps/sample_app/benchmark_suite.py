@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import json
+import platform
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from agentic_django.models import AgentSession, AgentSessionItem
+from sample_app import tools
+from sample_app.admission import (
+    Bucket,
+    MemoryRateLimiter,
+    admission_backend,
+    admit_run,
+    get_rate_limiter,
+)
+from sample_app.benchmarks import sample_markdown, time_call, unclosed_markdown
+from sample_app.markdown import render_markdown
+from sample_app.prompts import build_prompt_bundle, prompt_names, prompt_store
+from sample_app.render_cache import get_render_cache
+from sample_app.templatetags.sample_app_tags import (
+    pretty_json,
+    render_output,
+    session_item_context,
+)
+from sample_app.tool_cache import get_tool_cache
+
+DEFAULT_ITEM_COUNTS = (10, 100, 1000, 10000)
+DEFAULT_THRESHOLD = 0.2
+RESULTS_VERSION = 1
+
+_FLIGHT_NUMBERS = ["DL123", "UA456", "AA789", "B6512", "AS318"]
+
+
+def sample_session_items(count: int) -> list[dict[str, Any]]:
+    """Return ``count`` distinct payloads cycling through tool-using turns.
+
+    Each turn numbers its messages and call ids, so no two payloads share a
+    render cache key and cold benchmarks miss on every item.
+    """
+
+    flights = tools._search_route.__wrapped__("SFO", "JFK", "2026-05-01")
+    output = json.dumps(flights)
+    answer = sample_markdown(600)
+
+    def _turn(number: int) -> list[dict[str, Any]]:
+        call_id = f"call-{number}"
+        return [
+            {"role": "user", "content": f"Find me a flight from SFO to JFK on May 1 (#{number})."},
+            {
+                "type": "function_call",
+                "call_id": call_id,
+                "name": "find_flight",
+                "arguments": '{"origin": "SFO", "destination": "JFK", "travel_date": "2026-05-01"}',
+            },
+            {"type": "function_call_output", "call_id": call_id, "output": output},
+            {
+                "role": "assistant",
+                "type": "message",
+                "content": [{"type": "output_text", "text": f"Options #{number}:\n\n{answer}"}],
+            },
+        ]
+
+    items: list[dict[str, Any]] = []
+    number = 1
+    while len(items) < count:
+        items.extend(_turn(number))
+        number += 1
+    return items[:count]
+
+
+def _payload_benchmarks(repeat: int) -> dict[str, dict[str, float]]:
+    payloads = sample_session_items(40)
+    tool_output = json.loads(payloads[2]["output"])
+    markdown = sample_markdown(10 * 1024)
+    unclosed = unclosed_markdown(30 * 1024)
+    render_cache = get_render_cache()
+
+    def _cold_item_contexts() -> None:
+        render_cache.clear()
+        for payload in payloads:
+            session_item_context(payload)
+
+    def _warm_item_contexts() -> None:
+        for payload in payloads:
+            session_item_context(payload)
+
+    results = {
+        "render_markdown_10kb": time_call(lambda: render_markdown(markdown), repeat),
+        "render_markdown_unclosed_30kb": time_call(lambda: render_markdown(unclosed), repeat),
+        "session_item_context_cold_x40": time_call(_cold_item_contexts, repeat),
+    }
+    results["session_item_context_warm_x40"] = time_call(_warm_item_contexts, repeat)
+    results["pretty_json"] = time_call(lambda: pretty_json(tool_output), repeat)
+    results["render_output_json"] = time_call(lambda: render_output(tool_output), repeat)
+    results["render_output_markdown"] = time_call(lambda: render_output(markdown), repeat)
+    return results
+
+
+def _tool_benchmarks(repeat: int) -> dict[str, dict[str, float]]:
+    tool_cache = get_tool_cache()
+
+    def _find_flight_uncached() -> None:
+        tools._search_route.__wrapped__("SFO", "JFK", "2026-05-01")
+
+    def _find_flight_cached() -> None:
+        tools._search_route("SFO", "JFK", "2026-05-01")
+
+    def _get_flight_price_uncached() -> None:
+        for flight_number in _FLIGHT_NUMBERS:
+            tools._quote_flight.__wrapped__(flight_number)
+
+    def _book_flight() -> None:
+        for flight_number in _FLIGHT_NUMBERS:
+            tools._book(flight_number)
+
+    tool_cache.clear()
+    return {
+        "find_flight_uncached": time_call(_find_flight_uncached, repeat),
+        "find_flight_cached": time_call(_find_flight_cached, repeat),
+        "get_flight_price_uncached_x5": time_call(_get_flight_price_uncached, repeat),
+        "book_flight_x5": time_call(_book_flight, repeat),
+    }
+
+
+def _prompt_benchmarks(repeat: int) -> dict[str, dict[str, float]]:
+    names = prompt_names()
+
+    def _warm_lookup() -> None:
+        for name in names:
+            prompt_store.get(name)
+
+    return {
+        "prompt_bundle_compile": time_call(lambda: build_prompt_bundle(names), repeat),
+        "prompt_lookup_warm": time_call(_warm_lookup, repeat),
+    }
+
+
+def _admission_benchmarks(repeat: int) -> dict[str, dict[str, float]]:
+    # Buckets large enough that every call is admitted and takes the full path.
+    buckets = [
+        Bucket(f"bench:{uuid.uuid4().hex[:8]}:user", 10**9, 10**9),
+        Bucket(f"bench:{uuid.uuid4().hex[:8]}:global", 10**9, 10**9),
+    ]
+
+    def _acquire_x100(limiter: Any) -> Callable[[], None]:
+        def _acquire() -> None:
+            for _ in range(100):
+                limiter.acquire(buckets)
+
+        return _acquire
+
+    results = {"admission_memory_x100": time_call(_acquire_x100(MemoryRateLimiter()), repeat)}
+    if admission_backend() == "redis":
+        results["admission_redis_x100"] = time_call(_acquire_x100(get_rate_limiter()), repeat)
+    return results
+
+
+@contextmanager
+def _rolled_back() -> Iterator[None]:
+    # View fixtures are written inside a transaction that is always rolled
+    # back, so benchmarking never leaves rows in the configured database. The
+    # test client's host must be allowed outside the test runner too.
+    allowed_hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+    with override_settings(ALLOWED_HOSTS=allowed_hosts), transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def _view_benchmarks(repeat: int, item_counts: list[int]) -> dict[str, dict[str, float]]:
+    results: dict[str, dict[str, float]] = {}
+    with _rolled_back():
+        user = get_user_model().objects.create_user(username=f"bench-{uuid.uuid4().hex[:12]}")
+        client = Client()
+        client.force_login(user)
+        for count in item_counts:
+            session = AgentSession.objects.create(
+                owner=user,
+                session_key=f"bench-{count}-{uuid.uuid4().hex[:8]}",
+            )
+            AgentSessionItem.objects.bulk_create(
+                (
+                    AgentSessionItem(
+                        session=session,
+                        sequence=index + 1,
+                        payload=payload,
+                    )
+                    for index, payload in enumerate(sample_session_items(count))
+                ),
+                batch_size=1000,
+            )
+            session_items_url = reverse(
+                "agents:session-items",
+                kwargs={"session_key": session.session_key},
+            )
+            conversation_url = reverse(
+                "sample_app:conversation-items",
+                kwargs={"session_key": session.session_key},
+            )
+            if count == item_counts[0]:
+                with override_settings(
+                    SAMPLE_APP_ADMISSION_USER_RATE="1000000/s",
+                    SAMPLE_APP_ADMISSION_GLOBAL_RATE="1000000/s",
+                ):
+                    results["admission_check"] = time_call(
+                        lambda: admit_run(user, session.session_key),
+                        repeat,
+                    )
+            results[f"session_items_view_{count}"] = time_call(
+                _get(client, session_items_url, HTTP_HX_REQUEST="true"),
+                repeat,
+            )
+            results[f"conversation_items_view_{count}"] = time_call(
+                _get(client, conversation_url),
+                repeat,
+            )
+    return results
+
+
+def _get(client: Client, url: str, **headers: str) -> Callable[[], None]:
+    def _request() -> None:
+        response = client.get(url, **headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {url} returned {response.status_code}")
+
+    return _request
+
+
+def run_benchmarks(
+    repeat: int = 3,
+    item_counts: list[int] | None = None,
+    include_views: bool = True,
+) -> dict[str, Any]:
+    """Time the rendering, tool, prompt, admission, and conversation view hot paths.
+
+    Everything runs offline against local data; the returned document is what
+    ``manage.py bench`` writes as JSON.
+    """
+
+    if repeat < 1:
+        raise ValueError("repeat must be >= 1")
+    counts = list(item_counts or DEFAULT_ITEM_COUNTS)
+    results: dict[str, dict[str, float]] = {}
+    results.update(_payload_benchmarks(repeat))
+    results.update(_tool_benchmarks(repeat))
+    results.update(_prompt_benchmarks(repeat))
+    results.update(_admission_benchmarks(repeat))
+    if include_views:
+        results.update(_view_benchmarks(repeat, counts))
+    return {
+        "version": RESULTS_VERSION,
+        "created_at": timezone.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def find_regressions(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[dict[str, Any]]:
+    """Return benchmarks whose median grew by more than ``threshold`` (0.2 = 20%)."""
+
+    regressions: list[dict[str, Any]] = []
+    baseline_results = baseline.get("results", {})
+    for name, timing in sorted(current.get("results", {}).items()):
+        previous = baseline_results.get(name)
+        if not previous or previous["median_ms"] <= 0:
+            continue
+        ratio = timing["median_ms"] / previous["median_ms"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                {
+                    "name": name,
+                    "baseline_ms": previous["median_ms"],
+                    "current_ms": timing["median_ms"],
+                    "ratio": ratio,
+                }
+            )
+    return regressions
+
+
+__all__ = [
+    "DEFAULT_ITEM_COUNTS",
+    "DEFAULT_THRESHOLD",
+    "find_regressions",
+    "run_benchmarks",
+    "sample_session_items",
+]
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+import statistics
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from django.conf import settings
+from django.db.utils import ConnectionHandler
+
+SIZE_UNITS = {"B": 1, "KB": 1024, "MB": 1024 * 1024}
+
+_MARKDOWN_BLOCKS = [
+    "## Flight options\n",
+    "Here are the **best fares** I found for *your* dates from SFO to JFK.\n",
+    "- DL123 departs at 08:15 and arrives at 16:40\n"
+    "- UA456 departs at 10:30 with _one_ stop\n"
+    "  - Layover in ORD for 55 minutes\n",
+    "1. Compare prices\n2. Pick a fare class\n3. Confirm the booking\n",
+    "```json\n{\"flight_number\": \"DL123\", \"amount\": 412.95}\n```\n",
+    "Prices can change; I will re-check with `get_flight_price` before booking.\n",
+]
+
+
+def parse_size(value: str) -> int:
+    """Parse sizes such as ``1KB`` or ``100KB`` into a byte count."""
+
+    match = re.fullmatch(r"\s*(\d+)\s*([KM]?B)?\s*", value.upper())
+    if not match:
+        raise ValueError(f"Invalid size: {value!r}")
+    return int(match.group(1)) * SIZE_UNITS[match.group(2) or "B"]
+
+
+def sample_markdown(size_bytes: int) -> str:
+    """Return representative assistant markdown of roughly ``size_bytes``."""
+
+    parts: list[str] = []
+    total = 0
+    index = 0
+    while total < size_bytes:
+        block = _MARKDOWN_BLOCKS[index % len(_MARKDOWN_BLOCKS)]
+        parts.append(block)
+        parts.append("\n")
+        total += len(block) + 1
+        index += 1
+    return "".join(parts)
+
+
+def unclosed_markdown(size_bytes: int) -> str:
+    """Return one line of roughly ``size_bytes`` full of emphasis that never closes.
+
+    The worst case for a backtracking span matcher: every ``_``, ``*``, and
+    ``**`` opens a span that no later delimiter can close.
+    """
+
+    unit = "_a *a **a "
+    return (unit * (size_bytes // len(unit) + 1))[:size_bytes]
+
+
+def time_call(func: Callable[[], Any], repeat: int) -> dict[str, float]:
+    """Time ``func`` ``repeat`` times and summarize the samples in milliseconds."""
+
+    samples: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "min_ms": min(samples),
+        "median_ms": statistics.median(samples),
+        "max_ms": max(samples),
+    }
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def sqlite_contention(
+    path: str,
+    *,
+    tuned: bool,
+    writers: int = 4,
+    readers: int = 4,
+    operations: int = 50,
+    busy_timeout_ms: int = 5000,
+) -> dict[str, float]:
+    """Hammer the SQLite file at ``path`` with concurrent writers and readers.
+
+    Writers mimic a run update: read, then write, in one transaction.
+    Connections come from Django's SQLite backend. The untuned configuration
+    uses no options, which is SQLite's default (rollback journal, deferred
+    transactions), where a writer that cannot upgrade its read lock fails with
+    "database is locked" regardless of the busy timeout. The tuned one uses the
+    project's ``SQLITE_OPTIONS``, the same ``init_command`` and
+    ``transaction_mode`` as ``DATABASES``. ``busy_timeout_ms`` applies to both.
+    """
+
+    options = dict(settings.SQLITE_OPTIONS) if tuned else {}
+    database = ConnectionHandler(
+        {"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": path, "OPTIONS": options}}
+    )["default"]
+    # Also reads ``init_command`` and ``transaction_mode`` from the options.
+    params = database.get_connection_params()
+    begin = f"BEGIN {database.transaction_mode or 'DEFERRED'}"
+
+    def _connect() -> sqlite3.Connection:
+        # Runs the configured init commands, as Django does for every connection.
+        connection = database.get_new_connection(params)
+        connection.isolation_level = None
+        connection.execute(f"PRAGMA busy_timeout={busy_timeout_ms}")
+        return connection
+
+    setup = _connect()
+    try:
+        if not tuned:
+            # WAL persists in the file, so reset it when reusing a tuned one.
+            setup.execute("PRAGMA journal_mode=DELETE")
+        setup.execute("DROP TABLE IF EXISTS bench_run")
+        setup.execute("CREATE TABLE bench_run (id INTEGER PRIMARY KEY, payload TEXT)")
+    finally:
+        setup.close()
+
+    lock = threading.Lock()
+    latencies: list[float] = []
+    errors = 0
+
+    def _write(connection: sqlite3.Connection) -> None:
+        connection.execute(begin)
+        try:
+            connection.execute("SELECT COUNT(*) FROM bench_run").fetchone()
+            connection.execute("INSERT INTO bench_run (payload) VALUES (?)", ("x" * 256,))
+            connection.execute("COMMIT")
+        except sqlite3.OperationalError:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _read(connection: sqlite3.Connection) -> None:
+        connection.execute("SELECT id, payload FROM bench_run ORDER BY id DESC LIMIT 20").fetchall()
+
+    def _worker(operation: Callable[[sqlite3.Connection], None]) -> None:
+        nonlocal errors
+        connection = _connect()
+        try:
+            for _ in range(operations):
+                started = time.perf_counter()
+                try:
+                    operation(connection)
+                except sqlite3.OperationalError:
+                    with lock:
+                        errors += 1
+                    continue
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    latencies.append(elapsed)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=_worker, args=(_write,)) for _ in range(writers)]
+    threads += [threading.Thread(target=_worker, args=(_read,)) for _ in range(readers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        "operations": (writers + readers) * operations,
+        "errors": errors,
+        "p50_ms": _percentile(latencies, 0.5),
+        "p99_ms": _percentile(latencies, 0.99),
+        "total_ms": (time.perf_counter() - started) * 1000,
+    }
+
+
+__all__ = [
+    "parse_size",
+    "sample_markdown",
+    "unclosed_markdown",
+    "sqlite_contention",
+    "time_call",
+]
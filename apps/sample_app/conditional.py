@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Callable
+from functools import wraps
+from typing import Any
+
+from django.db.models import Count, Max
+from django.http import HttpRequest, HttpResponseBase
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from agentic_django.models import AgentRun, AgentSession
+
+EtagFunc = Callable[..., str | None]
+
+
+def _etag(request: HttpRequest, *version: Any) -> str:
+    # The query string and HX-Request pick the representation; the version
+    # parts say whether the underlying rows changed.
+    parts = [request.get_full_path(), bool(getattr(request, "htmx", False)), *version]
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def run_fragment_etag(request: HttpRequest, run_id: Any) -> str | None:
+    """Version a run fragment by the run's status and ``updated_at``, in one query."""
+
+    if not request.user.is_authenticated:
+        return None
+    version = (
+        AgentRun.objects.filter(id=run_id, owner=request.user)
+        .values_list("status", "updated_at")
+        .first()
+    )
+    return _etag(request, *version) if version is not None else None
+
+
+def session_items_etag(request: HttpRequest, session_key: str) -> str | None:
+    """Version a session's items by their highest sequence and count, in one query.
+
+    The count catches deletions (purges, clearing a session) that leave the
+    highest sequence unchanged.
+    """
+
+    if not request.user.is_authenticated:
+        return None
+    version = (
+        AgentSession.objects.filter(owner=request.user, session_key=session_key)
+        .annotate(last_sequence=Max("items__sequence"), item_count=Count("items"))
+        .values_list("pk", "last_sequence", "item_count")
+        .first()
+    )
+    return _etag(request, *version) if version is not None else None
+
+
+def conditional_poll(etag_func: EtagFunc) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Answer unchanged polls with 304 before the view renders anything.
+
+    Wraps ``condition(etag_func=...)`` and marks responses ``private,
+    no-cache`` so browsers keep the fragment and revalidate it with
+    ``If-None-Match``; HTMX then receives the cached body on a 304.
+    Anonymous requests and missing objects get no ETag and reach the view,
+    which answers them as before.
+    """
+
+    def decorator(view: Callable[..., Any]) -> Callable[..., Any]:
+        conditional_view = condition(etag_func=etag_func)(view)
+
+        @wraps(view)
+        def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponseBase:
+            response = conditional_view(request, *args, **kwargs)
+            if response.has_header("ETag"):
+                patch_cache_control(response, private=True, no_cache=True)
+                patch_vary_headers(response, ["HX-Request"])
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+__all__ = ["conditional_poll", "run_fragment_etag", "session_items_etag"]
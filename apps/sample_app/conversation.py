@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from django.conf import settings
+
+from agentic_django.models import AgentSession, AgentSessionItem
+
+DEFAULT_PAGE_SIZE = 50
+
+
+def conversation_page_size() -> int:
+    return getattr(settings, "SAMPLE_APP_CONVERSATION_PAGE_SIZE", DEFAULT_PAGE_SIZE)
+
+
+def conversation_page(
+    session: AgentSession,
+    before: int | None = None,
+    page_size: int | None = None,
+) -> tuple[list[AgentSessionItem], int | None]:
+    """Return up to ``page_size`` items older than ``before``, oldest first.
+
+    Pages are keyset-paginated on ``sequence`` through the (session, sequence)
+    index, so every page costs the same regardless of how deep it is. The
+    second value is the cursor for the next earlier page, or ``None`` when the
+    start of the conversation has been reached.
+    """
+
+    page_size = page_size or conversation_page_size()
+    queryset = AgentSessionItem.objects.filter(session=session)
+    if before is not None:
+        queryset = queryset.filter(sequence__lt=before)
+    newest_first = list(queryset.order_by("-sequence")[: page_size + 1])
+    has_more = len(newest_first) > page_size
+    items = newest_first[:page_size][::-1]
+    return items, items[0].sequence if has_more else None
+
+
+__all__ = ["conversation_page", "conversation_page_size"]
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+from agents.stream_events import RawResponsesStreamEvent, StreamEvent
+from django.conf import settings
+from django.db.models import Max
+
+from agentic_django.models import AgentEvent, AgentRun, AgentSessionItem
+from agentic_django.serializers import StreamEventSerializer
+
+TEXT_DELTA_EVENT = "response.output_text.delta"
+RAW_RESPONSE_EVENT = "raw_response_event"
+TERMINAL_STATUSES = frozenset({AgentRun.Status.COMPLETED, AgentRun.Status.FAILED})
+KEEPALIVE_SECONDS = 15.0
+DEFAULT_DELTA_INTERVAL = 0.25
+
+
+class DeltaStreamEventSerializer(StreamEventSerializer):
+    """Package event serializer that also keeps output text deltas, coalesced.
+
+    The package serializer drops every raw model event. Keeping only the text
+    deltas lets the run stream forward tokens without storing full responses.
+    One event is stored per ``SAMPLE_APP_RUN_STREAM_DELTA_INTERVAL`` seconds of
+    text rather than one per token; text still pending is stored with the next
+    other raw model event, such as the ``output_text.done`` ending each part.
+    """
+
+    def __init__(
+        self,
+        delta_interval: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if delta_interval is None:
+            delta_interval = getattr(
+                settings, "SAMPLE_APP_RUN_STREAM_DELTA_INTERVAL", DEFAULT_DELTA_INTERVAL
+            )
+        self.delta_interval = delta_interval
+        self._clock = clock
+        self._pending: list[str] = []
+        self._pending_since = 0.0
+
+    def serialize(self, value: StreamEvent) -> dict[str, Any] | None:
+        if isinstance(value, RawResponsesStreamEvent):
+            data = value.data
+            if getattr(data, "type", None) == TEXT_DELTA_EVENT:
+                if not self._pending:
+                    self._pending_since = self._clock()
+                self._pending.append(getattr(data, "delta", ""))
+                if self._clock() - self._pending_since < self.delta_interval:
+                    return None
+            return self._flush()
+        return super().serialize(value)
+
+    def _flush(self) -> dict[str, Any] | None:
+        delta = "".join(self._pending)
+        self._pending.clear()
+        if not delta:
+            return None
+        return {"type": RAW_RESPONSE_EVENT, "delta": delta}
+
+
+def format_sse(event: str, data: dict[str, Any]) -> str:
+    """Return one Server-Sent Events frame."""
+
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def run_event_stream(
+    run: AgentRun,
+    *,
+    poll_interval: float,
+    timeout: float,
+    max_poll_interval: float | None = None,
+) -> AsyncIterator[str]:
+    """Yield SSE frames for run status, new session items, and text deltas.
+
+    Workers write runs, items, and events to the database from other processes,
+    so the stream watches those tables with cheap indexed reads and only sends
+    frames when something changed. Reads back off from ``poll_interval`` to
+    ``max_poll_interval`` while nothing changes, and events are not read while
+    the run is still pending. The stream ends when the run is terminal or
+    ``timeout`` elapses; browsers reconnect on their own after a timeout.
+    """
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    last_write = loop.time()
+    last_status: str | None = None
+    last_item_sequence: int | None = None
+    last_event_sequence = 0
+    if max_poll_interval is None:
+        max_poll_interval = poll_interval
+    interval = poll_interval
+
+    yield f"retry: {int(max(poll_interval, 1.0) * 1000)}\n\n"
+    while True:
+        status = await (
+            AgentRun.objects.filter(pk=run.pk).values_list("status", flat=True).afirst()
+        )
+        if status is None:
+            yield format_sse("end", {"reason": "deleted"})
+            return
+
+        frames: list[str] = []
+        if status != AgentRun.Status.PENDING:
+            async for sequence, payload in (
+                AgentEvent.objects.filter(
+                    run_id=run.pk,
+                    event_type=RAW_RESPONSE_EVENT,
+                    sequence__gt=last_event_sequence,
+                )
+                .order_by("sequence")
+                .values_list("sequence", "payload")
+            ):
+                last_event_sequence = sequence
+                delta = payload.get("delta") if isinstance(payload, dict) else None
+                if delta:
+                    frames.append(format_sse("delta", {"delta": delta}))
+
+        aggregate = await AgentSessionItem.objects.filter(
+            session_id=run.session_id,
+        ).aaggregate(last_sequence=Max("sequence"))
+        item_sequence = aggregate["last_sequence"] or 0
+        if item_sequence != last_item_sequence:
+            last_item_sequence = item_sequence
+            frames.append(format_sse("items", {"last_sequence": item_sequence}))
+
+        if status != last_status:
+            last_status = status
+            frames.append(format_sse("status", {"status": status}))
+
+        if frames:
+            last_write = loop.time()
+            interval = poll_interval
+            yield "".join(frames)
+        else:
+            interval = min(interval * 2, max_poll_interval)
+            if loop.time() - last_write >= KEEPALIVE_SECONDS:
+                last_write = loop.time()
+                yield ": keepalive\n\n"
+
+        if status in TERMINAL_STATUSES:
+            yield format_sse("end", {"reason": status})
+            return
+        if loop.time() >= deadline:
+            return
+        await asyncio.sleep(interval)
+
+
+__all__ = ["DeltaStreamEventSerializer", "format_sse", "run_event_stream"]
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from datetime import datetime, time
+from typing import Any
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from agentic_django.models import AgentSessionItem
+from sample_app.purge import RETIRED_AT_KEY
+
+DEFAULT_EXPORT_CHUNK_SIZE = 500
+EXPORT_FIELDS = ("session__session_key", "sequence", "created_at", "payload")
+
+
+def export_chunk_size() -> int:
+    return getattr(settings, "SAMPLE_APP_EXPORT_CHUNK_SIZE", DEFAULT_EXPORT_CHUNK_SIZE)
+
+
+def parse_bound(value: str, name: str) -> datetime:
+    """Parse an ISO date or datetime; dates mean midnight in the current timezone."""
+
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"{name} must be an ISO date or datetime")
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_items(
+    *,
+    owner: Any = None,
+    session_keys: Iterable[str] = (),
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> QuerySet[AgentSessionItem]:
+    """Session items matching the filters, in (session, sequence) order.
+
+    ``since`` is inclusive and ``until`` exclusive, both on the item's
+    ``created_at``. Retired sessions, whose items are waiting to be purged,
+    are left out. The ordering walks the (session, sequence) index.
+    """
+
+    items = AgentSessionItem.objects.exclude(session__metadata__has_key=RETIRED_AT_KEY)
+    if owner is not None:
+        items = items.filter(session__owner=owner)
+    session_keys = list(session_keys)
+    if session_keys:
+        items = items.filter(session__session_key__in=session_keys)
+    if since is not None:
+        items = items.filter(created_at__gte=since)
+    if until is not None:
+        items = items.filter(created_at__lt=until)
+    return items.order_by("session_id", "sequence")
+
+
+def ndjson_chunks(
+    items: QuerySet[AgentSessionItem],
+    chunk_size: int | None = None,
+) -> Iterator[bytes]:
+    """Encode ``items`` as NDJSON, one bytes chunk per ``chunk_size`` rows.
+
+    Rows are read with ``.iterator()`` as plain values, so memory stays at
+    one chunk however long the history is.
+    """
+
+    chunk_size = chunk_size or export_chunk_size()
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    lines: list[str] = []
+    rows = items.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    for session_key, sequence, created_at, payload in rows:
+        record = {
+            "session_key": session_key,
+            "sequence": sequence,
+            "created_at": created_at,
+            "payload": payload,
+        }
+        lines.append(encoder.encode(record))
+        if len(lines) >= chunk_size:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+__all__ = [
+    "export_chunk_size",
+    "export_items",
+    "ndjson_chunks",
+    "parse_bound",
+]
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+
+from sample_app.benchmark_suite import (
+    DEFAULT_ITEM_COUNTS,
+    DEFAULT_THRESHOLD,
+    find_regressions,
+    run_benchmarks,
+)
+
+
+class Command(BaseCommand):
+    help = "Run the offline benchmark suite, write JSON results, and flag regressions."
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument("--output", type=str, default="build/bench.json")
+        parser.add_argument("--baseline", type=str, help="Earlier results to compare against.")
+        parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument(
+            "--items",
+            type=str,
+            default=",".join(str(count) for count in DEFAULT_ITEM_COUNTS),
+            help="Comma-separated session sizes for the view benchmarks.",
+        )
+        parser.add_argument(
+            "--skip-views",
+            action="store_true",
+            default=False,
+            help="Skip benchmarks that need a migrated database.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["threshold"] < 0:
+            raise CommandError("threshold must be >= 0")
+        try:
+            item_counts = [int(count) for count in options["items"].split(",") if count.strip()]
+            results = run_benchmarks(
+                repeat=options["repeat"],
+                item_counts=item_counts,
+                include_views=not options["skip_views"],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(f"{'benchmark':<36} {'median ms':>10} {'max ms':>10}")
+        for name, timing in results["results"].items():
+            self.stdout.write(f"{name:<36} {timing['median_ms']:>10.3f} {timing['max_ms']:>10.3f}")
+
+        output_path = Path(options["output"])
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(results, indent=2, sort_keys=True), encoding="utf-8")
+        self.stdout.write(f"Wrote {len(results['results'])} results to {output_path}.")
+
+        if not options["baseline"]:
+            return
+        try:
+            baseline = json.loads(Path(options["baseline"]).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            raise CommandError(f"Could not read baseline: {exc}") from exc
+        regressions = find_regressions(baseline, results, options["threshold"])
+        for regression in regressions:
+            self.stdout.write(
+                f"REGRESSION {regression['name']}: {regression['baseline_ms']:.3f} ms -> "
+                f"{regression['current_ms']:.3f} ms ({regression['ratio']:.2f}x)"
+            )
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} benchmarks regressed by more than "
+                f"{options['threshold']:.0%}."
+            )
+        self.stdout.write(f"No regressions above {options['threshold']:.0%}.")
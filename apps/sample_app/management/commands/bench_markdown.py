@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import re
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.html import escape
+
+from sample_app.benchmarks import (
+    parse_size,
+    sample_markdown,
+    time_call,
+    unclosed_markdown,
+)
+from sample_app.markdown import render_markdown
+
+DEFAULT_SIZES = "1KB,100KB,1MB"
+
+_LEGACY_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+_LEGACY_ITALIC_RE = re.compile(r"\*(.+?)\*")
+_LEGACY_ITALIC_UNDERSCORE_RE = re.compile(r"_(.+?)_")
+
+
+def _legacy_format_inline(text: str) -> str:
+    escaped = escape(text)
+    escaped = _LEGACY_BOLD_RE.sub(r"<strong>\1</strong>", escaped)
+    escaped = _LEGACY_ITALIC_RE.sub(r"<em>\1</em>", escaped)
+    escaped = _LEGACY_ITALIC_UNDERSCORE_RE.sub(r"<em>\1</em>", escaped)
+    return escaped
+
+
+def legacy_render_markdown(text: str) -> str:
+    """The line-by-line renderer that ``sample_app.markdown`` replaced.
+
+    Kept only as a benchmark baseline.
+    """
+
+    lines = text.splitlines()
+    html_parts: list[str] = []
+    paragraph_lines: list[str] = []
+    current_list: str | None = None
+
+    def flush_paragraph() -> None:
+        if paragraph_lines:
+            formatted = "<br>".join(_legacy_format_inline(line) for line in paragraph_lines)
+            html_parts.append(f"<p>{formatted}</p>")
+            paragraph_lines.clear()
+
+    def close_list() -> None:
+        nonlocal current_list
+        if current_list:
+            html_parts.append(f"</{current_list}>")
+            current_list = None
+
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            flush_paragraph()
+            close_list()
+            continue
+
+        ul_match = re.match(r"^[-*]\s+(.*)$", stripped)
+        ol_match = re.match(r"^\d+\.\s+(.*)$", stripped)
+        if ul_match or ol_match:
+            flush_paragraph()
+            list_type = "ul" if ul_match else "ol"
+            item_text = ul_match.group(1) if ul_match else ol_match.group(1)
+            if current_list != list_type:
+                close_list()
+                html_parts.append(f"<{list_type}>")
+                current_list = list_type
+            html_parts.append(f"<li>{_legacy_format_inline(item_text)}</li>")
+            continue
+
+        close_list()
+        paragraph_lines.append(line)
+
+    flush_paragraph()
+    close_list()
+    return "\n".join(html_parts) if html_parts else "<p></p>"
+
+
+class Command(BaseCommand):
+    help = "Compare the markdown renderer against the legacy line-by-line renderer."
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument("--sizes", type=str, default=DEFAULT_SIZES)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        repeat = options["repeat"]
+        if repeat < 1:
+            raise CommandError("repeat must be >= 1")
+        try:
+            sizes = [parse_size(size) for size in options["sizes"].split(",") if size.strip()]
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(
+            f"{'kind':>9} {'input':>10} {'legacy ms':>12} {'current ms':>12} {'speedup':>8}"
+        )
+        for size in sizes:
+            # "unclosed" is the adversarial case: a single line of emphasis
+            # delimiters that never close.
+            for kind, build in (("sample", sample_markdown), ("unclosed", unclosed_markdown)):
+                text = build(size)
+                legacy = time_call(lambda: legacy_render_markdown(text), repeat)
+                current = time_call(lambda: render_markdown(text), repeat)
+                median = current["median_ms"]
+                speedup = legacy["median_ms"] / median if median else 0.0
+                self.stdout.write(
+                    f"{kind:>9} {len(text):>10} {legacy['median_ms']:>12.2f} "
+                    f"{median:>12.2f} {speedup:>7.2f}x"
+                )
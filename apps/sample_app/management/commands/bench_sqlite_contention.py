@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from sample_app.benchmarks import sqlite_contention
+
+
+class Command(BaseCommand):
+    help = "Compare lock errors and latency for default and tuned SQLite settings."
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument("--writers", type=int, default=4)
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--operations", type=int, default=50)
+        parser.add_argument(
+            "--busy-timeout-ms",
+            type=int,
+            default=getattr(settings, "SQLITE_BUSY_TIMEOUT_MS", 5000),
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["operations"] < 1:
+            raise CommandError("operations must be >= 1")
+        if options["writers"] < 0 or options["readers"] < 0:
+            raise CommandError("writers and readers must be >= 0")
+
+        self.stdout.write(
+            f"{'config':>8} {'ops':>6} {'errors':>7} {'p50 ms':>9} {'p99 ms':>9} {'total ms':>10}"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            for label, tuned in (("default", False), ("tuned", True)):
+                result = sqlite_contention(
+                    str(Path(directory) / f"{label}.sqlite3"),
+                    tuned=tuned,
+                    writers=options["writers"],
+                    readers=options["readers"],
+                    operations=options["operations"],
+                    busy_timeout_ms=options["busy_timeout_ms"],
+                )
+                self.stdout.write(
+                    f"{label:>8} {result['operations']:>6} {result['errors']:>7} "
+                    f"{result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['total_ms']:>10.1f}"
+                )
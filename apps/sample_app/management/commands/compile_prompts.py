@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from sample_app.prompts import PromptValidationError, build_prompt_bundle, prompt_names
+
+
+class Command(BaseCommand):
+    help = "Validate every *.prompt.md file and write a precompiled prompt bundle."
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument("--output", type=str)
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            default=False,
+            help="Validate prompts without writing a bundle.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        names = prompt_names()
+        if not names:
+            raise CommandError("No *.prompt.md files found.")
+        try:
+            bundle = build_prompt_bundle(names)
+        except PromptValidationError as exc:
+            raise CommandError(str(exc)) from exc
+
+        if options["check"]:
+            self.stdout.write(f"Validated {len(names)} prompts.")
+            return
+
+        output = options.get("output") or getattr(settings, "SAMPLE_APP_PROMPT_BUNDLE", None)
+        if not output:
+            raise CommandError("Pass --output or set SAMPLE_APP_PROMPT_BUNDLE.")
+        output_path = Path(output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(bundle, indent=2, sort_keys=True), encoding="utf-8")
+        self.stdout.write(f"Wrote {len(names)} prompts to {output_path}.")
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import gzip
+import sys
+from collections.abc import Iterable
+from typing import Any, BinaryIO
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from sample_app.exports import export_chunk_size, export_items, ndjson_chunks, parse_bound
+
+
+class Command(BaseCommand):
+    help = "Write session items as NDJSON in (session, sequence) order, in bounded memory."
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument("output", help="File to write; '-' for stdout, '.gz' to gzip.")
+        parser.add_argument("--owner", help="Only sessions owned by this username.")
+        parser.add_argument(
+            "--session",
+            action="append",
+            default=[],
+            help="Only this session key; repeat for several.",
+        )
+        parser.add_argument("--since", help="Items created at or after this ISO date/datetime.")
+        parser.add_argument("--until", help="Items created before this ISO date/datetime.")
+        parser.add_argument("--chunk-size", type=int)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        chunk_size = options.get("chunk_size") or export_chunk_size()
+        if chunk_size < 1:
+            raise CommandError("chunk-size must be >= 1")
+        owner = None
+        if options.get("owner"):
+            try:
+                owner = get_user_model().objects.get_by_natural_key(options["owner"])
+            except get_user_model().DoesNotExist as exc:
+                raise CommandError(f"Unknown user {options['owner']!r}") from exc
+        try:
+            since = parse_bound(options["since"], "since") if options.get("since") else None
+            until = parse_bound(options["until"], "until") if options.get("until") else None
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        items = export_items(
+            owner=owner,
+            session_keys=options["session"],
+            since=since,
+            until=until,
+        )
+        output_path: str = options["output"]
+        if output_path == "-":
+            _write(sys.stdout.buffer, ndjson_chunks(items, chunk_size))
+            return
+        opener = gzip.open if output_path.endswith(".gz") else open
+        with opener(output_path, "wb") as output:
+            written = _write(output, ndjson_chunks(items, chunk_size))
+        self.stdout.write(f"Wrote {written} bytes of NDJSON to {output_path}.")
+
+
+def _write(output: BinaryIO, chunks: Iterable[bytes]) -> int:
+    written = 0
+    for chunk in chunks:
+        output.write(chunk)
+        written += len(chunk)
+    return written
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from agentic_django.conf import get_settings
+from agentic_django.registry import get_agent_registry
+from sample_app.batch_runs import (
+    BatchItem,
+    BatchRunner,
+    Checkpoint,
+    batch_window,
+    read_items,
+    written_ids,
+)
+
+
+class Command(BaseCommand):
+    help = "Run every prompt in a JSONL or CSV file and write results to a JSONL file."
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument("input", type=Path, help="Prompts, one JSON object per line or CSV.")
+        parser.add_argument("output", type=Path, help="Results file; appended to on resume.")
+        parser.add_argument("--user", required=True, help="Username that owns the runs.")
+        parser.add_argument("--agent-key", help="Agent for rows without agent_key.")
+        parser.add_argument("--batch", help="Batch name (default: input file name).")
+        parser.add_argument("--window", type=int, help="Runs in flight at once.")
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument(
+            "--checkpoint",
+            type=Path,
+            help="Progress file used to resume (default: <output>.checkpoint).",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        window = options.get("window") or batch_window()
+        if window < 1:
+            raise CommandError("window must be >= 1")
+        input_path: Path = options["input"]
+        output_path: Path = options["output"]
+        if not input_path.exists():
+            raise CommandError(f"{input_path} does not exist")
+        try:
+            owner = get_user_model().objects.get_by_natural_key(options["user"])
+        except get_user_model().DoesNotExist as exc:
+            raise CommandError(f"Unknown user {options['user']!r}") from exc
+        agent_key = options.get("agent_key") or get_settings().default_agent_key
+        batch = options.get("batch") or input_path.name
+        checkpoint_path = options.get("checkpoint") or output_path.with_name(
+            f"{output_path.name}.checkpoint"
+        )
+        try:
+            checkpoint = Checkpoint.load(checkpoint_path, batch)
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        registry = get_agent_registry()
+        items = read_items(input_path, agent_key)
+        with output_path.open("a", encoding="utf-8") as output:
+            runner = BatchRunner(
+                owner=owner,
+                batch=batch,
+                output=output,
+                checkpoint=checkpoint,
+                window=window,
+                poll_interval=options["poll_interval"],
+            )
+            runner.resume(written_ids(output_path))
+            if runner.stats.resumed:
+                self.stdout.write(f"Resuming {batch}: {runner.stats.resumed} runs in flight.")
+            try:
+                stats = runner.run(_known_agents(items, registry))
+            except ValueError as exc:
+                raise CommandError(f"{input_path}: {exc}") from exc
+        self.stdout.write(
+            f"Batch {batch}: created {stats.created} runs, "
+            f"{stats.completed} completed, {stats.failed} failed."
+        )
+
+
+def _known_agents(items: Iterator[BatchItem], registry: dict[str, Any]) -> Iterator[BatchItem]:
+    for item in items:
+        if item.agent_key not in registry:
+            raise ValueError(f"item {item.item_id}: unknown agent_key {item.agent_key!r}")
+        yield item
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+import signal
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+
+from agentic_django.conf import get_concurrency_limit
+from sample_app.async_worker import (
+    DEFAULT_JOB_CLASS,
+    AsyncRunWorker,
+    RQJobSource,
+    worker_concurrency,
+)
+from sample_app.metrics import mark_process_dead
+from sample_app.run_queues import queue_priority
+
+
+class Command(BaseCommand):
+    help = "Execute queued agent runs concurrently on one asyncio event loop."
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument(
+            "queues",
+            nargs="*",
+            help="RQ queues to read, highest priority first (default: all, by priority).",
+        )
+        parser.add_argument("--concurrency", type=int, help="Runs in flight per process.")
+        parser.add_argument("--job-class", default=DEFAULT_JOB_CLASS)
+        parser.add_argument(
+            "--drain-timeout",
+            type=float,
+            help="Seconds to wait for in-flight runs on shutdown before cancelling them.",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            default=False,
+            help="Exit once the queues are empty and in-flight runs have finished.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        queues = options.get("queues") or queue_priority()
+        concurrency = options.get("concurrency") or worker_concurrency()
+        if concurrency < 1:
+            raise CommandError("concurrency must be >= 1")
+        if get_concurrency_limit() < concurrency:
+            self.stderr.write(
+                f"AGENTIC_DJANGO_CONCURRENCY_LIMIT ({get_concurrency_limit()}) is below "
+                f"--concurrency ({concurrency}); extra runs wait for a free slot."
+            )
+        worker = AsyncRunWorker(
+            RQJobSource(queues, options["job_class"]),
+            concurrency=concurrency,
+            drain_timeout=options.get("drain_timeout"),
+        )
+        self.stdout.write(f"Running up to {concurrency} jobs from {', '.join(queues)}.")
+        try:
+            asyncio.run(self._serve(worker, burst=bool(options.get("burst"))))
+        finally:
+            mark_process_dead()
+        self.stdout.write(f"Stopped after {worker.processed} jobs ({worker.failed} failed).")
+
+    async def _serve(self, worker: AsyncRunWorker, *, burst: bool) -> None:
+        loop = asyncio.get_running_loop()
+        # First SIGTERM/SIGINT drains in-flight runs; a second one cancels them.
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, worker.stop)
+        await worker.run(burst=burst)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+
+from agentic_django.models import AgentRun, AgentSessionItem
+from sample_app.purge import (
+    delete_in_batches,
+    delete_sessions,
+    purge_batch_size,
+    retired_sessions,
+)
+
+ACTIVE_RUN_STATUSES = [AgentRun.Status.PENDING, AgentRun.Status.RUNNING]
+
+
+class Command(BaseCommand):
+    help = "Purge history left behind by reset agent sessions, in bounded chunks."
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument("--batch-size", type=int)
+        parser.add_argument(
+            "--delete-sessions",
+            action="store_true",
+            default=False,
+            help="Also delete retired sessions with their runs and events.",
+        )
+        parser.add_argument("--dry-run", action="store_true", default=False)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        batch_size = options.get("batch_size") or purge_batch_size()
+        if batch_size < 1:
+            raise CommandError("batch-size must be >= 1")
+        dry_run = bool(options.get("dry_run"))
+        prefix = "Would delete" if dry_run else "Deleted"
+
+        items = AgentSessionItem.objects.filter(session__in=retired_sessions())
+        count = items.count() if dry_run else delete_in_batches(items, batch_size)
+        self.stdout.write(f"{prefix} {count} items from retired sessions.")
+
+        if options.get("delete_sessions"):
+            sessions = retired_sessions().exclude(runs__status__in=ACTIVE_RUN_STATUSES)
+            count = sessions.count() if dry_run else delete_sessions(sessions, batch_size)
+            self.stdout.write(f"{prefix} {count} retired sessions.")
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+
+# ``django.utils.html.escape`` is this same call plus lazy-string and SafeString
+# wrapping; callers mark the finished HTML safe once instead of per fragment.
+from html import escape
+
+_FENCE_RE = re.compile(r"^\s*(`{3,}|~{3,})\s*([\w#+.-]*)\s*$")
+_HEADING_RE = re.compile(r"^\s{0,3}(#{1,6})\s+(.*?)(?:\s+#+)?\s*$")
+_LIST_ITEM_RE = re.compile(r"^(\s*)(?:([-*+])|(\d+)\.)\s+(.*)$")
+# An item nests under the previous one when indented at least this much more.
+_NEST_INDENT = 2
+# Emphasis must hug its delimiters and may contain whole code spans but never a
+# lone backtick, so "2 * 3" or a stray ``*`` cannot swallow a code span. A span
+# closes at the first delimiter that qualifies, as a lazy regex would. Closer
+# searches are memoized per line, so unclosed delimiters cost linear time
+# instead of a rescan of the rest of the line for every opener.
+_MARKER_RE = re.compile(r"[`*_]")
+_EMPHASIS = (
+    ("**", "strong", re.compile(r"(?<=\S)\*\*")),
+    ("*", "em", re.compile(r"(?<=\S)\*")),
+    ("_", "em", re.compile(r"(?<=\S)_(?!\w)")),
+)
+
+
+class _InlineScanner:
+    """Memoized closing-delimiter lookups for one line of inline text."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.ticks = [index for index, char in enumerate(text) if char == "`"]
+        # Per closer pattern: the last search as (from, found) and, for each
+        # backtick that opens a code span, the first closer after that span.
+        self._searches: dict[re.Pattern[str], tuple[int, int]] = {}
+        self._after_span: dict[re.Pattern[str], dict[int, int | None]] = {}
+
+    def _next_closer(self, closer: re.Pattern[str], start: int) -> int:
+        searched_from, found = self._searches.get(closer, (len(self.text) + 1, 0))
+        # Nothing matched between the last search start and what it found.
+        if searched_from <= start <= found:
+            return found
+        match = closer.search(self.text, start)
+        found = match.start() if match else len(self.text)
+        self._searches[closer] = (start, found)
+        return found
+
+    def _visible_closer(self, closer: re.Pattern[str], start: int, tick: int) -> int | None:
+        # ``tick`` indexes the first backtick at or after ``start``; any closer
+        # past it must come after the code span that backtick opens.
+        memo = self._after_span.setdefault(closer, {})
+        pending: list[int] = []
+        result: int | None = None
+        while True:
+            limit = self.ticks[tick] if tick < len(self.ticks) else len(self.text)
+            found = self._next_closer(closer, start)
+            if found < limit:
+                result = found
+                break
+            if tick + 1 >= len(self.ticks):
+                break
+            if tick in memo:
+                result = memo[tick]
+                break
+            pending.append(tick)
+            start, tick = self.ticks[tick + 1] + 1, tick + 2
+        for opened in pending:
+            memo[opened] = result
+        return result
+
+    def closer(self, closer: re.Pattern[str], start: int) -> int | None:
+        """Return where the span whose text starts at ``start`` closes, if anywhere."""
+
+        if start >= len(self.text) or self.text[start].isspace():
+            return None
+        tick = bisect_left(self.ticks, start)
+        if tick < len(self.ticks) and self.ticks[tick] == start:
+            if tick + 1 >= len(self.ticks):
+                return None
+            return self._visible_closer(closer, self.ticks[tick + 1] + 1, tick + 2)
+        return self._visible_closer(closer, start + 1, tick)
+
+    def code_end(self, position: int) -> int | None:
+        """Return the closing backtick of a non-empty code span opening at ``position``."""
+
+        end = self.text.find("`", position + 1)
+        return end if end > position + 1 else None
+
+
+def render_inline(text: str) -> str:
+    """Escape ``text`` and apply code, bold, and italic spans in one scan."""
+
+    if "`" not in text and "*" not in text and "_" not in text:
+        return escape(text)
+    scanner = _InlineScanner(text)
+    parts: list[str] = []
+    position = 0
+    marker = _MARKER_RE.search(text)
+    while marker is not None:
+        index = marker.start()
+        next_index = index + 1
+        if text[index] == "`":
+            end = scanner.code_end(index)
+            if end is not None:
+                parts.append(escape(text[position:index]))
+                parts.append(f"<code>{escape(text[index + 1 : end])}</code>")
+                position = next_index = end + 1
+        else:
+            for delimiter, tag, closer_re in _EMPHASIS:
+                if not text.startswith(delimiter, index):
+                    continue
+                if delimiter == "_" and index and _is_word(text[index - 1]):
+                    continue
+                start = index + len(delimiter)
+                closer = scanner.closer(closer_re, start)
+                if closer is None:
+                    continue
+                parts.append(escape(text[position:index]))
+                parts.append(f"<{tag}>{render_inline(text[start:closer])}</{tag}>")
+                position = next_index = closer + len(delimiter)
+                break
+        marker = _MARKER_RE.search(text, next_index)
+    parts.append(escape(text[position:]))
+    return "".join(parts)
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def render_markdown(text: str) -> str:
+    """Render the small markdown subset used in agent replies as HTML.
+
+    Lines are walked once. Paragraphs, ATX headings, fenced code blocks, and
+    nested ordered or unordered lists become HTML fragments that are joined at
+    the end. Everything else is escaped.
+    """
+
+    html_parts: list[str] = []
+    paragraph_lines: list[str] = []
+    # Open lists as (indent of their latest item, tag); the innermost list item
+    # is left open so a deeper list can nest inside it.
+    open_lists: list[tuple[int, str]] = []
+    blank_since_item = False
+    fence: str | None = None
+    fence_language = ""
+    code_lines: list[str] = []
+
+    def flush_paragraph() -> None:
+        if paragraph_lines:
+            formatted = "<br>".join(render_inline(line) for line in paragraph_lines)
+            html_parts.append(f"<p>{formatted}</p>")
+            paragraph_lines.clear()
+
+    def close_lists(depth: int = 0) -> None:
+        while len(open_lists) > depth:
+            _, tag = open_lists.pop()
+            html_parts.append(f"</li></{tag}>")
+
+    def flush_code() -> None:
+        language = f' class="language-{escape(fence_language)}"' if fence_language else ""
+        code = escape("\n".join(code_lines))
+        html_parts.append(f"<pre><code{language}>{code}</code></pre>")
+        code_lines.clear()
+
+    for line in text.splitlines():
+        if fence is not None:
+            if line.strip().startswith(fence) and not line.strip().strip(fence[0]):
+                flush_code()
+                fence = None
+            else:
+                code_lines.append(line)
+            continue
+
+        stripped = line.strip()
+        if not stripped:
+            flush_paragraph()
+            blank_since_item = bool(open_lists)
+            continue
+
+        marker = stripped[0]
+        fence_match = _FENCE_RE.match(line) if marker in "`~" else None
+        if fence_match:
+            flush_paragraph()
+            close_lists()
+            fence, fence_language = fence_match.group(1), fence_match.group(2)
+            continue
+
+        heading_match = _HEADING_RE.match(line) if marker == "#" else None
+        if heading_match:
+            flush_paragraph()
+            close_lists()
+            level = len(heading_match.group(1))
+            html_parts.append(f"<h{level}>{render_inline(heading_match.group(2))}</h{level}>")
+            continue
+
+        item_match = _LIST_ITEM_RE.match(line) if marker in "-*+" or marker.isdigit() else None
+        if item_match:
+            flush_paragraph()
+            indent = len(item_match.group(1).expandtabs(4))
+            tag = "ol" if item_match.group(3) else "ul"
+            nested = bool(open_lists) and indent >= open_lists[-1][0] + _NEST_INDENT
+            if not nested:
+                # A shallower item belongs to the innermost list whose parent
+                # item it is not indented enough to nest under.
+                while len(open_lists) > 1 and indent < open_lists[-2][0] + _NEST_INDENT:
+                    close_lists(len(open_lists) - 1)
+                if open_lists and open_lists[-1][1] == tag:
+                    html_parts.append("</li>")
+                    open_lists[-1] = (indent, tag)
+                elif open_lists:
+                    close_lists(len(open_lists) - 1)
+            if nested or not open_lists or open_lists[-1][1] != tag:
+                start = item_match.group(3)
+                start_attr = f' start="{int(start)}"' if start and int(start) != 1 else ""
+                html_parts.append(f"<{tag}{start_attr}>")
+                open_lists.append((indent, tag))
+            html_parts.append(f"<li>{render_inline(item_match.group(4))}")
+            blank_since_item = False
+            continue
+
+        if open_lists and not blank_since_item and line[:1].isspace():
+            # Indented continuation of the current list item.
+            html_parts.append(f"<br>{render_inline(stripped)}")
+            continue
+
+        close_lists()
+        blank_since_item = False
+        paragraph_lines.append(stripped)
+
+    if fence is not None:
+        flush_code()
+    flush_paragraph()
+    close_lists()
+    return "\n".join(html_parts) if html_parts else "<p></p>"
+
+
+__all__ = ["render_inline", "render_markdown"]
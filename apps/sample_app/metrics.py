@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections.abc import Callable, Iterator
+from datetime import datetime
+from typing import Any
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.http import HttpRequest, HttpResponseBase
+from django.utils import timezone
+from django.utils.decorators import sync_and_async_middleware
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from agentic_django.models import AgentRun
+from agentic_django.signals import agent_run_completed, agent_run_failed, agent_run_started
+from sample_app.run_queues import run_queue, uses_rq_backend
+
+logger = logging.getLogger(__name__)
+
+# Polling endpoints get their own counter so poll rate is visible at a glance.
+POLL_URL_NAMES = frozenset({"agents:run-fragment", "sample_app:conversation-items"})
+RUN_SECONDS_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+TURN_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10, 15, 20)
+
+RUNS_CREATED = Counter(
+    "sample_app_runs_created_total",
+    "Agent runs created.",
+    ["agent_key"],
+)
+RUN_QUEUE_WAIT = Histogram(
+    "sample_app_run_queue_wait_seconds",
+    "Time from run creation until a worker starts it, by routed queue.",
+    ["agent_key", "queue"],
+    buckets=RUN_SECONDS_BUCKETS,
+)
+RUN_DURATION = Histogram(
+    "sample_app_run_duration_seconds",
+    "Time from run start until it completes or fails.",
+    ["agent_key", "status"],
+    buckets=RUN_SECONDS_BUCKETS,
+)
+RUNS_REJECTED = Counter(
+    "sample_app_runs_rejected_total",
+    "Run creation requests answered with 429 by admission control.",
+    ["reason"],
+)
+RUNS_FINISHED = Counter(
+    "sample_app_runs_finished_total",
+    "Agent runs that reached a terminal status.",
+    ["agent_key", "status"],
+)
+RUN_TURNS = Histogram(
+    "sample_app_run_turns",
+    "Model responses per completed run.",
+    ["agent_key"],
+    buckets=TURN_BUCKETS,
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "sample_app_http_request_duration_seconds",
+    "Time to produce a response, by URL name (streams count until headers).",
+    ["url_name", "method"],
+)
+HTTP_RESPONSES = Counter(
+    "sample_app_http_responses_total",
+    "HTTP responses by URL name and status code.",
+    ["url_name", "method", "status"],
+)
+TOOL_CALL_DURATION = Histogram(
+    "sample_app_tool_call_duration_seconds",
+    "Time spent in each tool call made during a run.",
+    ["tool", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+MODEL_INPUT_ITEMS = Histogram(
+    "sample_app_model_input_items",
+    "Input items per model request, before and after history compaction.",
+    ["agent_key", "stage"],
+    buckets=(5, 10, 20, 40, 60, 80, 120, 200, 400),
+)
+MODEL_INPUT_TOKENS = Histogram(
+    "sample_app_model_input_tokens",
+    "Estimated input tokens per model request, before and after history compaction.",
+    ["agent_key", "stage"],
+    buckets=(500, 1000, 2000, 4000, 8000, 12000, 16000, 32000, 64000),
+)
+POLLS = Counter(
+    "sample_app_polls_total",
+    "Requests to the run-fragment and conversation-items polling endpoints.",
+    ["url_name"],
+)
+RENDER_CACHE_LOOKUPS = Counter(
+    "sample_app_render_cache_lookups_total",
+    "Conversation item render cache lookups, by whether the item was already rendered.",
+    ["result"],
+)
+
+
+def _seconds_between(start: datetime | None, end: datetime | None) -> float | None:
+    if start is None or end is None:
+        return None
+    return max((end - start).total_seconds(), 0.0)
+
+
+@receiver(post_save, sender=AgentRun, dispatch_uid="sample_app.metrics.run_created")
+def _record_run_created(sender: Any, instance: AgentRun, created: bool, **kwargs: Any) -> None:
+    if created:
+        RUNS_CREATED.labels(instance.agent_key).inc()
+
+
+@receiver(agent_run_started, dispatch_uid="sample_app.metrics.run_started")
+def _record_run_started(sender: Any, run: AgentRun, **kwargs: Any) -> None:
+    wait = _seconds_between(run.created_at, run.started_at)
+    if wait is not None:
+        RUN_QUEUE_WAIT.labels(run.agent_key, run_queue(run)).observe(wait)
+
+
+def _record_run_finished(run: AgentRun, status: str) -> None:
+    RUNS_FINISHED.labels(run.agent_key, status).inc()
+    duration = _seconds_between(run.started_at, run.finished_at or timezone.now())
+    if duration is not None:
+        RUN_DURATION.labels(run.agent_key, status).observe(duration)
+
+
+@receiver(agent_run_completed, dispatch_uid="sample_app.metrics.run_completed")
+def _record_run_completed(sender: Any, run: AgentRun, result: Any = None, **kwargs: Any) -> None:
+    _record_run_finished(run, AgentRun.Status.COMPLETED)
+    raw_responses = getattr(result, "raw_responses", None)
+    if raw_responses is not None:
+        RUN_TURNS.labels(run.agent_key).observe(len(raw_responses))
+
+
+@receiver(agent_run_failed, dispatch_uid="sample_app.metrics.run_failed")
+def _record_run_failed(sender: Any, run: AgentRun, **kwargs: Any) -> None:
+    _record_run_finished(run, AgentRun.Status.FAILED)
+
+
+def _url_name(request: HttpRequest) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None or not match.url_name:
+        return "unmatched"
+    return match.view_name
+
+
+def observe_request(request: HttpRequest, response: HttpResponseBase, seconds: float) -> None:
+    url_name = _url_name(request)
+    method = request.method or ""
+    HTTP_REQUEST_DURATION.labels(url_name, method).observe(seconds)
+    HTTP_RESPONSES.labels(url_name, method, str(response.status_code)).inc()
+    if url_name in POLL_URL_NAMES:
+        POLLS.labels(url_name).inc()
+
+
+@sync_and_async_middleware
+def metrics_middleware(
+    get_response: Callable[[HttpRequest], Any],
+) -> Callable[[HttpRequest], Any]:
+    """Time every request and count responses by URL name."""
+
+    if iscoroutinefunction(get_response):
+
+        async def async_middleware(request: HttpRequest) -> HttpResponseBase:
+            started = time.perf_counter()
+            response = await get_response(request)
+            observe_request(request, response, time.perf_counter() - started)
+            return response
+
+        return async_middleware
+
+    def middleware(request: HttpRequest) -> HttpResponseBase:
+        started = time.perf_counter()
+        response = get_response(request)
+        observe_request(request, response, time.perf_counter() - started)
+        return response
+
+    return middleware
+
+
+class QueueDepthCollector(Collector):
+    """Report how many jobs wait in each configured RQ queue at scrape time."""
+
+    def __init__(self, get_queue: Callable[[str], Any] | None = None) -> None:
+        self._get_queue = get_queue
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        gauge = GaugeMetricFamily(
+            "sample_app_rq_queue_depth",
+            "Jobs waiting in each RQ queue.",
+            labels=["queue"],
+        )
+        if uses_rq_backend():
+            get_queue = self._get_queue or _django_rq_queue
+            for name in getattr(settings, "RQ_QUEUES", {}):
+                try:
+                    gauge.add_metric([name], get_queue(name).count)
+                except Exception:
+                    logger.warning("Could not read depth of RQ queue %s", name, exc_info=True)
+        yield gauge
+
+
+def _django_rq_queue(name: str) -> Any:
+    import django_rq
+
+    return django_rq.get_queue(name)
+
+
+def mark_process_dead(pid: int | None = None) -> None:
+    """Drop a stopped process's live gauge files from ``PROMETHEUS_MULTIPROC_DIR``."""
+
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Return the exposition body and content type for ``/metrics``.
+
+    With ``PROMETHEUS_MULTIPROC_DIR`` set (required when web workers or forked
+    RQ job processes record metrics), samples from every process sharing that
+    directory are aggregated; otherwise this process's registry is reported.
+    """
+
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    queue_registry = CollectorRegistry()
+    queue_registry.register(QueueDepthCollector())
+    return generate_latest(registry) + generate_latest(queue_registry), CONTENT_TYPE_LATEST
+
+
+__all__ = [
+    "QueueDepthCollector",
+    "mark_process_dead",
+    "metrics_middleware",
+    "observe_request",
+    "render_metrics",
+]
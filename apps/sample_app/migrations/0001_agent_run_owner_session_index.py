@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from django.db import migrations
+
+INDEX_NAME = "sample_app_run_owner_session_created_idx"
+
+
+class Migration(migrations.Migration):
+    # AgentRun belongs to agentic_django, so the home view's "latest run for this
+    # owner and session" index is created here with portable SQL.
+    dependencies = [
+        ("agentic_django", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} "
+                "ON agentic_django_agentrun (owner_id, session_id, created_at)"
+            ),
+            reverse_sql=f"DROP INDEX IF EXISTS {INDEX_NAME}",
+        ),
+    ]
@@ -0,0 +1,425 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import tempfile
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+from agents.items import (
+    ModelResponse,
+    TResponseInputItem,
+    TResponseOutputItem,
+    TResponseStreamEvent,
+)
+from agents.models import get_default_model
+from agents.models.interface import Model, ModelTracing
+from agents.models.openai_provider import OpenAIProvider
+from agents.tracing import set_tracing_disabled
+from agents.usage import Usage
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseOutputItem,
+    ResponseTextDeltaEvent,
+)
+from pydantic import TypeAdapter
+
+MODEL_MODES = ("openai", "scripted", "replay", "record")
+DEFAULT_TRAVEL_DATE = "2026-05-01"
+DEFAULT_ROUTE = ("SFO", "JFK")
+OFFLINE_MODEL_NAME = "sample-app-offline"
+
+_AIRPORT_RE = re.compile(r"\b[A-Z]{3}\b")
+_DATE_RE = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+_FLIGHT_NUMBER_RE = re.compile(r"flight_number['\"]\s*:\s*['\"](\w+)['\"]")
+_BOOKING_ID_RE = re.compile(r"booking_id['\"]\s*:\s*['\"]([\w-]+)['\"]")
+_OUTPUT_ITEM_ADAPTER: TypeAdapter[Any] = TypeAdapter(ResponseOutputItem)
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when no recording matches the model request."""
+
+
+def model_mode() -> str:
+    mode = getattr(settings, "SAMPLE_APP_MODEL_MODE", "openai")
+    if mode not in MODEL_MODES:
+        raise ImproperlyConfigured(
+            f"SAMPLE_APP_MODEL_MODE must be one of {', '.join(MODEL_MODES)}; got {mode!r}."
+        )
+    return mode
+
+
+def model_latency() -> float:
+    return getattr(settings, "SAMPLE_APP_MODEL_LATENCY", 0.0)
+
+
+def cassette_dir() -> Path:
+    return Path(getattr(settings, "SAMPLE_APP_MODEL_CASSETTE_DIR", "cassettes"))
+
+
+def _as_items(input: str | list[TResponseInputItem]) -> list[dict[str, Any]]:
+    if isinstance(input, str):
+        return [{"role": "user", "content": input}]
+    return [dict(item) for item in input]
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(
+            part["text"]
+            for part in content
+            if isinstance(part, dict) and isinstance(part.get("text"), str)
+        )
+    return ""
+
+
+def exchange_key(
+    system_instructions: str | None,
+    input: str | list[TResponseInputItem],
+    tool_names: list[str],
+) -> str:
+    """Identify a model request independently of ids and tool output details.
+
+    Tool outputs (price quotes stamp the current time) and generated ids differ
+    between otherwise identical runs, so only instructions, available tools,
+    message text, and tool call names and arguments are compared.
+    """
+
+    normalized: list[Any] = []
+    for item in _as_items(input):
+        item_type = item.get("type", "message")
+        if item_type == "message" and item.get("role") in {"user", "assistant", "system"}:
+            normalized.append([item["role"], _text(item.get("content"))])
+        elif item_type == "function_call":
+            normalized.append(["call", item.get("name"), item.get("arguments")])
+        elif item_type == "function_call_output":
+            normalized.append(["output"])
+    encoded = json.dumps(
+        [system_instructions or "", sorted(tool_names), normalized],
+        separators=(",", ":"),
+    )
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class CassetteStore:
+    """Recorded model outputs, one JSON file per request key."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def load(self, key: str) -> list[dict[str, Any]] | None:
+        try:
+            data = json.loads(self.path(key).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        return data["output"]
+
+    def save(self, key: str, output: list[dict[str, Any]]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent workers never replay a partial file.
+        with tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            dir=self.directory,
+            suffix=".tmp",
+            delete=False,
+        ) as handle:
+            json.dump({"output": output}, handle, indent=2, sort_keys=True)
+        os.replace(handle.name, self.path(key))
+
+
+def _function_call(name: str, arguments: dict[str, Any], index: int) -> dict[str, Any]:
+    return {
+        "type": "function_call",
+        "id": f"fc_offline_{index}",
+        "call_id": f"call_offline_{index}",
+        "name": name,
+        "arguments": json.dumps(arguments),
+        "status": "completed",
+    }
+
+
+def _message(text: str, index: int) -> dict[str, Any]:
+    return {
+        "type": "message",
+        "id": f"msg_offline_{index}",
+        "role": "assistant",
+        "status": "completed",
+        "content": [{"type": "output_text", "text": text, "annotations": []}],
+    }
+
+
+def scripted_output(input: str | list[TResponseInputItem]) -> list[dict[str, Any]]:
+    """Return the next scripted turn for the demo flight agent.
+
+    The script searches the route named in the latest user message (three
+    letter airport codes and an ISO date), books the first result when the
+    user asked to book, and then answers with a short summary.
+    """
+
+    items = _as_items(input)
+    user_indexes = [
+        index
+        for index, item in enumerate(items)
+        if item.get("role") == "user" and item.get("type", "message") == "message"
+    ]
+    turn = items[user_indexes[-1] :] if user_indexes else items
+    request = _text(turn[0].get("content")) if user_indexes else ""
+    index = sum(1 for item in items if item.get("type") == "function_call") + 1
+    outputs = {
+        item.get("call_id"): str(item.get("output", ""))
+        for item in turn
+        if item.get("type") == "function_call_output"
+    }
+    calls = {
+        item.get("name"): outputs.get(item.get("call_id"), "")
+        for item in turn
+        if item.get("type") == "function_call"
+    }
+
+    airports = _AIRPORT_RE.findall(request)
+    origin, destination = (airports + list(DEFAULT_ROUTE))[:2]
+    date_match = _DATE_RE.search(request)
+    travel_date = date_match.group(0) if date_match else DEFAULT_TRAVEL_DATE
+
+    if "find_flight" not in calls:
+        arguments = {"origin": origin, "destination": destination, "travel_date": travel_date}
+        return [_function_call("find_flight", arguments, index)]
+
+    flight_numbers = _FLIGHT_NUMBER_RE.findall(calls["find_flight"])
+    wants_booking = "book" in request.lower()
+    if wants_booking and flight_numbers and "book_flight" not in calls:
+        return [_function_call("book_flight", {"flight_number": flight_numbers[0]}, index)]
+
+    if "book_flight" in calls:
+        booking = _BOOKING_ID_RE.search(calls["book_flight"])
+        reference = booking.group(1) if booking else "pending"
+        text = (
+            f"Booked **{flight_numbers[0]}** from {origin} to {destination}. "
+            f"Reference: `{reference}`."
+        )
+    elif flight_numbers:
+        options = "\n".join(f"- {number}" for number in flight_numbers[:3])
+        text = f"Flights from {origin} to {destination} on {travel_date}:\n\n{options}"
+    else:
+        text = f"I could not find flights from {origin} to {destination} on {travel_date}."
+    return [_message(text, index)]
+
+
+def output_items(raw_items: list[dict[str, Any]]) -> list[TResponseOutputItem]:
+    return [_OUTPUT_ITEM_ADAPTER.validate_python(item) for item in raw_items]
+
+
+def _text_deltas(output: list[TResponseOutputItem]) -> list[ResponseTextDeltaEvent]:
+    deltas: list[ResponseTextDeltaEvent] = []
+    for output_index, item in enumerate(output):
+        if getattr(item, "type", None) != "message":
+            continue
+        for content_index, part in enumerate(getattr(item, "content", [])):
+            for word in re.findall(r"\S+\s*", getattr(part, "text", "") or ""):
+                deltas.append(
+                    ResponseTextDeltaEvent(
+                        type="response.output_text.delta",
+                        item_id=item.id,
+                        output_index=output_index,
+                        content_index=content_index,
+                        delta=word,
+                        logprobs=[],
+                        sequence_number=len(deltas),
+                    )
+                )
+    return deltas
+
+
+class OfflineModel(Model):
+    """Local stand-in for the OpenAI model, selected by ``SAMPLE_APP_MODEL_MODE``.
+
+    ``scripted`` answers from :func:`scripted_output`, ``replay`` answers from
+    recorded cassettes, and ``record`` forwards to ``inner`` (a real model) and
+    saves each exchange for later replay. Offline answers wait ``latency``
+    seconds first so load tests see realistic run durations.
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        *,
+        store: CassetteStore,
+        latency: float = 0.0,
+        inner: Model | None = None,
+    ) -> None:
+        if mode not in {"scripted", "replay", "record"}:
+            raise ValueError(f"Unsupported offline model mode: {mode!r}")
+        if mode == "record" and inner is None:
+            raise ValueError("record mode needs the real model to record from")
+        self.mode = mode
+        self.store = store
+        self.latency = latency
+        self.inner = inner
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: Any,
+        tools: list[Any],
+        output_schema: Any,
+        handoffs: list[Any],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        conversation_id: str | None,
+        prompt: Any | None,
+    ) -> ModelResponse:
+        if self.inner is not None:
+            response = await self.inner.get_response(
+                system_instructions,
+                input,
+                model_settings,
+                tools,
+                output_schema,
+                handoffs,
+                tracing,
+                previous_response_id=previous_response_id,
+                conversation_id=conversation_id,
+                prompt=prompt,
+            )
+            self._record(system_instructions, input, tools, response.output)
+            return response
+        output = await self.offline_output(system_instructions, input, tools)
+        return ModelResponse(output=output, usage=Usage(requests=1), response_id=None)
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: Any,
+        tools: list[Any],
+        output_schema: Any,
+        handoffs: list[Any],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        conversation_id: str | None,
+        prompt: Any | None,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        if self.inner is not None:
+            async for event in self.inner.stream_response(
+                system_instructions,
+                input,
+                model_settings,
+                tools,
+                output_schema,
+                handoffs,
+                tracing,
+                previous_response_id=previous_response_id,
+                conversation_id=conversation_id,
+                prompt=prompt,
+            ):
+                if isinstance(event, ResponseCompletedEvent):
+                    self._record(system_instructions, input, tools, event.response.output)
+                yield event
+            return
+
+        output = await self.offline_output(system_instructions, input, tools)
+        deltas = _text_deltas(output)
+        for delta in deltas:
+            yield delta
+        sequence = len(deltas)
+        yield ResponseCompletedEvent(
+            type="response.completed",
+            sequence_number=sequence,
+            response=Response(
+                id=f"resp_offline_{sequence}",
+                object="response",
+                created_at=0,
+                model=OFFLINE_MODEL_NAME,
+                output=output,
+                parallel_tool_calls=True,
+                tool_choice="auto",
+                tools=[],
+            ),
+        )
+
+    async def offline_output(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        tools: list[Any],
+    ) -> list[TResponseOutputItem]:
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        if self.mode == "scripted":
+            return output_items(scripted_output(input))
+        key = exchange_key(system_instructions, input, _tool_names(tools))
+        recorded = self.store.load(key)
+        if recorded is None:
+            raise CassetteMissError(
+                f"No cassette {self.store.path(key)}; record this conversation first."
+            )
+        return output_items(recorded)
+
+    def _record(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        tools: list[Any],
+        output: list[TResponseOutputItem],
+    ) -> None:
+        key = exchange_key(system_instructions, input, _tool_names(tools))
+        self.store.save(key, [item.model_dump(mode="json", exclude_none=True) for item in output])
+
+
+def _tool_names(tools: list[Any]) -> list[str]:
+    return [getattr(tool, "name", type(tool).__name__) for tool in tools]
+
+
+def configure_tracing() -> None:
+    """Turn trace export off in ``scripted`` and ``replay`` modes; call once at startup.
+
+    Trace export is the one remaining network call in those modes.
+    """
+
+    if model_mode() in {"scripted", "replay"}:
+        set_tracing_disabled(True)
+
+
+def get_agent_model() -> str | Model:
+    """Return the model for sample agents: the OpenAI default or an offline stand-in."""
+
+    mode = model_mode()
+    if mode == "openai":
+        return get_default_model()
+    inner = OpenAIProvider().get_model(get_default_model()) if mode == "record" else None
+    return OfflineModel(
+        mode,
+        store=CassetteStore(cassette_dir()),
+        latency=model_latency(),
+        inner=inner,
+    )
+
+
+__all__ = [
+    "MODEL_MODES",
+    "CassetteMissError",
+    "CassetteStore",
+    "OfflineModel",
+    "configure_tracing",
+    "exchange_key",
+    "get_agent_model",
+    "model_mode",
+    "output_items",
+    "scripted_output",
+]
@@ -1,25 +1,182 @@
 from __future__ import annotations
 
-from functools import lru_cache
+import dataclasses
+import hashlib
+import json
+from dataclasses import dataclass
 from importlib import resources
+from importlib.resources.abc import Traversable
+from pathlib import Path
+from typing import Any
 
-from promptdown import StructuredPrompt
+from promptdown import Message, StructuredPrompt
 
 PROMPT_SUFFIX = ".prompt.md"
+BUNDLE_FORMAT_VERSION = 1
 
 
-@lru_cache(maxsize=None)
-def _promptdown_text(name: str) -> str:
-    """Return the raw promptdown text for ``name`` (cached)."""
+@dataclass(frozen=True)
+class CompiledPrompt:
+    """A parsed prompt plus its flattened instruction text."""
 
-    resource = resources.files(__name__).joinpath(f"{name}{PROMPT_SUFFIX}")
-    return resource.read_text(encoding="utf-8")
+    fingerprint: str
+    prompt: StructuredPrompt
+    text: str
+
+
+def _prompt_resource(name: str) -> Traversable:
+    return resources.files(__name__).joinpath(f"{name}{PROMPT_SUFFIX}")
+
+
+def prompt_names() -> list[str]:
+    """Return the names of every ``*.prompt.md`` file in this package."""
+
+    return sorted(
+        entry.name.removesuffix(PROMPT_SUFFIX)
+        for entry in resources.files(__name__).iterdir()
+        if entry.name.endswith(PROMPT_SUFFIX)
+    )
+
+
+def prompt_fingerprint(name: str) -> str:
+    """Return a version string for ``name`` that changes when the file changes."""
+
+    resource = _prompt_resource(name)
+    stat = getattr(resource, "stat", None)
+    if callable(stat):
+        result = stat()
+        return f"{result.st_mtime_ns}:{result.st_size}"
+    # Zipped or otherwise non-filesystem resources have no mtime; hash instead.
+    return _content_digest(resource.read_text(encoding="utf-8"))
+
+
+def _content_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def compile_prompt(text: str, fingerprint: str = "") -> CompiledPrompt:
+    """Parse promptdown ``text`` and flatten its primary message."""
+
+    prompt = StructuredPrompt.from_promptdown_string(text)
+    return CompiledPrompt(fingerprint=fingerprint, prompt=prompt, text=prompt_to_text(prompt))
+
+
+class PromptStore:
+    """Per-process cache of compiled prompts keyed by file version.
+
+    Entries are reused until the prompt file's fingerprint changes. A bundle
+    written by ``manage.py compile_prompts`` can seed the store at startup so
+    no markdown is parsed on the request or worker hot path.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, CompiledPrompt] = {}
+
+    def get(self, name: str) -> CompiledPrompt:
+        fingerprint = prompt_fingerprint(name)
+        entry = self._entries.get(name)
+        if entry is not None and entry.fingerprint == fingerprint:
+            return entry
+        text = _prompt_resource(name).read_text(encoding="utf-8")
+        entry = compile_prompt(text, fingerprint)
+        self._entries[name] = entry
+        return entry
+
+    def load_bundle(self, path: str | Path) -> int:
+        """Seed the store from a compiled bundle and return the entries used.
+
+        Bundle entries whose source digest no longer matches the prompt file
+        are skipped so a stale bundle can never hide an edited prompt.
+        """
+
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        if payload.get("version") != BUNDLE_FORMAT_VERSION:
+            return 0
+        loaded = 0
+        for name, data in payload.get("prompts", {}).items():
+            resource = _prompt_resource(name)
+            if not resource.is_file():
+                continue
+            if _content_digest(resource.read_text(encoding="utf-8")) != data["digest"]:
+                continue
+            self._entries[name] = CompiledPrompt(
+                fingerprint=prompt_fingerprint(name),
+                prompt=_prompt_from_dict(data["prompt"]),
+                text=data["text"],
+            )
+            loaded += 1
+        return loaded
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class PromptValidationError(ValueError):
+    def __init__(self, errors: list[str]) -> None:
+        super().__init__("Invalid prompts:\n" + "\n".join(errors))
+        self.errors = errors
+
+
+def build_prompt_bundle(names: list[str] | None = None) -> dict[str, Any]:
+    """Compile ``names`` (default: every prompt) into a JSON-ready bundle.
+
+    Every prompt is validated first; all problems are reported together in a
+    ``PromptValidationError``.
+    """
+
+    prompts: dict[str, Any] = {}
+    errors: list[str] = []
+    for name in names if names is not None else prompt_names():
+        text = _prompt_resource(name).read_text(encoding="utf-8")
+        try:
+            compiled = compile_prompt(text)
+        except ValueError as exc:
+            errors.append(f"{name}: {exc}")
+            continue
+        if not compiled.text.strip():
+            errors.append(f"{name}: prompt has no instruction text")
+            continue
+        prompts[name] = {
+            "digest": _content_digest(text),
+            "prompt": dataclasses.asdict(compiled.prompt),
+            "text": compiled.text,
+        }
+    if errors:
+        raise PromptValidationError(errors)
+    return {"version": BUNDLE_FORMAT_VERSION, "prompts": prompts}
+
+
+def _prompt_from_dict(data: dict[str, Any]) -> StructuredPrompt:
+    conversation = data.get("conversation")
+    return StructuredPrompt(
+        name=data["name"],
+        system_message=data.get("system_message"),
+        developer_message=data.get("developer_message"),
+        conversation=(
+            [Message(**message) for message in conversation]
+            if conversation is not None
+            else None
+        ),
+    )
+
+
+prompt_store = PromptStore()
 
 
 def load_prompt(name: str) -> StructuredPrompt:
-    """Load ``name`` from the ``sample_app.prompts`` package."""
+    """Load ``name`` from the ``sample_app.prompts`` package.
+
+    The parsed prompt is shared per process; use ``apply_template_values`` or
+    ``dataclasses.replace`` rather than mutating it.
+    """
+
+    return prompt_store.get(name).prompt
+
+
+def prompt_text(name: str) -> str:
+    """Return the flattened instruction text for ``name`` (cached)."""
 
-    return StructuredPrompt.from_promptdown_string(_promptdown_text(name))
+    return prompt_store.get(name).text
 
 
 def prompt_to_text(prompt: StructuredPrompt) -> str:
@@ -31,4 +188,16 @@ def prompt_to_text(prompt: StructuredPrompt) -> str:
     return text or ""
 
 
-__all__ = ["load_prompt", "prompt_to_text"]
+__all__ = [
+    "CompiledPrompt",
+    "PromptStore",
+    "PromptValidationError",
+    "build_prompt_bundle",
+    "compile_prompt",
+    "load_prompt",
+    "prompt_fingerprint",
+    "prompt_names",
+    "prompt_store",
+    "prompt_text",
+    "prompt_to_text",
+]
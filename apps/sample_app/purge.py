@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from agentic_django.models import AgentEvent, AgentRun, AgentSession, AgentSessionItem
+from agentic_django.sessions import get_session
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PURGE_BATCH_SIZE = 500
+RETIRED_AT_KEY = "retired_at"
+
+# One thread, so background purges queue behind each other instead of
+# competing for the database write lock.
+_purge_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sample-app-purge")
+
+
+def purge_batch_size() -> int:
+    return getattr(settings, "SAMPLE_APP_PURGE_BATCH_SIZE", DEFAULT_PURGE_BATCH_SIZE)
+
+
+def retire_session(session: AgentSession) -> None:
+    """Mark ``session`` as abandoned so its history can be purged later."""
+
+    session.metadata = {**session.metadata, RETIRED_AT_KEY: timezone.now().isoformat()}
+    session.save(update_fields=["metadata"])
+
+
+def retired_sessions() -> QuerySet[AgentSession]:
+    return AgentSession.objects.filter(metadata__has_key=RETIRED_AT_KEY)
+
+
+def delete_in_batches(queryset: QuerySet[Any], batch_size: int) -> int:
+    """Delete ``queryset`` by primary key, ``batch_size`` rows per statement.
+
+    Each batch is its own short write, so a large purge never holds the
+    database write lock for long (SQLite allows one writer at a time).
+    """
+
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+    total = 0
+    base = queryset.order_by("pk")
+    while True:
+        ids = list(base.values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return total
+        base.model.objects.filter(pk__in=ids).delete()
+        total += len(ids)
+
+
+def purge_session_items(session_id: Any, batch_size: int | None = None) -> int:
+    """Delete every stored item of a session in bounded chunks."""
+
+    return delete_in_batches(
+        AgentSessionItem.objects.filter(session_id=session_id),
+        batch_size or purge_batch_size(),
+    )
+
+
+def purge_session(session_id: Any, batch_size: int | None = None) -> int:
+    """Empty a retired session: its items in bounded chunks, then the backend session.
+
+    ``clear_session`` runs last, when the chunked delete has left no rows for
+    it to remove in one statement, so a custom session backend can still drop
+    state it keeps outside ``AgentSessionItem``.
+    """
+
+    deleted = purge_session_items(session_id, batch_size)
+    session = AgentSession.objects.select_related("owner").filter(pk=session_id).first()
+    if session is not None:
+        async_to_sync(get_session(session.session_key, session.owner).clear_session)()
+    return deleted
+
+
+def purge_after_commit(session_id: Any) -> None:
+    """Purge a session on a background thread once the current transaction commits.
+
+    For task backends that run tasks inline, so a reset responds before the
+    purge runs instead of waiting for it.
+    """
+
+    transaction.on_commit(lambda: _purge_executor.submit(_purge_in_background, session_id))
+
+
+def _purge_in_background(session_id: Any) -> None:
+    close_old_connections()
+    try:
+        purge_session(session_id)
+    except Exception:
+        # The session stays retired, so sweep_agent_sessions will purge it.
+        logger.exception("Background purge of agent session %s failed", session_id)
+    finally:
+        connection.close()
+
+
+def delete_sessions(sessions: QuerySet[AgentSession], batch_size: int | None = None) -> int:
+    """Delete sessions with their items, events, and runs in bounded chunks."""
+
+    batch_size = batch_size or purge_batch_size()
+    total = 0
+    base = sessions.order_by("pk")
+    while True:
+        session_ids = list(base.values_list("pk", flat=True)[:batch_size])
+        if not session_ids:
+            return total
+        delete_in_batches(AgentSessionItem.objects.filter(session_id__in=session_ids), batch_size)
+        delete_in_batches(AgentEvent.objects.filter(run__session_id__in=session_ids), batch_size)
+        delete_in_batches(AgentRun.objects.filter(session_id__in=session_ids), batch_size)
+        AgentSession.objects.filter(pk__in=session_ids).delete()
+        total += len(session_ids)
+
+
+__all__ = [
+    "RETIRED_AT_KEY",
+    "delete_in_batches",
+    "delete_sessions",
+    "purge_after_commit",
+    "purge_batch_size",
+    "purge_session",
+    "purge_session_items",
+    "retire_session",
+    "retired_sessions",
+]
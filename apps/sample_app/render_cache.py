@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import caches
+
+from sample_app.metrics import RENDER_CACHE_LOOKUPS
+
+DEFAULT_MAX_ENTRIES = 1024
+# Stored items never change, so the TTL only bounds how long Redis keeps them.
+DEFAULT_SHARED_TIMEOUT = 24 * 60 * 60
+SHARED_KEY_PREFIX = "sample_app:session-item"
+
+
+class RenderCache:
+    """Bounded LRU of rendered session item contexts.
+
+    Session items are append-only, so a stored item renders the same for as
+    long as it exists. Entries live in-process first and, when a Django cache
+    alias is configured, are shared across processes through it for
+    ``timeout`` seconds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        cache_alias: str | None = None,
+        timeout: int = DEFAULT_SHARED_TIMEOUT,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.max_entries = max_entries
+        self.cache_alias = cache_alias
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_render(
+        self,
+        key: str,
+        render: Callable[[], dict[str, Any]],
+    ) -> dict[str, Any]:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if cached is not None:
+            RENDER_CACHE_LOOKUPS.labels("hit").inc()
+            return dict(cached)
+
+        value = self._shared_get(key)
+        if value is None:
+            value = render()
+            self._shared_set(key, value)
+            with self._lock:
+                self.misses += 1
+            RENDER_CACHE_LOOKUPS.labels("miss").inc()
+        else:
+            with self._lock:
+                self.hits += 1
+            RENDER_CACHE_LOOKUPS.labels("hit").inc()
+        self._store(key, value)
+        return dict(value)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def _store(self, key: str, value: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _shared_get(self, key: str) -> dict[str, Any] | None:
+        if not self.cache_alias:
+            return None
+        return caches[self.cache_alias].get(f"{SHARED_KEY_PREFIX}:{key}")
+
+    def _shared_set(self, key: str, value: dict[str, Any]) -> None:
+        if not self.cache_alias:
+            return
+        caches[self.cache_alias].set(f"{SHARED_KEY_PREFIX}:{key}", value, timeout=self.timeout)
+
+
+def payload_digest(payload: Any) -> str:
+    """Return a stable digest of a JSON-like session item payload."""
+
+    encoded = json.dumps(
+        payload,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def render_cache_key(
+    payload: Any,
+    item_id: Any = None,
+    sequence: Any = None,
+    created_at: datetime | None = None,
+) -> str:
+    """Return the cache key for ``payload`` rendered as item ``item_id``.
+
+    A stored item is keyed by its id, sequence, and creation time without
+    reading the payload; the creation time tells apart rows that reuse the id
+    of a purged one, as SQLite does. Only items without an id pay for a digest.
+    """
+
+    if item_id is not None:
+        stamp = created_at.timestamp() if created_at is not None else "-"
+        return f"{item_id}:{sequence}:{stamp}"
+    return f"-:{payload_digest(payload)}"
+
+
+@lru_cache(maxsize=None)
+def get_render_cache() -> RenderCache:
+    """Return the process-wide render cache configured from settings."""
+
+    return RenderCache(
+        max_entries=getattr(
+            settings,
+            "SAMPLE_APP_RENDER_CACHE_MAX_ENTRIES",
+            DEFAULT_MAX_ENTRIES,
+        ),
+        cache_alias=getattr(settings, "SAMPLE_APP_RENDER_CACHE_ALIAS", None),
+        timeout=getattr(settings, "SAMPLE_APP_RENDER_CACHE_TIMEOUT", DEFAULT_SHARED_TIMEOUT),
+    )
+
+
+__all__ = ["RenderCache", "get_render_cache", "payload_digest", "render_cache_key"]
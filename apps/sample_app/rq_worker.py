@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from rq.worker import SimpleWorker
+
+from sample_app.metrics import mark_process_dead
+
+
+class MetricsWorker(SimpleWorker):
+    """RQ worker that performs each job in its own process instead of a fork.
+
+    ``rq.Worker`` forks a work horse per job, and under
+    ``PROMETHEUS_MULTIPROC_DIR`` every horse leaves its own metric files
+    behind. Performing jobs in the worker keeps one set of files per worker,
+    marked dead when the worker stops.
+    """
+
+    def teardown(self) -> None:
+        super().teardown()
+        mark_process_dead()
+
+
+__all__ = ["MetricsWorker"]
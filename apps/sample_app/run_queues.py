@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from contextvars import ContextVar
+from typing import Any
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+from django.http import HttpRequest, HttpResponseBase
+from django.utils.decorators import sync_and_async_middleware
+
+from agentic_django.models import AgentRun
+
+RUN_QUEUE_KEY = "queue"
+RUN_TASK_PATH = "agentic_django.tasks.run_agent_task"
+DEFAULT_QUEUE_PRIORITY = ["interactive", "default", "batch", "maintenance"]
+DEFAULT_RUN_QUEUE = "interactive"
+
+_request_origin: ContextVar[str | None] = ContextVar("sample_app_request_origin", default=None)
+
+
+def queue_priority() -> list[str]:
+    """Return every queue name, highest priority first."""
+
+    return list(getattr(settings, "SAMPLE_APP_QUEUE_PRIORITY", DEFAULT_QUEUE_PRIORITY))
+
+
+def uses_rq_backend() -> bool:
+    """Return whether the default task backend puts tasks on RQ queues."""
+
+    try:
+        from django_tasks.backends.rq import RQBackend
+    except ImportError:  # django-tasks without the rq extra
+        return False
+    from django_tasks import default_task_backend
+
+    return isinstance(default_task_backend, RQBackend)
+
+
+def route_run(agent_key: str, origin: str | None) -> str:
+    """Pick the queue for a new run: by agent key first, then by request origin."""
+
+    by_agent = getattr(settings, "SAMPLE_APP_RUN_QUEUES_BY_AGENT", {})
+    if agent_key in by_agent:
+        return by_agent[agent_key]
+    by_origin = getattr(settings, "SAMPLE_APP_RUN_QUEUES_BY_ORIGIN", {})
+    if origin in by_origin:
+        return by_origin[origin]
+    return getattr(settings, "SAMPLE_APP_DEFAULT_RUN_QUEUE", DEFAULT_RUN_QUEUE)
+
+
+def run_queue(run: AgentRun) -> str:
+    return (run.metadata or {}).get(RUN_QUEUE_KEY) or "default"
+
+
+@receiver(pre_save, sender=AgentRun, dispatch_uid="sample_app.run_queues.assign_queue")
+def _assign_queue(sender: Any, instance: AgentRun, **kwargs: Any) -> None:
+    # Recorded once at creation so re-dispatched runs keep their queue.
+    if not instance._state.adding:
+        return
+    metadata = instance.metadata if isinstance(instance.metadata, dict) else {}
+    if not metadata.get(RUN_QUEUE_KEY):
+        metadata[RUN_QUEUE_KEY] = route_run(instance.agent_key, _request_origin.get())
+    instance.metadata = metadata
+
+
+def _origin(request: HttpRequest) -> str:
+    return "browser" if getattr(request, "htmx", False) else "api"
+
+
+@sync_and_async_middleware
+def run_origin_middleware(
+    get_response: Callable[[HttpRequest], Any],
+) -> Callable[[HttpRequest], Any]:
+    """Tell queue routing whether a run was created from the browser or the API.
+
+    Place after ``HtmxMiddleware``; the browser form posts with HTMX.
+    """
+
+    if iscoroutinefunction(get_response):
+
+        async def async_middleware(request: HttpRequest) -> HttpResponseBase:
+            token = _request_origin.set(_origin(request))
+            try:
+                return await get_response(request)
+            finally:
+                _request_origin.reset(token)
+
+        return async_middleware
+
+    def middleware(request: HttpRequest) -> HttpResponseBase:
+        token = _request_origin.set(_origin(request))
+        try:
+            return get_response(request)
+        finally:
+            _request_origin.reset(token)
+
+    return middleware
+
+
+def queue_for_run_id(run_id: str) -> str:
+    metadata = AgentRun.objects.filter(pk=run_id).values_list("metadata", flat=True).first()
+    return (metadata or {}).get(RUN_QUEUE_KEY) or "default"
+
+
+class QueueRoutingMixin:
+    """Task backend mixin that enqueues each agent run on the queue it was routed to.
+
+    ``agentic_django`` enqueues every run (and re-dispatches waiting ones) on
+    the task's default queue; the queue stored on the run wins here.
+    """
+
+    def enqueue(self, task: Any, args: Any, kwargs: Any) -> Any:
+        if task.module_path == RUN_TASK_PATH and args:
+            task = task.using(queue_name=queue_for_run_id(str(args[0])))
+        return super().enqueue(task, args, kwargs)  # type: ignore[misc]
+
+
+__all__ = [
+    "QueueRoutingMixin",
+    "queue_for_run_id",
+    "queue_priority",
+    "route_run",
+    "run_origin_middleware",
+    "run_queue",
+    "uses_rq_backend",
+]
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Any
+
+from agents.items import ModelResponse, TResponseInputItem, TResponseStreamEvent
+from agents.models.interface import Model, ModelTracing
+from agents.models.multi_provider import MultiProvider
+from django.conf import settings
+
+from sample_app.metrics import MODEL_INPUT_ITEMS, MODEL_INPUT_TOKENS
+
+logger = logging.getLogger(__name__)
+
+TRUNCATED_MARKER = " [truncated]"
+SUMMARY_PREFIX = "Summary of the earlier conversation (older turns were compacted):"
+SUMMARY_LINE_CHARS = 300
+
+
+@dataclass(frozen=True)
+class CompactionPolicy:
+    """Thresholds that decide when and how model-facing history is compacted."""
+
+    max_items: int = 60
+    max_tokens: int = 12000
+    keep_recent_items: int = 20
+    tool_output_chars: int = 1500
+    summary_chars: int = 4000
+
+    @classmethod
+    def from_settings(cls) -> CompactionPolicy:
+        defaults = cls()
+        return cls(
+            max_items=getattr(settings, "SAMPLE_APP_COMPACTION_MAX_ITEMS", defaults.max_items),
+            max_tokens=getattr(settings, "SAMPLE_APP_COMPACTION_MAX_TOKENS", defaults.max_tokens),
+            keep_recent_items=getattr(
+                settings,
+                "SAMPLE_APP_COMPACTION_KEEP_ITEMS",
+                defaults.keep_recent_items,
+            ),
+            tool_output_chars=getattr(
+                settings,
+                "SAMPLE_APP_COMPACTION_TOOL_OUTPUT_CHARS",
+                defaults.tool_output_chars,
+            ),
+            summary_chars=getattr(
+                settings,
+                "SAMPLE_APP_COMPACTION_SUMMARY_CHARS",
+                defaults.summary_chars,
+            ),
+        )
+
+
+@dataclass(frozen=True)
+class CompactionReport:
+    items_before: int
+    items_after: int
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def compacted(self) -> bool:
+        return self.items_after != self.items_before or self.tokens_after != self.tokens_before
+
+
+def estimate_tokens(items: list[dict[str, Any]]) -> int:
+    """Roughly estimate model tokens for ``items`` (about four characters each)."""
+
+    characters = sum(len(json.dumps(item, default=str, ensure_ascii=False)) for item in items)
+    return -(-characters // 4)
+
+
+def _is_user_message(item: dict[str, Any]) -> bool:
+    return item.get("role") == "user" and item.get("type", "message") == "message"
+
+
+def _message_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(
+            part["text"]
+            for part in content
+            if isinstance(part, dict) and isinstance(part.get("text"), str)
+        )
+    return ""
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    return text[:limit].rstrip() + TRUNCATED_MARKER
+
+
+def _summary_line(item: dict[str, Any]) -> str | None:
+    item_type = item.get("type", "message")
+    if item_type == "message" and item.get("role") in {"user", "assistant"}:
+        text = _message_text(item.get("content"))
+        if text:
+            speaker = "User" if item["role"] == "user" else "Assistant"
+            return f"- {speaker}: {_clip(text, SUMMARY_LINE_CHARS)}"
+    if item_type == "function_call":
+        call = f"{item.get('name', 'tool')}({item.get('arguments', '')})"
+        return f"- Tool call: {_clip(call, SUMMARY_LINE_CHARS)}"
+    return None
+
+
+def _summary_item(items: list[dict[str, Any]], summary_chars: int) -> dict[str, Any]:
+    lines = [line for line in map(_summary_line, items) if line]
+    kept: list[str] = []
+    length = 0
+    # Keep the most recent lines when the summary would exceed its budget.
+    for line in reversed(lines):
+        length += len(line) + 1
+        if length > summary_chars:
+            kept.append("- ...")
+            break
+        kept.append(line)
+    return {"role": "system", "content": "\n".join([SUMMARY_PREFIX, *reversed(kept)])}
+
+
+def _truncate_tool_output(item: dict[str, Any], limit: int) -> dict[str, Any]:
+    output = item.get("output")
+    if item.get("type") != "function_call_output" or not isinstance(output, str):
+        return item
+    if len(output) <= limit:
+        return item
+    return {**item, "output": output[:limit] + TRUNCATED_MARKER}
+
+
+def _tail_start(items: list[dict[str, Any]], keep_recent_items: int) -> int:
+    # Cut only at a user message so tool calls stay paired with their outputs.
+    target = max(len(items) - keep_recent_items, 0)
+    user_indexes = [index for index, item in enumerate(items) if _is_user_message(item)]
+    later = [index for index in user_indexes if index >= target]
+    if later:
+        return later[0]
+    earlier = [index for index in user_indexes if index < target]
+    return earlier[-1] if earlier else 0
+
+
+def compact_history(
+    items: list[dict[str, Any]],
+    policy: CompactionPolicy,
+) -> tuple[list[dict[str, Any]], CompactionReport]:
+    """Return the model-facing view of ``items`` and what compaction saved.
+
+    Below both thresholds the history is returned untouched. Otherwise turns
+    before the last ``keep_recent_items`` are replaced by one summary message
+    and tool outputs from earlier turns in the kept tail are truncated. The
+    current turn is always sent in full.
+    """
+
+    tokens_before = estimate_tokens(items)
+    if len(items) <= policy.max_items and tokens_before <= policy.max_tokens:
+        report = CompactionReport(len(items), len(items), tokens_before, tokens_before)
+        return items, report
+
+    start = _tail_start(items, policy.keep_recent_items)
+    recent = items[start:]
+    last_user = max(
+        (index for index, item in enumerate(recent) if _is_user_message(item)),
+        default=len(recent),
+    )
+    compacted = [
+        _truncate_tool_output(item, policy.tool_output_chars) if index < last_user else item
+        for index, item in enumerate(recent)
+    ]
+    if start:
+        compacted.insert(0, _summary_item(items[:start], policy.summary_chars))
+    report = CompactionReport(
+        items_before=len(items),
+        items_after=len(compacted),
+        tokens_before=tokens_before,
+        tokens_after=estimate_tokens(compacted),
+    )
+    return compacted, report
+
+
+def compact_model_input(agent_key: str, items: list[Any]) -> list[Any]:
+    """Return the model-facing input for one request and record what compaction saved.
+
+    Item and estimated token counts before and after are observed on the
+    ``sample_app_model_input_*`` histograms for every request, so the share
+    of compacted requests and their savings show up in ``/metrics``.
+    """
+
+    if not getattr(settings, "SAMPLE_APP_COMPACTION_ENABLED", True):
+        return items
+    compacted, report = compact_history(items, CompactionPolicy.from_settings())
+    MODEL_INPUT_ITEMS.labels(agent_key, "before").observe(report.items_before)
+    MODEL_INPUT_ITEMS.labels(agent_key, "after").observe(report.items_after)
+    MODEL_INPUT_TOKENS.labels(agent_key, "before").observe(report.tokens_before)
+    MODEL_INPUT_TOKENS.labels(agent_key, "after").observe(report.tokens_after)
+    if report.compacted:
+        logger.info(
+            "Compacted model input for agent %s: %d -> %d items, ~%d -> ~%d tokens",
+            agent_key,
+            report.items_before,
+            report.items_after,
+            report.tokens_before,
+            report.tokens_after,
+        )
+    return compacted
+
+
+class CompactingModel(Model):
+    """Model wrapper that compacts each request's input before the wrapped model sees it.
+
+    Attached to agents where ``agent_registry`` builds them, so no run option
+    can replace or drop it the way a per-run ``RunConfig`` could be. Only the
+    request changes; stored ``AgentSessionItem`` rows keep the full history.
+    A model name is resolved through the SDK's default provider on first use.
+    """
+
+    def __init__(self, model: str | Model, agent_key: str) -> None:
+        self.wrapped = model
+        self.agent_key = agent_key
+        self._model = model if isinstance(model, Model) else None
+
+    @property
+    def model(self) -> Model:
+        if self._model is None:
+            self._model = MultiProvider().get_model(str(self.wrapped))
+        return self._model
+
+    def _input(self, input: str | list[TResponseInputItem]) -> str | list[TResponseInputItem]:
+        if isinstance(input, str):
+            return input
+        return compact_model_input(self.agent_key, list(input))
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: Any,
+        tools: list[Any],
+        output_schema: Any,
+        handoffs: list[Any],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        conversation_id: str | None,
+        prompt: Any | None,
+    ) -> ModelResponse:
+        return await self.model.get_response(
+            system_instructions,
+            self._input(input),
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            previous_response_id=previous_response_id,
+            conversation_id=conversation_id,
+            prompt=prompt,
+        )
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: Any,
+        tools: list[Any],
+        output_schema: Any,
+        handoffs: list[Any],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        conversation_id: str | None,
+        prompt: Any | None,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        async for event in self.model.stream_response(
+            system_instructions,
+            self._input(input),
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            previous_response_id=previous_response_id,
+            conversation_id=conversation_id,
+            prompt=prompt,
+        ):
+            yield event
+
+    async def close(self) -> None:
+        if self._model is not None:
+            await self._model.close()
+
+
+__all__ = [
+    "CompactingModel",
+    "CompactionPolicy",
+    "CompactionReport",
+    "compact_history",
+    "compact_model_input",
+    "estimate_tokens",
+]
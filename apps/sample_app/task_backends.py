@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from django_tasks.backends.rq import RQBackend
+
+from sample_app.run_queues import QueueRoutingMixin
+
+
+class RoutingRQBackend(QueueRoutingMixin, RQBackend):
+    """RQ backend that puts agent runs on their routed queue instead of ``default``."""
+
+
+__all__ = ["RoutingRQBackend"]
@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+from django_tasks import task
+
+from sample_app.purge import purge_session
+
+
+@task(queue_name="maintenance")
+def purge_agent_session(session_id: str) -> int:
+    return purge_session(session_id)
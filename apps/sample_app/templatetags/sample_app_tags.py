@@ -1,75 +1,23 @@
 from __future__ import annotations
 
 import json
-import re
+from datetime import datetime
 from typing import Any
 
 from django import template
+from django.conf import settings
 from django.utils.html import escape
 from django.utils.safestring import mark_safe
 
+from agentic_django.models import AgentRun, AgentSession, AgentSessionItem
 from agentic_django.serializers import _to_jsonable
+from sample_app.conversation import conversation_page
+from sample_app.markdown import render_markdown
+from sample_app.render_cache import get_render_cache, render_cache_key
+from sample_app.tool_calls import TOOL_CALL_SUMMARY_KEY, TOOL_CALLS_KEY
 
 register = template.Library()
 
-_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
-_ITALIC_RE = re.compile(r"\*(.+?)\*")
-_ITALIC_UNDERSCORE_RE = re.compile(r"_(.+?)_")
-
-
-def _format_inline(text: str) -> str:
-    escaped = escape(text)
-    escaped = _BOLD_RE.sub(r"<strong>\1</strong>", escaped)
-    escaped = _ITALIC_RE.sub(r"<em>\1</em>", escaped)
-    escaped = _ITALIC_UNDERSCORE_RE.sub(r"<em>\1</em>", escaped)
-    return escaped
-
-
-def _render_markdown(text: str) -> str:
-    lines = text.splitlines()
-    html_parts: list[str] = []
-    paragraph_lines: list[str] = []
-    current_list: str | None = None
-
-    def flush_paragraph() -> None:
-        if paragraph_lines:
-            formatted = "<br>".join(_format_inline(line) for line in paragraph_lines)
-            html_parts.append(f"<p>{formatted}</p>")
-            paragraph_lines.clear()
-
-    def close_list() -> None:
-        nonlocal current_list
-        if current_list:
-            html_parts.append(f"</{current_list}>")
-            current_list = None
-
-    for line in lines:
-        stripped = line.strip()
-        if not stripped:
-            flush_paragraph()
-            close_list()
-            continue
-
-        ul_match = re.match(r"^[-*]\s+(.*)$", stripped)
-        ol_match = re.match(r"^\d+\.\s+(.*)$", stripped)
-        if ul_match or ol_match:
-            flush_paragraph()
-            list_type = "ul" if ul_match else "ol"
-            item_text = ul_match.group(1) if ul_match else ol_match.group(1)
-            if current_list != list_type:
-                close_list()
-                html_parts.append(f"<{list_type}>")
-                current_list = list_type
-            html_parts.append(f"<li>{_format_inline(item_text)}</li>")
-            continue
-
-        close_list()
-        paragraph_lines.append(line)
-
-    flush_paragraph()
-    close_list()
-    return "\n".join(html_parts) if html_parts else "<p></p>"
-
 
 def _extract_content_text(content: Any) -> str:
     if isinstance(content, str):
@@ -147,6 +95,43 @@ def _extract_summary_text(summary: Any) -> str:
     return _format_json_like(summary)
 
 
+@register.inclusion_tag("agentic_django/partials/conversation.html")
+def recent_conversation(session: AgentSession) -> dict[str, Any]:
+    items, earlier_before = conversation_page(session)
+    return {"session": session, "items": items, "earlier_before": earlier_before}
+
+
+@register.simple_tag
+def run_stream_enabled() -> bool:
+    return bool(getattr(settings, "SAMPLE_APP_RUN_STREAM_ENABLED", False))
+
+
+@register.simple_tag
+def tool_call_timeline(run: AgentRun) -> dict[str, Any] | None:
+    """Lay out a run's recorded tool calls as bars on a shared time axis."""
+
+    metadata = run.metadata or {}
+    calls = metadata.get(TOOL_CALLS_KEY) or []
+    if not calls:
+        return None
+    span = max(call["offset_ms"] + call["duration_ms"] for call in calls) or 1.0
+    rows = [
+        {
+            **call,
+            "left_pct": round(call["offset_ms"] / span * 100, 2),
+            # Keep instant calls visible as a sliver.
+            "width_pct": max(round(call["duration_ms"] / span * 100, 2), 0.5),
+        }
+        for call in calls
+    ]
+    return {
+        "calls": rows,
+        "summary": metadata.get(TOOL_CALL_SUMMARY_KEY, {}),
+        "dropped": metadata.get("tool_calls_dropped", 0),
+        "span_ms": span,
+    }
+
+
 @register.filter
 def pretty_json(value: Any) -> str:
     jsonable = _to_jsonable(value)
@@ -162,7 +147,7 @@ def pretty_json(value: Any) -> str:
 def render_output(value: Any) -> str:
     jsonable = _to_jsonable(value)
     if isinstance(jsonable, str):
-        return mark_safe(_render_markdown(jsonable))
+        return mark_safe(render_markdown(jsonable))
     payload = json.dumps(jsonable, indent=2, sort_keys=True, ensure_ascii=False)
     payload = payload.replace("\\n", "\n")
     return mark_safe(f"<pre>{escape(payload)}</pre>")
@@ -170,6 +155,25 @@ def render_output(value: Any) -> str:
 
 @register.filter
 def session_item_context(value: Any) -> dict[str, Any]:
+    payload, *identity = _unwrap_session_item(value)
+    key = render_cache_key(payload, *identity)
+    return get_render_cache().get_or_render(
+        key,
+        lambda: _build_session_item_context(payload),
+    )
+
+
+def _unwrap_session_item(value: Any) -> tuple[Any, Any, Any, datetime | None]:
+    # The conversation partial receives model rows from ``agent_conversation``
+    # and ``{"payload": ...}`` wrappers from the package session-items view.
+    if isinstance(value, AgentSessionItem):
+        return value.payload, value.pk, value.sequence, value.created_at
+    if isinstance(value, dict) and value.keys() == {"payload"}:
+        return value["payload"], None, None, None
+    return value, None, None, None
+
+
+def _build_session_item_context(value: Any) -> dict[str, Any]:
     jsonable = _to_jsonable(value)
     context = {
         "kind": "event",
@@ -188,7 +192,7 @@ def session_item_context(value: Any) -> dict[str, Any]:
                 {
                     "kind": role or "assistant",
                     "label": label,
-                    "body": _render_markdown(text),
+                    "body": render_markdown(text),
                     "meta": "",
                     "is_code": False,
                 }
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
 from typing import Any
 
 import pytest
@@ -7,6 +8,16 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AbstractBaseUser
 from django.test import Client
 
+from sample_app.admission import get_rate_limiter
+
+
+@pytest.fixture(autouse=True)
+def _fresh_rate_limiter() -> Iterator[None]:
+    # Buckets are keyed by user id, which tests reuse.
+    get_rate_limiter.cache_clear()
+    yield
+    get_rate_limiter.cache_clear()
+
 
 @pytest.fixture
 def user(db: Any) -> AbstractBaseUser:
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import pytest
+from django.contrib.auth.models import AbstractBaseUser
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from agentic_django.models import AgentRun, AgentSession
+from sample_app.admission import Bucket, MemoryRateLimiter, admission_backend
+
+pytestmark = pytest.mark.django_db
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _rejected(reason: str) -> float:
+    return REGISTRY.get_sample_value("sample_app_runs_rejected_total", {"reason": reason}) or 0.0
+
+
+def _post_run(client: Client, session_key: str, **headers: str) -> object:
+    return client.post(
+        reverse("agents:run-create"),
+        data={"session_key": session_key, "input": "Hello"},
+        **headers,
+    )
+
+
+@pytest.fixture(autouse=True)
+def _no_enqueue(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("agentic_django.views.enqueue_agent_run", lambda run_id: None)
+
+
+def test_memory_buckets_refill_and_report_wait() -> None:
+    clock = FakeClock()
+    limiter = MemoryRateLimiter(clock=clock)
+    bucket = Bucket("user:1", capacity=2, rate=1.0)
+
+    assert limiter.acquire([bucket]) == 0.0
+    assert limiter.acquire([bucket]) == 0.0
+    assert limiter.acquire([bucket]) == pytest.approx(1.0)
+    clock.now += 0.5
+    assert limiter.acquire([bucket]) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert limiter.acquire([bucket]) == 0.0
+
+
+def test_global_rejection_leaves_user_tokens_untouched() -> None:
+    limiter = MemoryRateLimiter(clock=FakeClock())
+    user = Bucket("user:1", capacity=1, rate=1.0)
+    exhausted = Bucket("global", capacity=1, rate=0.1)
+    limiter.acquire([exhausted])
+
+    assert limiter.acquire([user, exhausted]) == pytest.approx(10.0)
+    assert limiter.acquire([user]) == 0.0
+
+
+@override_settings(SAMPLE_APP_ADMISSION_USER_RATE="1/m", SAMPLE_APP_ADMISSION_SESSION_MAX_ACTIVE=0)
+def test_run_create_refused_by_view_refunds_token(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    invalid = client_logged_in.post(reverse("agents:run-create"), data={"session_key": "s"})
+    admitted = _post_run(client_logged_in, "s")
+
+    assert invalid.status_code == 400
+    assert admitted.status_code == 200
+    assert _post_run(client_logged_in, "s").status_code == 429
+
+
+def test_backend_follows_task_backend(monkeypatch: pytest.MonkeyPatch) -> None:
+    assert admission_backend() == "memory"
+    monkeypatch.setattr("sample_app.admission.uses_rq_backend", lambda: True)
+    assert admission_backend() == "redis"
+    with override_settings(SAMPLE_APP_ADMISSION_BACKEND="memory"):
+        assert admission_backend() == "memory"
+
+
+@override_settings(SAMPLE_APP_ADMISSION_USER_RATE="2/m", SAMPLE_APP_ADMISSION_SESSION_MAX_ACTIVE=0)
+def test_run_create_over_user_rate_gets_429_with_retry_after(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    rejected = _rejected("rate")
+
+    responses = [_post_run(client_logged_in, "rate-session") for _ in range(3)]
+
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert responses[2]["Retry-After"] == "30"
+    assert responses[2].json()["reason"] == "rate"
+    assert AgentRun.objects.filter(owner=user).count() == 2
+    assert _rejected("rate") == rejected + 1
+
+
+def test_session_with_active_run_gets_htmx_notice(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    session = AgentSession.objects.create(owner=user, session_key="busy-session")
+    AgentRun.objects.create(session=session, owner=user, agent_key="demo", input_payload="Hi")
+
+    response = _post_run(client_logged_in, "busy-session", HTTP_HX_REQUEST="true")
+
+    assert response.status_code == 429
+    assert response["HX-Retarget"] == "#run-notice"
+    assert response["Retry-After"] == "5"
+    assert "already has a run in progress" in response.content.decode()
+    assert AgentRun.objects.filter(session=session).count() == 1
+
+
+def test_run_racing_past_session_cap_is_undone(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    session = AgentSession.objects.create(owner=user, session_key="raced-session")
+    AgentRun.objects.create(session=session, owner=user, agent_key="demo", input_payload="Hi")
+    # The concurrent request's run did not exist yet when this one was counted.
+    monkeypatch.setattr("sample_app.admission.admit_run", lambda user, session_key: None)
+    rejected = _rejected("session")
+
+    response = _post_run(client_logged_in, "raced-session")
+
+    assert response.status_code == 429
+    assert response.json()["reason"] == "session"
+    assert AgentRun.objects.filter(session=session).count() == 1
+    assert _rejected("session") == rejected + 1
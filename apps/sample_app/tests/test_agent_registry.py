@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import pytest
+
+from sample_app import agent_registry
+from sample_app.agent_registry import (
+    clear_agent_cache,
+    get_agent_registry,
+    prebuild_agents,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_agent_cache() -> Iterator[None]:
+    clear_agent_cache()
+    yield
+    clear_agent_cache()
+
+
+def test_registry_reuses_built_agent() -> None:
+    registry = get_agent_registry()
+
+    first = registry["demo"]()
+    second = get_agent_registry()["demo"]()
+
+    assert first is second
+    assert "travel assistant" in first.instructions
+
+
+def test_model_setting_change_rebuilds_agent(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_DEFAULT_MODEL", "gpt-4.1")
+    first = get_agent_registry()["demo"]()
+
+    monkeypatch.setenv("OPENAI_DEFAULT_MODEL", "gpt-4.1-mini")
+    second = get_agent_registry()["demo"]()
+
+    assert first is not second
+    assert second.model.wrapped == "gpt-4.1-mini"
+
+
+def test_prompt_change_rebuilds_agent(monkeypatch: pytest.MonkeyPatch) -> None:
+    first = get_agent_registry()["demo"]()
+
+    monkeypatch.setattr(agent_registry, "prompt_fingerprint", lambda name: "edited")
+    second = get_agent_registry()["demo"]()
+    third = get_agent_registry()["demo"]()
+
+    assert first is not second
+    assert second is third
+
+
+def test_prebuild_agents_builds_every_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    built: list[str] = []
+    original_builder, prompts = agent_registry.AGENT_BUILDERS["demo"]
+
+    def _tracking_builder() -> object:
+        built.append("demo")
+        return original_builder()
+
+    monkeypatch.setitem(agent_registry.AGENT_BUILDERS, "demo", (_tracking_builder, prompts))
+
+    assert prebuild_agents() == ["demo"]
+    get_agent_registry()["demo"]()
+
+    assert built == ["demo"]
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from django.contrib.auth.models import AbstractBaseUser
+
+from agentic_django.models import AgentRun, AgentSession
+from sample_app import async_worker
+from sample_app.async_worker import (
+    RUN_TASK_PATH,
+    AsyncRunWorker,
+    RQJobSource,
+    execute_run_async,
+)
+from sample_app.run_queues import queue_priority
+
+
+class MemoryJobSource:
+    def __init__(self, jobs: list[Any]) -> None:
+        self.jobs = deque(jobs)
+        self.results: dict[str, BaseException | None] = {}
+        self.heartbeats: list[list[str]] = []
+
+    def dequeue(self, timeout: int) -> Any | None:
+        return self.jobs.popleft() if self.jobs else None
+
+    def started(self, job: Any) -> None:
+        pass
+
+    def heartbeat(self, jobs: list[Any]) -> None:
+        self.heartbeats.append(sorted(job.id for job in jobs))
+
+    def finished(self, job: Any, error: BaseException | None) -> None:
+        self.results[job.id] = error
+
+
+def _run_job(run_id: str) -> SimpleNamespace:
+    return SimpleNamespace(id=f"job-{run_id}", func_name=RUN_TASK_PATH, args=[run_id])
+
+
+class FakeRuns:
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+        self.release = asyncio.Event()
+
+    async def execute(self, run_id: str) -> None:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await self.release.wait()
+            if run_id == "bad":
+                raise RuntimeError("model error")
+        finally:
+            self.active -= 1
+
+
+def test_worker_caps_concurrency_and_drains_in_burst_mode(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    source = MemoryJobSource([_run_job(str(index)) for index in range(7)] + [_run_job("bad")])
+
+    async def scenario() -> FakeRuns:
+        runs = FakeRuns()
+        monkeypatch.setattr(async_worker, "execute_run_async", runs.execute)
+        worker = AsyncRunWorker(source, concurrency=3, poll_timeout=0)
+        serving = asyncio.create_task(worker.run(burst=True))
+        await asyncio.sleep(0.05)
+        assert worker.in_flight == 3
+        runs.release.set()
+        await serving
+        assert worker.processed == 8
+        assert worker.failed == 1
+        return runs
+
+    runs = asyncio.run(scenario())
+
+    assert runs.peak == 3
+    assert source.heartbeats == []
+    assert source.results["job-0"] is None
+    assert isinstance(source.results["job-bad"], RuntimeError)
+
+
+def test_stop_finishes_in_flight_runs_and_leaves_the_rest_queued(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    source = MemoryJobSource([_run_job(str(index)) for index in range(5)])
+
+    async def scenario() -> AsyncRunWorker:
+        runs = FakeRuns()
+        monkeypatch.setattr(async_worker, "execute_run_async", runs.execute)
+        worker = AsyncRunWorker(source, concurrency=2, poll_timeout=0)
+        serving = asyncio.create_task(worker.run())
+        await asyncio.sleep(0.05)
+        worker.stop()
+        runs.release.set()
+        await serving
+        return worker
+
+    worker = asyncio.run(scenario())
+
+    assert worker.processed == 2
+    assert worker.failed == 0
+    assert len(source.jobs) == 3
+
+
+def test_second_stop_cancels_in_flight_runs(monkeypatch: pytest.MonkeyPatch) -> None:
+    source = MemoryJobSource([_run_job("slow")])
+
+    async def scenario() -> AsyncRunWorker:
+        runs = FakeRuns()
+        monkeypatch.setattr(async_worker, "execute_run_async", runs.execute)
+        worker = AsyncRunWorker(source, concurrency=1, poll_timeout=0)
+        serving = asyncio.create_task(worker.run())
+        await asyncio.sleep(0.05)
+        worker.stop()
+        await asyncio.sleep(0)
+        worker.stop()
+        await serving
+        return worker
+
+    worker = asyncio.run(scenario())
+
+    assert worker.failed == 1
+    assert isinstance(source.results["job-slow"], asyncio.CancelledError)
+
+
+def test_in_flight_jobs_get_heartbeats(monkeypatch: pytest.MonkeyPatch) -> None:
+    source = MemoryJobSource([_run_job("a"), _run_job("b")])
+
+    async def scenario() -> None:
+        runs = FakeRuns()
+        monkeypatch.setattr(async_worker, "execute_run_async", runs.execute)
+        worker = AsyncRunWorker(source, concurrency=2, poll_timeout=0, heartbeat_interval=0.01)
+        serving = asyncio.create_task(worker.run(burst=True))
+        await asyncio.sleep(0.05)
+        runs.release.set()
+        await serving
+
+    asyncio.run(scenario())
+
+    assert ["job-a", "job-b"] in source.heartbeats
+
+
+def test_rq_job_source_moves_jobs_through_the_registries() -> None:
+    fakeredis = pytest.importorskip("fakeredis")
+    source = RQJobSource(
+        [queue_priority()[0]], "rq.job.Job", connection=fakeredis.FakeStrictRedis()
+    )
+    queue = source.queues[0]
+    queue.enqueue("os.getcwd")
+    queue.enqueue("os.getcwd")
+
+    good = source.dequeue(1)
+    bad = source.dequeue(1)
+    source.started(good)
+    source.started(bad)
+
+    assert source.connection.llen(queue.intermediate_queue_key) == 0
+    assert set(queue.started_job_registry.get_job_ids()) == {good.id, bad.id}
+    source.heartbeat([good, bad])
+
+    source.finished(good, None)
+    source.finished(bad, RuntimeError("model error"))
+
+    assert queue.started_job_registry.get_job_ids() == []
+    assert queue.finished_job_registry.get_job_ids() == [good.id]
+    assert queue.failed_job_registry.get_job_ids() == [bad.id]
+    assert good.get_status(refresh=True) == "finished"
+    assert bad.get_status(refresh=True) == "failed"
+    assert "model error" in bad.latest_result().exc_string
+
+
+def test_other_jobs_are_performed_in_a_thread() -> None:
+    performed: list[str] = []
+    job = SimpleNamespace(id="other", func_name="app.tasks.send_email", args=[])
+    job.perform = lambda: performed.append("other")
+    source = MemoryJobSource([job])
+
+    asyncio.run(AsyncRunWorker(source, concurrency=2, poll_timeout=0).run(burst=True))
+
+    assert performed == ["other"]
+    assert source.results == {"other": None}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_execute_run_async_marks_unknown_agents_failed(user: AbstractBaseUser) -> None:
+    session = AgentSession.objects.create(owner=user, session_key="async-worker-session")
+    run = AgentRun.objects.create(
+        session=session,
+        owner=user,
+        agent_key="missing",
+        input_payload="Hello",
+    )
+
+    with pytest.raises(KeyError):
+        asyncio.run(execute_run_async(str(run.id)))
+
+    run.refresh_from_db()
+    assert run.status == AgentRun.Status.FAILED
+    assert "Unknown agent key" in run.error
+    assert run.started_at is not None
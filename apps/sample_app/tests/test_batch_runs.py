@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TextIO
+
+import pytest
+from django.contrib.auth.models import AbstractBaseUser
+from django.core.management import call_command
+from django.utils import timezone
+
+from agentic_django.models import AgentRun
+from sample_app.batch_runs import BatchItem, BatchRunner, Checkpoint, read_items, written_ids
+from sample_app.run_queues import run_queue
+
+pytestmark = pytest.mark.django_db
+
+
+class Interrupted(Exception):
+    pass
+
+
+class FakeWorkers:
+    """Stands in for the task backend; finishes every queued run on each poll."""
+
+    def __init__(self, interrupt_after: int | None = None) -> None:
+        self.queued: list[str] = []
+        self.peak = 0
+        self.polls = 0
+        self.interrupt_after = interrupt_after
+
+    def enqueue(self, run_id: str) -> None:
+        self.queued.append(run_id)
+        self.peak = max(self.peak, len(self.queued))
+
+    def sleep(self, seconds: float) -> None:
+        self.polls += 1
+        if self.polls == self.interrupt_after:
+            raise Interrupted
+        AgentRun.objects.filter(pk__in=self.queued).update(
+            status=AgentRun.Status.COMPLETED,
+            final_output="done",
+            started_at=timezone.now(),
+            finished_at=timezone.now(),
+        )
+        self.queued.clear()
+
+
+def _items(count: int) -> Iterator[BatchItem]:
+    return (BatchItem(item_id=f"q{n}", input=f"Prompt {n}", agent_key="demo") for n in range(count))
+
+
+def _runner(
+    user: AbstractBaseUser, tmp_path: Path, workers: FakeWorkers, output: TextIO
+) -> BatchRunner:
+    return BatchRunner(
+        owner=user,
+        batch="eval",
+        output=output,
+        checkpoint=Checkpoint.load(tmp_path / "out.checkpoint", "eval"),
+        window=3,
+        enqueue=workers.enqueue,
+        sleep=workers.sleep,
+    )
+
+
+def test_read_items_accepts_jsonl_and_csv(tmp_path: Path) -> None:
+    jsonl = tmp_path / "prompts.jsonl"
+    jsonl.write_text('{"id": "a", "input": "Hi"}\n\n{"input": ["x"], "agent_key": "other"}\n')
+    csv_file = tmp_path / "prompts.csv"
+    csv_file.write_text("id,input,session_key\nb,Hello,shared\n")
+
+    assert list(read_items(jsonl, "demo")) == [
+        BatchItem(item_id="a", input="Hi", agent_key="demo"),
+        BatchItem(item_id="3", input=["x"], agent_key="other"),
+    ]
+    assert list(read_items(csv_file, "demo")) == [
+        BatchItem(item_id="b", input="Hello", agent_key="demo", session_key="shared"),
+    ]
+    jsonl.write_text('{"id": "a"}\n')
+    with pytest.raises(ValueError, match="line 1"):
+        list(read_items(jsonl, "demo"))
+
+
+def test_runner_keeps_window_and_writes_every_result(
+    user: AbstractBaseUser,
+    tmp_path: Path,
+) -> None:
+    workers = FakeWorkers()
+    with (tmp_path / "out.jsonl").open("a") as output:
+        runner = _runner(user, tmp_path, workers, output)
+        stats = runner.run(_items(7))
+
+    lines = [json.loads(line) for line in (tmp_path / "out.jsonl").read_text().splitlines()]
+    assert sorted(line["id"] for line in lines) == sorted(f"q{n}" for n in range(7))
+    assert {line["status"] for line in lines} == {"completed"}
+    assert (stats.created, stats.completed) == (7, 7)
+    assert (workers.peak, workers.polls) == (3, 3)
+    assert {run_queue(run) for run in AgentRun.objects.all()} == {"batch"}
+    assert json.loads((tmp_path / "out.checkpoint").read_text())["consumed"] == 7
+
+
+def test_interrupted_batch_resumes_without_duplicates(
+    user: AbstractBaseUser,
+    tmp_path: Path,
+) -> None:
+    with (tmp_path / "out.jsonl").open("a") as output:
+        with pytest.raises(Interrupted):
+            _runner(user, tmp_path, FakeWorkers(interrupt_after=2), output).run(_items(7))
+
+    # The first window finished and was written; the second was created but not collected.
+    assert len(written_ids(tmp_path / "out.jsonl")) == 3
+    assert AgentRun.objects.count() == 6
+
+    workers = FakeWorkers()
+    with (tmp_path / "out.jsonl").open("a") as output:
+        runner = _runner(user, tmp_path, workers, output)
+        runner.resume(written_ids(tmp_path / "out.jsonl"))
+        stats = runner.run(_items(7))
+
+    lines = (tmp_path / "out.jsonl").read_text().splitlines()
+    assert sorted(json.loads(line)["id"] for line in lines) == sorted(f"q{n}" for n in range(7))
+    assert (stats.resumed, stats.created) == (3, 1)
+    assert AgentRun.objects.count() == 7
+
+
+def test_command_runs_prompts_through_task_backend(
+    user: AbstractBaseUser,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def _execute(run_id: str) -> None:
+        AgentRun.objects.filter(pk=run_id).update(
+            status=AgentRun.Status.COMPLETED,
+            final_output="done",
+        )
+
+    # The immediate backend performs each run_agent_task as it is enqueued.
+    monkeypatch.setattr("agentic_django.tasks.execute_run", _execute)
+    prompts = tmp_path / "prompts.jsonl"
+    prompts.write_text('{"id": "one", "input": "Hi"}\n{"id": "two", "input": "Hello"}\n')
+
+    call_command(
+        "run_agent_batch",
+        str(prompts),
+        str(tmp_path / "results.jsonl"),
+        user=user.get_username(),
+        poll_interval=0,
+    )
+
+    results = [json.loads(line) for line in (tmp_path / "results.jsonl").read_text().splitlines()]
+    assert {result["id"]: result["output"] for result in results} == {"one": "done", "two": "done"}
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from agentic_django.models import AgentSessionItem
+from sample_app.benchmark_suite import find_regressions, sample_session_items
+from sample_app.render_cache import payload_digest
+
+pytestmark = pytest.mark.django_db
+
+
+def _results(**medians: float) -> dict[str, object]:
+    return {"results": {name: {"median_ms": median} for name, median in medians.items()}}
+
+
+def test_find_regressions_flags_only_slowdowns_above_threshold() -> None:
+    baseline = _results(fast=1.0, steady=2.0, removed=1.0)
+    current = _results(fast=1.5, steady=2.2, added=9.0)
+
+    regressions = find_regressions(baseline, current, threshold=0.2)
+
+    assert [regression["name"] for regression in regressions] == ["fast"]
+    assert regressions[0]["ratio"] == pytest.approx(1.5)
+
+
+def test_sample_session_items_cycle_through_distinct_tool_turns() -> None:
+    items = sample_session_items(6)
+
+    assert [item.get("type", item.get("role")) for item in items] == [
+        "user",
+        "function_call",
+        "function_call_output",
+        "message",
+        "user",
+        "function_call",
+    ]
+    assert len({payload_digest(item) for item in sample_session_items(40)}) == 40
+
+
+def test_bench_command_writes_json_and_leaves_no_rows(tmp_path: Path) -> None:
+    output = tmp_path / "bench.json"
+    stdout = StringIO()
+
+    call_command("bench", output=str(output), items="10", repeat=1, stdout=stdout)
+
+    results = json.loads(output.read_text(encoding="utf-8"))["results"]
+    assert {"render_markdown_10kb", "find_flight_cached", "session_items_view_10"} <= set(results)
+    assert "conversation_items_view_10" in results
+    assert not AgentSessionItem.objects.exists()
+
+
+def test_bench_command_fails_on_regression(tmp_path: Path) -> None:
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(_results(book_flight_x5=1e-6)), encoding="utf-8")
+
+    with pytest.raises(CommandError, match="regressed"):
+        call_command(
+            "bench",
+            output=str(tmp_path / "bench.json"),
+            baseline=str(baseline),
+            skip_views=True,
+            repeat=1,
+            stdout=StringIO(),
+        )
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import pytest
+from django.contrib.auth.models import AbstractBaseUser
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from agentic_django.models import AgentRun, AgentSession, AgentSessionItem
+
+pytestmark = pytest.mark.django_db
+
+
+def _app_queries(context: CaptureQueriesContext) -> list[str]:
+    # Loading the logged-in user (and a session cache miss) is the same for
+    # every view; only count what the ETag check adds.
+    return [
+        query["sql"]
+        for query in context.captured_queries
+        if "auth_user" not in query["sql"] and "django_session" not in query["sql"]
+    ]
+
+
+def _run(user: AbstractBaseUser) -> AgentRun:
+    session = AgentSession.objects.create(owner=user, session_key="etag-session")
+    return AgentRun.objects.create(
+        session=session,
+        owner=user,
+        agent_key="demo",
+        input_payload="Hi",
+    )
+
+
+def test_unchanged_run_fragment_poll_is_304_without_rendering(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    run = _run(user)
+    url = reverse("agents:run-fragment", kwargs={"run_id": run.id})
+
+    first = client_logged_in.get(url, HTTP_HX_REQUEST="true")
+    with CaptureQueriesContext(connection) as queries:
+        second = client_logged_in.get(
+            url,
+            HTTP_HX_REQUEST="true",
+            HTTP_IF_NONE_MATCH=first["ETag"],
+        )
+
+    assert first.status_code == 200
+    assert "no-cache" in first["Cache-Control"]
+    assert "HX-Request" in first["Vary"]
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.templates == []
+    assert len(_app_queries(queries)) <= 1
+
+
+def test_run_fragment_etag_follows_status_and_representation(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    run = _run(user)
+    url = reverse("agents:run-fragment", kwargs={"run_id": run.id})
+    pending = client_logged_in.get(url, HTTP_HX_REQUEST="true")["ETag"]
+
+    assert client_logged_in.get(url)["ETag"] != pending
+
+    run.mark_running()
+    response = client_logged_in.get(url, HTTP_HX_REQUEST="true", HTTP_IF_NONE_MATCH=pending)
+
+    assert response.status_code == 200
+    assert response["ETag"] != pending
+    assert "Running" in response.content.decode()
+
+
+def test_session_items_etag_changes_when_items_are_added(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    session = AgentSession.objects.create(owner=user, session_key="etag-items")
+    AgentSessionItem.objects.create(session=session, sequence=1, payload={"role": "user"})
+    url = reverse("agents:session-items", kwargs={"session_key": session.session_key})
+    etag = client_logged_in.get(url)["ETag"]
+
+    with CaptureQueriesContext(connection) as queries:
+        unchanged = client_logged_in.get(url, HTTP_IF_NONE_MATCH=etag)
+    AgentSessionItem.objects.create(session=session, sequence=2, payload={"role": "user"})
+    changed = client_logged_in.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert unchanged.status_code == 304
+    assert len(_app_queries(queries)) <= 1
+    assert changed.status_code == 200
+    assert len(changed.json()["items"]) == 2
+
+
+def test_conversation_refresh_is_conditional(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    session = AgentSession.objects.create(owner=user, session_key="etag-refresh")
+    AgentSessionItem.objects.create(
+        session=session,
+        sequence=1,
+        payload={"role": "user", "content": "Hello"},
+    )
+    url = reverse("sample_app:conversation-items", kwargs={"session_key": session.session_key})
+    first = client_logged_in.get(url, {"after": 1}, HTTP_HX_REQUEST="true")
+
+    repeat = client_logged_in.get(
+        url,
+        {"after": 1},
+        HTTP_HX_REQUEST="true",
+        HTTP_IF_NONE_MATCH=first["ETag"],
+    )
+    other_page = client_logged_in.get(
+        url,
+        {"after": 0},
+        HTTP_HX_REQUEST="true",
+        HTTP_IF_NONE_MATCH=first["ETag"],
+    )
+
+    assert repeat.status_code == 304
+    assert other_page.status_code == 200
+    assert "Hello" in other_page.content.decode()
+
+
+def test_other_users_and_missing_objects_get_no_etag(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    url = reverse("agents:session-items", kwargs={"session_key": "missing"})
+
+    response = client_logged_in.get(url, HTTP_IF_NONE_MATCH="*")
+
+    assert response.status_code == 404
+    assert not response.has_header("ETag")
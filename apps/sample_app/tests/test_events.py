@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from agents.stream_events import RawResponsesStreamEvent
+from openai.types.responses import ResponseTextDeltaEvent, ResponseTextDoneEvent
+
+from sample_app.events import DeltaStreamEventSerializer, format_sse
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _delta(text: str) -> RawResponsesStreamEvent:
+    return RawResponsesStreamEvent(
+        data=ResponseTextDeltaEvent.model_construct(
+            type="response.output_text.delta",
+            delta=text,
+            item_id="msg_1",
+            output_index=0,
+            content_index=0,
+            sequence_number=1,
+            logprobs=[],
+        )
+    )
+
+
+def _done(text: str) -> RawResponsesStreamEvent:
+    return RawResponsesStreamEvent(
+        data=ResponseTextDoneEvent.model_construct(
+            type="response.output_text.done",
+            text=text,
+            item_id="msg_1",
+            output_index=0,
+            content_index=0,
+            sequence_number=2,
+            logprobs=[],
+        )
+    )
+
+
+def test_delta_serializer_keeps_output_text_deltas_only() -> None:
+    serializer = DeltaStreamEventSerializer(delta_interval=0)
+
+    assert serializer.serialize(_delta("Hel")) == {
+        "type": "raw_response_event",
+        "delta": "Hel",
+    }
+    assert serializer.serialize(_done("Hel")) is None
+
+
+def test_delta_serializer_coalesces_deltas_per_interval() -> None:
+    clock = FakeClock()
+    serializer = DeltaStreamEventSerializer(delta_interval=0.25, clock=clock)
+
+    assert serializer.serialize(_delta("He")) is None
+    clock.now = 0.1
+    assert serializer.serialize(_delta("ll")) is None
+    clock.now = 0.3
+    assert serializer.serialize(_delta("o")) == {"type": "raw_response_event", "delta": "Hello"}
+    assert serializer.serialize(_delta(", wor")) is None
+    assert serializer.serialize(_delta("ld")) is None
+    # The part ends before the interval does; its pending text is stored now.
+    assert serializer.serialize(_done("Hello, world")) == {
+        "type": "raw_response_event",
+        "delta": ", world",
+    }
+    assert serializer.serialize(_done("Hello, world")) is None
+
+
+def test_format_sse_frames_json_payload() -> None:
+    assert format_sse("status", {"status": "running"}) == (
+        'event: status\ndata: {"status":"running"}\n\n'
+    )
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import gzip
+import json
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AbstractBaseUser
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from agentic_django.models import AgentSession, AgentSessionItem
+from sample_app.exports import export_items, ndjson_chunks
+from sample_app.purge import retire_session
+
+pytestmark = pytest.mark.django_db
+
+
+def _session(owner: AbstractBaseUser, key: str, count: int) -> AgentSession:
+    session = AgentSession.objects.create(owner=owner, session_key=key)
+    # Created newest sequence first so the export has to order them.
+    AgentSessionItem.objects.bulk_create(
+        AgentSessionItem(session=session, sequence=n, payload={"role": "user", "content": f"m{n}"})
+        for n in range(count, 0, -1)
+    )
+    return session
+
+
+def _lines(body: bytes) -> list[dict[str, Any]]:
+    return [json.loads(line) for line in body.decode().splitlines()]
+
+
+def test_export_streams_own_items_in_sequence_order(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    _session(user, "first", 3)
+    _session(user, "second", 2)
+    other = get_user_model().objects.create_user(username="other", password="password")
+    _session(other, "first", 2)
+
+    response = client_logged_in.get(reverse("sample_app:session-export"), {"session": "first"})
+
+    assert response.streaming
+    assert response["Content-Type"] == "application/x-ndjson"
+    lines = _lines(b"".join(response.streaming_content))
+    assert [(line["session_key"], line["sequence"]) for line in lines] == [
+        ("first", 1),
+        ("first", 2),
+        ("first", 3),
+    ]
+    assert lines[0]["payload"] == {"role": "user", "content": "m1"}
+
+
+def test_export_gzips_when_accepted(client_logged_in: Client, user: AbstractBaseUser) -> None:
+    _session(user, "zipped", 4)
+    url = reverse("sample_app:session-export")
+
+    plain = b"".join(client_logged_in.get(url).streaming_content)
+    response = client_logged_in.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+    assert response["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response["Vary"]
+    assert gzip.decompress(b"".join(response.streaming_content)) == plain
+
+
+def test_export_filters_by_date_and_rejects_bad_params(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    session = _session(user, "dated", 2)
+    AgentSessionItem.objects.filter(session=session, sequence=1).update(
+        created_at=timezone.now() - timedelta(days=3)
+    )
+    url = reverse("sample_app:session-export")
+    since = (timezone.now() - timedelta(days=1)).date().isoformat()
+
+    recent = _lines(b"".join(client_logged_in.get(url, {"since": since}).streaming_content))
+
+    assert [line["sequence"] for line in recent] == [2]
+    assert client_logged_in.get(url, {"until": "soon"}).status_code == 400
+    assert client_logged_in.get(url, {"owner": "someone-else"}).status_code == 403
+
+
+def test_export_skips_retired_sessions(user: AbstractBaseUser) -> None:
+    _session(user, "current", 2)
+    retire_session(_session(user, "reset", 3))
+
+    lines = _lines(b"".join(ndjson_chunks(export_items(owner=user))))
+
+    assert {line["session_key"] for line in lines} == {"current"}
+
+
+def test_chunks_hold_chunk_size_rows(user: AbstractBaseUser) -> None:
+    _session(user, "chunked", 5)
+
+    chunks = list(ndjson_chunks(export_items(owner=user), chunk_size=2))
+
+    assert [chunk.count(b"\n") for chunk in chunks] == [2, 2, 1]
+
+
+def test_command_writes_gzipped_export(user: AbstractBaseUser, tmp_path: Path) -> None:
+    _session(user, "cli", 3)
+    _session(user, "skipped", 1)
+    output = tmp_path / "items.ndjson.gz"
+
+    call_command("export_session_items", str(output), owner=user.get_username(), session=["cli"])
+
+    lines = _lines(gzip.decompress(output.read_bytes()))
+    assert [line["sequence"] for line in lines] == [1, 2, 3]
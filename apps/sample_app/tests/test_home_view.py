@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+from typing import Any
+
 import pytest
 from django.contrib.auth.models import AbstractBaseUser
 from django.test import Client
 from django.urls import reverse
 from django.test.utils import override_settings
 
-from agentic_django.models import AgentSession, AgentSessionItem
+from agentic_django.models import AgentRun, AgentSession, AgentSessionItem
+from sample_app.purge import RETIRED_AT_KEY
 
 pytestmark = pytest.mark.django_db
 
@@ -30,9 +33,9 @@ def test_home_creates_session_and_conversation_poll(
     assert AgentSession.objects.filter(owner=user, session_key=session_key).exists()
 
     content = response.content.decode()
-    assert f'hx-get="/agents/sessions/{session_key}/items/"' in content
+    assert f'hx-get="/sessions/{session_key}/items/"' in content
     assert 'hx-trigger="run-update from:body"' in content
-    assert 'hx-swap="innerHTML"' in content
+    assert 'hx-swap="beforeend"' in content
     assert "/static/django_htmx/htmx.min.js" in content
     assert 'rel="icon"' in content
     assert "/static/sample_app/favicon.svg" in content
@@ -80,4 +83,94 @@ def test_reset_session_creates_new_session(
     assert new_key is not None
     assert new_key != session_key
     assert AgentSession.objects.filter(owner=user, session_key=new_key).exists()
-    assert AgentSessionItem.objects.filter(session=session).count() == 0
+    # The immediate task backend purges on a thread after commit, which never
+    # comes inside this test's transaction.
+    session.refresh_from_db()
+    assert RETIRED_AT_KEY in session.metadata
+    assert AgentSessionItem.objects.filter(session=session).count() == 1
+
+
+def _add_history(user: AbstractBaseUser, session: AgentSession, runs: int, items: int) -> None:
+    AgentRun.objects.bulk_create(
+        AgentRun(
+            owner=user,
+            session=session,
+            status=AgentRun.Status.COMPLETED,
+            input_payload=f"Question {index}",
+        )
+        for index in range(runs)
+    )
+    start = AgentSessionItem.objects.filter(session=session).count()
+    AgentSessionItem.objects.bulk_create(
+        AgentSessionItem(
+            session=session,
+            sequence=start + index + 1,
+            payload={"role": "user", "content": f"Message {index}"},
+        )
+        for index in range(items)
+    )
+
+
+@pytest.mark.parametrize("history", [1, 30])
+def test_home_query_budget_does_not_grow_with_history(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+    django_assert_num_queries: Any,
+    history: int,
+) -> None:
+    client_logged_in.get(reverse("sample_app:home"))
+    session = AgentSession.objects.get(owner=user)
+    _add_history(user, session, runs=history, items=history * 2)
+
+    # User, latest run with its agent session, conversation items. The Django
+    # session comes from the cache (cached_db engine).
+    with django_assert_num_queries(3):
+        response = client_logged_in.get(reverse("sample_app:home"))
+
+    assert response.status_code == 200
+    assert f"Message {history * 2 - 1}" in response.content.decode()
+
+
+def test_home_query_budget_without_runs(
+    client_logged_in: Client,
+    django_assert_num_queries: Any,
+) -> None:
+    client_logged_in.get(reverse("sample_app:home"))
+
+    # User, latest run lookup, agent session, conversation items.
+    with django_assert_num_queries(4):
+        client_logged_in.get(reverse("sample_app:home"))
+
+
+def test_home_ignores_cached_session_id_for_another_key(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    other = AgentSession.objects.create(owner=user, session_key="other-session")
+    _add_history(user, other, runs=1, items=1)
+    django_session = client_logged_in.session
+    django_session["agent_session_key"] = "current-session"
+    django_session["agent_session_id"] = str(other.pk)
+    django_session.save()
+
+    response = client_logged_in.get(reverse("sample_app:home"))
+
+    current = AgentSession.objects.get(owner=user, session_key="current-session")
+    assert client_logged_in.session["agent_session_id"] == str(current.pk)
+    assert "Message 0" not in response.content.decode()
+
+
+def test_reset_session_query_budget(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+    django_assert_max_num_queries: Any,
+) -> None:
+    client_logged_in.get(reverse("sample_app:home"))
+    session = AgentSession.objects.get(owner=user)
+    _add_history(user, session, runs=5, items=20)
+
+    with django_assert_max_num_queries(12):
+        client_logged_in.post(reverse("sample_app:reset"))
+
+    session.refresh_from_db()
+    assert RETIRED_AT_KEY in session.metadata
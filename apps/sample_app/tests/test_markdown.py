@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import time
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from sample_app.markdown import render_inline, render_markdown
+
+
+def test_render_inline_escapes_and_formats_spans() -> None:
+    rendered = render_inline("**Bold** *it* _em_ `a*b*` <script> snake_case 2 * 3")
+
+    assert rendered == (
+        "<strong>Bold</strong> <em>it</em> <em>em</em> <code>a*b*</code> "
+        "&lt;script&gt; snake_case 2 * 3"
+    )
+
+
+def test_render_markdown_paragraphs_and_headings() -> None:
+    rendered = render_markdown("## Options\nFirst line\nsecond line\n\nNext")
+
+    assert rendered == (
+        "<h2>Options</h2>\n<p>First line<br>second line</p>\n<p>Next</p>"
+    )
+
+
+def test_render_markdown_fenced_code_is_escaped_verbatim() -> None:
+    rendered = render_markdown('```json\n{"a": "<b>**x**</b>"}\n```')
+
+    assert rendered == (
+        '<pre><code class="language-json">'
+        "{&quot;a&quot;: &quot;&lt;b&gt;**x**&lt;/b&gt;&quot;}"
+        "</code></pre>"
+    )
+
+
+def test_render_markdown_nested_lists() -> None:
+    rendered = render_markdown("1. One\n2. Two\n   - Nested\n3. Three\n\n- Other")
+
+    assert rendered.replace("\n", "") == (
+        "<ol><li>One</li><li>Two<ul><li>Nested</li></ul></li><li>Three</li></ol>"
+        "<ul><li>Other</li></ul>"
+    )
+
+
+def test_render_markdown_shallower_item_rejoins_its_list() -> None:
+    rendered = render_markdown("- a\n   - b\n - c")
+
+    assert rendered.replace("\n", "") == "<ul><li>a<ul><li>b</li></ul></li><li>c</li></ul>"
+
+
+def test_render_markdown_keeps_numbering_across_blank_lines() -> None:
+    rendered = render_markdown("1. One\n\n2. Two\n\n5. Five")
+
+    assert rendered.count("<ol") == 1
+    assert render_markdown("5. Five").startswith('<ol start="5">')
+
+
+@pytest.mark.parametrize("unit", ["_a ", "*a ", "**a ", "`a "])
+def test_unclosed_delimiters_render_in_linear_time(unit: str) -> None:
+    text = unit * 10000
+
+    started = time.perf_counter()
+    rendered = render_markdown(text)
+    elapsed = time.perf_counter() - started
+
+    assert rendered.startswith("<p>")
+    # The backtracking span regex took seconds here; linear scans take ms.
+    assert elapsed < 1.0
+
+
+def test_render_inline_emphasis_may_contain_code_spans() -> None:
+    assert render_inline("*see `a*b` here* `x") == "<em>see <code>a*b</code> here</em> `x"
+    assert render_inline("*a `b* c") == "*a `b* c"
+
+
+def test_render_markdown_empty_text() -> None:
+    assert render_markdown("") == "<p></p>"
+
+
+def test_bench_markdown_command_reports_each_size() -> None:
+    stdout = StringIO()
+    call_command("bench_markdown", sizes="1KB,2KB", repeat=1, stdout=stdout)
+
+    lines = stdout.getvalue().strip().splitlines()
+    assert len(lines) == 5
+    assert "speedup" in lines[0]
+    assert [line.split()[0] for line in lines[1:]] == ["sample", "unclosed"] * 2
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth.models import AbstractBaseUser
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rq.worker import SimpleWorker
+
+from agentic_django.models import AgentRun, AgentSession
+from agentic_django.signals import agent_run_completed, agent_run_failed, agent_run_started
+from sample_app.metrics import QueueDepthCollector, mark_process_dead
+from sample_app.rq_worker import MetricsWorker
+
+pytestmark = pytest.mark.django_db
+
+
+def _value(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _make_run(user: AbstractBaseUser) -> AgentRun:
+    session = AgentSession.objects.create(owner=user, session_key="metrics-session")
+    return AgentRun.objects.create(
+        session=session,
+        owner=user,
+        agent_key="demo",
+        input_payload="Hello",
+    )
+
+
+def test_run_lifecycle_signals_feed_metrics(user: AbstractBaseUser) -> None:
+    created = _value("sample_app_runs_created_total", agent_key="demo")
+    waits = _value("sample_app_run_queue_wait_seconds_count", agent_key="demo", queue="interactive")
+    turns = _value("sample_app_run_turns_sum", agent_key="demo")
+    completed = _value("sample_app_runs_finished_total", agent_key="demo", status="completed")
+    failed = _value("sample_app_runs_finished_total", agent_key="demo", status="failed")
+
+    run = _make_run(user)
+    run.started_at = run.created_at + timedelta(seconds=2)
+    agent_run_started.send(sender=AgentRun, run=run)
+    run.finished_at = run.started_at + timedelta(seconds=3)
+    agent_run_completed.send(sender=AgentRun, run=run, result=SimpleNamespace(raw_responses=[1, 2]))
+    agent_run_failed.send(sender=AgentRun, run=run, exception=RuntimeError("boom"))
+
+    assert _value("sample_app_runs_created_total", agent_key="demo") == created + 1
+    assert (
+        _value("sample_app_run_queue_wait_seconds_count", agent_key="demo", queue="interactive")
+        == waits + 1
+    )
+    assert _value("sample_app_run_turns_sum", agent_key="demo") == turns + 2
+    assert (
+        _value("sample_app_runs_finished_total", agent_key="demo", status="completed")
+        == completed + 1
+    )
+    assert _value("sample_app_runs_finished_total", agent_key="demo", status="failed") == failed + 1
+
+
+def test_middleware_counts_polls_and_metrics_endpoint_reports_them(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    run = _make_run(user)
+    polls = _value("sample_app_polls_total", url_name="agents:run-fragment")
+
+    client_logged_in.get(reverse("agents:run-fragment", kwargs={"run_id": run.id}))
+    response = client_logged_in.get("/metrics")
+
+    assert _value("sample_app_polls_total", url_name="agents:run-fragment") == polls + 1
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+    body = response.content.decode()
+    assert 'sample_app_http_request_duration_seconds_count{method="GET"' in body
+    assert "sample_app_rq_queue_depth" in body
+
+
+@override_settings(SAMPLE_APP_METRICS_TOKEN="secret")
+def test_metrics_endpoint_requires_configured_token(client: Client) -> None:
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code == 401
+    assert client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret").status_code == 200
+
+
+@override_settings(RQ_QUEUES={"default": {}, "broken": {}})
+def test_queue_depth_collector_reports_each_reachable_queue(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("sample_app.metrics.uses_rq_backend", lambda: True)
+
+    def _get_queue(name: str) -> SimpleNamespace:
+        if name == "broken":
+            raise ConnectionError("redis is down")
+        return SimpleNamespace(count=7)
+
+    (family,) = QueueDepthCollector(_get_queue).collect()
+
+    assert [(sample.labels, sample.value) for sample in family.samples] == [
+        ({"queue": "default"}, 7)
+    ]
+
+
+def test_stopped_workers_mark_their_metric_files_dead(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    dead: list[tuple[int, str | None]] = []
+    monkeypatch.setattr(
+        "prometheus_client.multiprocess.mark_process_dead",
+        lambda pid, path=None: dead.append((pid, path)),
+    )
+
+    mark_process_dead(123)
+    assert dead == []
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    mark_process_dead(123)
+    assert dead == [(123, None)]
+    assert issubclass(MetricsWorker, SimpleWorker)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from agents.models.interface import ModelTracing
+from django.test.utils import override_settings
+
+from sample_app.agent_registry import build_demo_agent, clear_agent_cache
+from sample_app.offline_model import (
+    CassetteMissError,
+    CassetteStore,
+    OfflineModel,
+    configure_tracing,
+    exchange_key,
+    output_items,
+    scripted_output,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_agent_cache() -> Iterator[None]:
+    clear_agent_cache()
+    yield
+    clear_agent_cache()
+
+
+def _tool_turn(request: str, *calls: tuple[str, str]) -> list[dict[str, Any]]:
+    items: list[dict[str, Any]] = [{"role": "user", "content": request}]
+    for index, (name, output) in enumerate(calls, start=1):
+        items.append(
+            {"type": "function_call", "call_id": f"c{index}", "name": name, "arguments": "{}"}
+        )
+        items.append({"type": "function_call_output", "call_id": f"c{index}", "output": output})
+    return items
+
+
+def _stream(model: OfflineModel, items: list[dict[str, Any]]) -> list[Any]:
+    async def _collect() -> list[Any]:
+        return [
+            event
+            async for event in model.stream_response(
+                "Be helpful.",
+                items,
+                None,
+                [],
+                None,
+                [],
+                ModelTracing.DISABLED,
+                previous_response_id=None,
+                conversation_id=None,
+                prompt=None,
+            )
+        ]
+
+    return asyncio.run(_collect())
+
+
+def test_scripted_turn_searches_books_then_answers() -> None:
+    request = "Book the first flight from SEA to BOS on 2026-07-04"
+    flights = json.dumps([{"flight_number": "AS318"}, {"flight_number": "B6512"}])
+    booking = str({"booking_id": "PNR-ABC123", "flight_number": "AS318"})
+
+    search = scripted_output(_tool_turn(request))
+    book = scripted_output(_tool_turn(request, ("find_flight", flights)))
+    answer = scripted_output(
+        _tool_turn(request, ("find_flight", flights), ("book_flight", booking))
+    )
+
+    assert search[0]["name"] == "find_flight"
+    assert json.loads(search[0]["arguments"]) == {
+        "origin": "SEA",
+        "destination": "BOS",
+        "travel_date": "2026-07-04",
+    }
+    assert book[0]["name"] == "book_flight"
+    assert json.loads(book[0]["arguments"]) == {"flight_number": "AS318"}
+    assert answer[0]["type"] == "message"
+    assert "PNR-ABC123" in answer[0]["content"][0]["text"]
+    assert [item.type for item in output_items(search + answer)] == ["function_call", "message"]
+
+
+def test_exchange_key_ignores_ids_and_tool_output_details() -> None:
+    first = _tool_turn("SFO to JFK", ("get_flight_price", "{'last_updated': '10:00'}"))
+    second = _tool_turn("SFO to JFK", ("get_flight_price", "{'last_updated': '10:05'}"))
+    second[1]["call_id"] = second[2]["call_id"] = "other"
+
+    assert exchange_key("Be helpful.", first, ["find_flight"]) == exchange_key(
+        "Be helpful.", second, ["find_flight"]
+    )
+    assert exchange_key("Be helpful.", first, ["find_flight"]) != exchange_key(
+        "Be helpful.", _tool_turn("SFO to LAX"), ["find_flight"]
+    )
+
+
+def test_replay_returns_recorded_output_and_fails_on_miss(tmp_path: Path) -> None:
+    store = CassetteStore(tmp_path)
+    items = _tool_turn("Find SFO to JFK")
+    recorded = output_items(scripted_output(items))
+    OfflineModel("scripted", store=store)._record("Be helpful.", items, [], recorded)
+    replay = OfflineModel("replay", store=store)
+
+    replayed = asyncio.run(replay.offline_output("Be helpful.", items, []))
+
+    assert replayed == recorded
+    with pytest.raises(CassetteMissError):
+        asyncio.run(replay.offline_output("Be helpful.", _tool_turn("Find LAX to ORD"), []))
+
+
+def test_scripted_stream_sends_text_deltas_then_completes(tmp_path: Path) -> None:
+    model = OfflineModel("scripted", store=CassetteStore(tmp_path))
+    flights = json.dumps([{"flight_number": "DL123"}])
+
+    events = _stream(model, _tool_turn("SFO to JFK", ("find_flight", flights)))
+
+    deltas = [event.delta for event in events if event.type == "response.output_text.delta"]
+    assert "".join(deltas).endswith("- DL123")
+    assert events[-1].type == "response.completed"
+    assert events[-1].response.output[0].type == "message"
+
+
+def test_demo_agent_uses_offline_model_when_selected(tmp_path: Path) -> None:
+    with override_settings(
+        SAMPLE_APP_MODEL_MODE="scripted",
+        SAMPLE_APP_MODEL_LATENCY=0.25,
+        SAMPLE_APP_MODEL_CASSETTE_DIR=str(tmp_path),
+    ):
+        agent = build_demo_agent()
+
+    assert isinstance(agent.model.wrapped, OfflineModel)
+    assert agent.model.wrapped.latency == 0.25
+    assert isinstance(build_demo_agent().model.wrapped, str)
+
+
+def test_tracing_is_configured_at_startup_not_per_agent(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    calls: list[bool] = []
+    monkeypatch.setattr("sample_app.offline_model.set_tracing_disabled", calls.append)
+
+    with override_settings(
+        SAMPLE_APP_MODEL_MODE="replay",
+        SAMPLE_APP_MODEL_CASSETTE_DIR=str(tmp_path),
+    ):
+        build_demo_agent()
+        assert calls == []
+        configure_tracing()
+    with override_settings(SAMPLE_APP_MODEL_MODE="record"):
+        configure_tracing()
+
+    assert calls == [True]
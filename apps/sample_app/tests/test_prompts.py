@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from sample_app import prompts
+from sample_app.prompts import PromptStore, load_prompt, prompt_names, prompt_store, prompt_text
+
+
+@pytest.fixture(autouse=True)
+def _fresh_prompt_store() -> Iterator[None]:
+    prompt_store.clear()
+    yield
+    prompt_store.clear()
+
+
+def test_prompt_store_parses_each_version_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    parsed: list[str] = []
+    original = prompts.compile_prompt
+
+    def _tracking_compile(text: str, fingerprint: str = "") -> prompts.CompiledPrompt:
+        parsed.append(fingerprint)
+        return original(text, fingerprint)
+
+    monkeypatch.setattr(prompts, "compile_prompt", _tracking_compile)
+
+    assert load_prompt("demo_agent") is load_prompt("demo_agent")
+    assert "travel assistant" in prompt_text("demo_agent")
+    assert len(parsed) == 1
+
+    monkeypatch.setattr(prompts, "prompt_fingerprint", lambda name: "edited")
+    prompt_text("demo_agent")
+
+    assert parsed[-1] == "edited"
+    assert len(parsed) == 2
+
+
+def test_compile_prompts_writes_bundle_that_seeds_store(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    output = tmp_path / "prompts.json"
+    stdout = StringIO()
+
+    call_command("compile_prompts", output=str(output), stdout=stdout)
+
+    bundle = json.loads(output.read_text(encoding="utf-8"))
+    assert set(bundle["prompts"]) == set(prompt_names())
+    assert "Wrote" in stdout.getvalue()
+
+    def _fail_compile(text: str, fingerprint: str = "") -> prompts.CompiledPrompt:
+        raise AssertionError("bundle entries should not be re-parsed")
+
+    store = PromptStore()
+    assert store.load_bundle(output) == len(bundle["prompts"])
+    monkeypatch.setattr(prompts, "compile_prompt", _fail_compile)
+    assert "travel assistant" in store.get("demo_agent").text
+
+
+def test_load_bundle_skips_entries_for_edited_prompts(tmp_path: Path) -> None:
+    output = tmp_path / "prompts.json"
+    call_command("compile_prompts", output=str(output), stdout=StringIO())
+    bundle = json.loads(output.read_text(encoding="utf-8"))
+    bundle["prompts"]["demo_agent"]["digest"] = "stale"
+    output.write_text(json.dumps(bundle), encoding="utf-8")
+
+    assert PromptStore().load_bundle(output) == 0
+
+
+def test_compile_prompts_reports_invalid_prompts(monkeypatch: pytest.MonkeyPatch) -> None:
+    def _broken(text: str, fingerprint: str = "") -> prompts.CompiledPrompt:
+        raise ValueError("Exactly one of system_message or developer_message must be set.")
+
+    monkeypatch.setattr(prompts, "compile_prompt", _broken)
+
+    with pytest.raises(CommandError, match="demo_agent: Exactly one"):
+        call_command("compile_prompts", check=True, stdout=StringIO())
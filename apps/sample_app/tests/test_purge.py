@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from io import StringIO
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from django.contrib.auth.models import AbstractBaseUser
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse
+
+from agentic_django.models import AgentRun, AgentSession, AgentSessionItem
+from sample_app import purge
+from sample_app.purge import RETIRED_AT_KEY, purge_session, purge_session_items, retire_session
+from sample_app.tasks import purge_agent_session
+
+pytestmark = pytest.mark.django_db
+
+
+def _session_with_items(user: AbstractBaseUser, session_key: str, count: int) -> AgentSession:
+    session = AgentSession.objects.create(owner=user, session_key=session_key)
+    AgentSessionItem.objects.bulk_create(
+        AgentSessionItem(
+            session=session,
+            sequence=index + 1,
+            payload={"role": "user", "content": f"Message {index}"},
+        )
+        for index in range(count)
+    )
+    return session
+
+
+def test_purge_session_items_deletes_in_chunks(
+    user: AbstractBaseUser,
+    django_assert_num_queries: Any,
+) -> None:
+    session = _session_with_items(user, "chunked", 7)
+    kept = _session_with_items(user, "kept", 2)
+
+    # Three rounds of (select ids, delete) plus the final empty select.
+    with django_assert_num_queries(7):
+        deleted = purge_session_items(session.pk, batch_size=3)
+
+    assert deleted == 7
+    assert not AgentSessionItem.objects.filter(session=session).exists()
+    assert AgentSessionItem.objects.filter(session=kept).count() == 2
+
+
+def test_reset_switches_session_even_when_purge_cannot_be_queued(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    session = _session_with_items(user, "old-session", 3)
+
+    def _broker_down(*args: object, **kwargs: object) -> None:
+        raise ConnectionError("broker unavailable")
+
+    monkeypatch.setattr(
+        "sample_app.views.purge_agent_session",
+        SimpleNamespace(enqueue=_broker_down, get_backend=object),
+    )
+
+    response = client_logged_in.post(
+        reverse("sample_app:reset"),
+        data={"session_key": "old-session"},
+    )
+
+    assert response.status_code == 302
+    assert client_logged_in.session["agent_session_key"] != "old-session"
+    session.refresh_from_db()
+    assert RETIRED_AT_KEY in session.metadata
+    assert AgentSessionItem.objects.filter(session=session).count() == 3
+
+    stdout = StringIO()
+    call_command("sweep_agent_sessions", batch_size=2, stdout=stdout)
+
+    assert "Deleted 3 items" in stdout.getvalue()
+    assert not AgentSessionItem.objects.filter(session=session).exists()
+
+
+def test_purge_session_clears_the_backend_session(
+    user: AbstractBaseUser,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    session = _session_with_items(user, "backend", 2)
+    cleared: list[str] = []
+
+    def _get_session(session_key: str, owner: Any) -> SimpleNamespace:
+        async def clear_session() -> None:
+            cleared.append(session_key)
+
+        return SimpleNamespace(clear_session=clear_session)
+
+    monkeypatch.setattr("sample_app.purge.get_session", _get_session)
+
+    assert purge_session(session.pk, batch_size=1) == 2
+    assert cleared == ["backend"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reset_purges_after_the_response_with_the_immediate_backend(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    session = _session_with_items(user, "inline", 3)
+    enqueued: list[str] = []
+    submitted: list[tuple[Any, ...]] = []
+    monkeypatch.setattr(
+        "sample_app.views.purge_agent_session",
+        SimpleNamespace(enqueue=enqueued.append, get_backend=purge_agent_session.get_backend),
+    )
+    # Hold the purge until the response is back; the in-memory test database
+    # does not wait out locks the way the SQLite file does.
+    executor = purge._purge_executor
+    monkeypatch.setattr(
+        purge,
+        "_purge_executor",
+        SimpleNamespace(submit=lambda *args: submitted.append(args)),
+    )
+
+    response = client_logged_in.post(reverse("sample_app:reset"), data={"session_key": "inline"})
+
+    assert response.status_code == 302
+    assert enqueued == []
+    assert len(submitted) == 1
+    executor.submit(*submitted[0]).result(timeout=10)
+    assert not AgentSessionItem.objects.filter(session=session).exists()
+    session.refresh_from_db()
+    assert RETIRED_AT_KEY in session.metadata
+
+
+def test_sweep_deletes_retired_sessions_without_active_runs(user: AbstractBaseUser) -> None:
+    finished = _session_with_items(user, "finished", 2)
+    AgentRun.objects.create(
+        owner=user,
+        session=finished,
+        status=AgentRun.Status.COMPLETED,
+        input_payload="Hi",
+    )
+    busy = _session_with_items(user, "busy", 1)
+    AgentRun.objects.create(
+        owner=user,
+        session=busy,
+        status=AgentRun.Status.RUNNING,
+        input_payload="Hi",
+    )
+    active = _session_with_items(user, "active", 1)
+    retire_session(finished)
+    retire_session(busy)
+
+    call_command("sweep_agent_sessions", delete_sessions=True, dry_run=True, stdout=StringIO())
+    assert AgentSession.objects.count() == 3
+
+    call_command("sweep_agent_sessions", delete_sessions=True, stdout=StringIO())
+
+    assert set(AgentSession.objects.values_list("session_key", flat=True)) == {"busy", "active"}
+    assert not AgentRun.objects.filter(session_id=finished.pk).exists()
+    assert AgentSessionItem.objects.filter(session=active).count() == 1
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from datetime import UTC, datetime
+
+import pytest
+from django.core.cache import cache
+from prometheus_client import REGISTRY
+
+from agentic_django.models import AgentSessionItem
+from sample_app.render_cache import RenderCache, get_render_cache, render_cache_key
+from sample_app.templatetags.sample_app_tags import session_item_context
+
+
+def _lookups(result: str) -> float:
+    return (
+        REGISTRY.get_sample_value("sample_app_render_cache_lookups_total", {"result": result})
+        or 0.0
+    )
+
+
+@pytest.fixture(autouse=True)
+def _fresh_render_cache() -> Iterator[None]:
+    get_render_cache.cache_clear()
+    cache.clear()
+    yield
+    get_render_cache.cache_clear()
+
+
+def test_render_cache_evicts_least_recently_used() -> None:
+    render_cache = RenderCache(max_entries=2)
+
+    render_cache.get_or_render("a", lambda: {"body": "a"})
+    render_cache.get_or_render("b", lambda: {"body": "b"})
+    render_cache.get_or_render("a", lambda: {"body": "stale"})
+    render_cache.get_or_render("c", lambda: {"body": "c"})
+    rendered = render_cache.get_or_render("b", lambda: {"body": "b-again"})
+
+    assert rendered == {"body": "b-again"}
+    assert render_cache.stats() == {
+        "hits": 1,
+        "misses": 4,
+        "evictions": 2,
+        "size": 2,
+        "max_entries": 2,
+    }
+
+
+def test_render_cache_key_uses_item_identity_or_payload() -> None:
+    payload = {"role": "assistant", "content": "Hello"}
+    edited = {"role": "assistant", "content": "Hello!"}
+
+    assert render_cache_key(payload, 1, 3) == render_cache_key(edited, 1, 3)
+    assert render_cache_key(payload, 1, 3) != render_cache_key(payload, 2, 3)
+    assert render_cache_key(payload, 1, 3) != render_cache_key(payload, 1, 4)
+    # A row that reuses the id of a purged one.
+    assert render_cache_key(payload, 1, 3, datetime(2026, 1, 1, tzinfo=UTC)) != (
+        render_cache_key(payload, 1, 3, datetime(2026, 1, 2, tzinfo=UTC))
+    )
+    assert render_cache_key(payload) == render_cache_key(dict(payload))
+    assert render_cache_key(payload) != render_cache_key(edited)
+
+
+def test_session_item_context_renders_each_item_once() -> None:
+    payload = {"role": "assistant", "content": "**Booked** your flight."}
+    hits, misses = _lookups("hit"), _lookups("miss")
+
+    first = session_item_context(AgentSessionItem(pk=7, sequence=1, payload=payload))
+    second = session_item_context(AgentSessionItem(pk=7, sequence=1, payload=payload))
+
+    assert first == second
+    assert "<strong>Booked</strong>" in first["body"]
+    stats = get_render_cache().stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert (_lookups("hit"), _lookups("miss")) == (hits + 1, misses + 1)
+
+
+def test_render_cache_shares_entries_through_django_cache() -> None:
+    first_process = RenderCache(max_entries=8, cache_alias="default")
+    second_process = RenderCache(max_entries=8, cache_alias="default")
+
+    first_process.get_or_render("shared", lambda: {"body": "rendered"})
+    rendered = second_process.get_or_render("shared", lambda: {"body": "re-rendered"})
+
+    assert rendered == {"body": "rendered"}
+    assert second_process.stats()["hits"] == 1
+    assert second_process.stats()["misses"] == 0
+
+
+def test_render_cache_sets_shared_entries_with_its_timeout() -> None:
+    RenderCache(max_entries=8, cache_alias="default", timeout=60).get_or_render(
+        "timed",
+        lambda: {"body": "rendered"},
+    )
+
+    expires_in = cache._expire_info[cache.make_and_validate_key("sample_app:session-item:timed")]
+    assert 0 < expires_in - time.time() <= 60
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import pytest
+from django.contrib.auth.models import AbstractBaseUser
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django_tasks.backends.dummy import DummyBackend
+
+from agentic_django.models import AgentRun, AgentSession
+from agentic_django.tasks import run_agent_task
+from sample_app.run_queues import (
+    QueueRoutingMixin,
+    queue_priority,
+    route_run,
+    run_queue,
+    uses_rq_backend,
+)
+from sample_app.tasks import purge_agent_session
+
+pytestmark = pytest.mark.django_db
+
+
+class RoutingDummyBackend(QueueRoutingMixin, DummyBackend):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def _no_enqueue(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("agentic_django.views.enqueue_agent_run", lambda run_id: None)
+
+
+@override_settings(
+    SAMPLE_APP_RUN_QUEUES_BY_AGENT={"digest": "batch"},
+    SAMPLE_APP_RUN_QUEUES_BY_ORIGIN={"browser": "interactive", "api": "default"},
+    SAMPLE_APP_DEFAULT_RUN_QUEUE="interactive",
+)
+def test_route_run_prefers_agent_then_origin() -> None:
+    assert route_run("digest", "browser") == "batch"
+    assert route_run("demo", "api") == "default"
+    assert route_run("demo", None) == "interactive"
+
+
+def test_run_create_routes_by_origin(client_logged_in: Client, user: AbstractBaseUser) -> None:
+    url = reverse("agents:run-create")
+
+    client_logged_in.post(url, data={"session_key": "form", "input": "Hi"}, HTTP_HX_REQUEST="true")
+    client_logged_in.post(
+        url,
+        data='{"session_key": "client", "input": "Hi"}',
+        content_type="application/json",
+    )
+
+    queues = {
+        run.session.session_key: run_queue(run)
+        for run in AgentRun.objects.filter(owner=user).select_related("session")
+    }
+    assert queues == {"form": "interactive", "client": "batch"}
+
+
+def test_explicit_queue_is_kept(user: AbstractBaseUser) -> None:
+    session = AgentSession.objects.create(owner=user, session_key="explicit")
+    run = AgentRun.objects.create(
+        session=session,
+        owner=user,
+        agent_key="demo",
+        input_payload="Hi",
+        metadata={"queue": "maintenance"},
+    )
+
+    run.metadata["note"] = "updated"
+    run.save()
+
+    run.refresh_from_db()
+    assert run_queue(run) == "maintenance"
+
+
+def test_backend_enqueues_runs_on_their_queue(user: AbstractBaseUser) -> None:
+    session = AgentSession.objects.create(owner=user, session_key="routed")
+    run = AgentRun.objects.create(
+        session=session,
+        owner=user,
+        agent_key="demo",
+        input_payload="Hi",
+        metadata={"queue": "batch"},
+    )
+    backend = RoutingDummyBackend("default", {"QUEUES": ["interactive", "default", "batch"]})
+
+    result = backend.enqueue(run_agent_task, [str(run.id)], {})
+
+    assert result.task.queue_name == "batch"
+
+
+def test_purge_task_uses_maintenance_queue() -> None:
+    assert purge_agent_session.queue_name == "maintenance"
+
+
+def test_uses_rq_backend_checks_the_backend_class() -> None:
+    pytest.importorskip("django_tasks.backends.rq")
+    dummy = {"default": {"BACKEND": "django_tasks.backends.dummy.DummyBackend"}}
+    routed = {
+        "default": {
+            "BACKEND": "sample_app.task_backends.RoutingRQBackend",
+            "QUEUES": queue_priority(),
+        }
+    }
+
+    with override_settings(TASKS=dummy):
+        assert not uses_rq_backend()
+    with override_settings(TASKS=routed):
+        assert uses_rq_backend()
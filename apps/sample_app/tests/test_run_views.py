@@ -3,10 +3,12 @@ from __future__ import annotations
 import pytest
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AbstractBaseUser
+from django.db import connection
 from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse
 
-from agentic_django.models import AgentRun, AgentSession
+from agentic_django.models import AgentEvent, AgentRun, AgentSession, AgentSessionItem
 
 pytestmark = pytest.mark.django_db
 
@@ -97,7 +99,8 @@ def test_run_create_requires_input(
     assert response.json()["error"] == "input is required"
 
 
-def test_run_fragment_for_running_includes_polling(
+@override_settings(SAMPLE_APP_RUN_STREAM_ENABLED=True)
+def test_run_fragment_for_running_opens_stream_and_keeps_polling(
     client_logged_in: Client,
     user: AbstractBaseUser,
 ) -> None:
@@ -119,6 +122,55 @@ def test_run_fragment_for_running_includes_polling(
     content = response.content.decode()
     assert "Running" in content
     assert f'hx-get="/agents/runs/{run.id}/fragment/"' in content
+    assert f'data-run-stream="/runs/{run.id}/stream/"' in content
+    # The poll only fires while the stream is not open.
+    assert 'hx-trigger="run-status, every 2s [!this.dataset.streamOpen]"' in content
+
+
+def test_run_fragment_poll_reads_login_session_from_cache(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    session = _make_session(user, "session-cached-auth")
+    run = AgentRun.objects.create(
+        session=session,
+        owner=user,
+        agent_key="demo",
+        status=AgentRun.Status.RUNNING,
+        input_payload="Hello",
+        task_id="",
+    )
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client_logged_in.get(
+            reverse("agents:run-fragment", kwargs={"run_id": run.id})
+        )
+
+    assert response.status_code == 200
+    assert not [query for query in queries if "django_session" in query["sql"]]
+
+
+def test_run_fragment_polls_by_default(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    session = _make_session(user, "session-running-poll")
+    run = AgentRun.objects.create(
+        session=session,
+        owner=user,
+        agent_key="demo",
+        status=AgentRun.Status.RUNNING,
+        input_payload="Hello",
+        task_id="",
+    )
+
+    response = client_logged_in.get(
+        reverse("agents:run-fragment", kwargs={"run_id": run.id})
+    )
+
+    content = response.content.decode()
+    assert 'hx-trigger="load delay:1s, every 2s"' in content
+    assert "data-run-stream" not in content
 
 
 def test_run_fragment_completed_hides_output(
@@ -219,3 +271,60 @@ def test_run_detail_requires_owner(
     )
 
     assert response.status_code == 404
+
+
+def test_run_stream_sends_status_items_and_deltas_until_terminal(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    session = _make_session(user, "session-stream")
+    run = AgentRun.objects.create(
+        session=session,
+        owner=user,
+        agent_key="demo",
+        status=AgentRun.Status.COMPLETED,
+        input_payload="Hello",
+        task_id="",
+    )
+    AgentSessionItem.objects.create(
+        session=session,
+        sequence=3,
+        payload={"role": "assistant", "content": "Done"},
+    )
+    AgentEvent.objects.create(
+        run=run,
+        sequence=1,
+        event_type="raw_response_event",
+        payload={"type": "raw_response_event", "delta": "Do"},
+    )
+
+    response = client_logged_in.get(reverse("sample_app:run-stream", kwargs={"run_id": run.id}))
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "text/event-stream"
+    body = b"".join(response).decode()
+    assert 'event: delta\ndata: {"delta":"Do"}' in body
+    assert 'event: items\ndata: {"last_sequence":3}' in body
+    assert 'event: status\ndata: {"status":"completed"}' in body
+    assert body.rstrip().endswith('event: end\ndata: {"reason":"completed"}')
+
+
+def test_run_stream_requires_owner(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    user_model = get_user_model()
+    other_user = user_model.objects.create_user(username="other-stream", password="pass")
+    session = _make_session(other_user, "session-stream-owner")
+    run = AgentRun.objects.create(
+        session=session,
+        owner=other_user,
+        agent_key="demo",
+        status=AgentRun.Status.RUNNING,
+        input_payload="Hello",
+        task_id="",
+    )
+
+    response = client_logged_in.get(reverse("sample_app:run-stream", kwargs={"run_id": run.id}))
+
+    assert response.status_code == 404
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 import pytest
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AbstractBaseUser
 from django.test import Client
+from django.test.utils import override_settings
 from django.urls import reverse
 
 from agentic_django.models import AgentSession, AgentSessionItem
@@ -106,3 +108,144 @@ def test_session_items_formats_reasoning_summary_details(
     assert "Thought for a moment" in content
     assert "<details" in content
     assert "Used the map API." in content
+
+
+def test_conversation_items_returns_only_items_after_cursor(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    session = _make_session(user, "session-cursor")
+    AgentSessionItem.objects.create(
+        session=session,
+        sequence=1,
+        payload={"role": "user", "content": "Earlier question"},
+    )
+    AgentSessionItem.objects.create(
+        session=session,
+        sequence=2,
+        payload={"role": "assistant", "content": "Newer answer"},
+    )
+
+    response = client_logged_in.get(
+        reverse("sample_app:conversation-items", kwargs={"session_key": session.session_key}),
+        {"after": 1},
+        **{"HTTP_HX_REQUEST": "true"},
+    )
+
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert "Newer answer" in content
+    assert 'data-sequence="2"' in content
+    assert "Earlier question" not in content
+    assert "<ul" not in content
+    assert "No conversation history yet." not in content
+
+
+def test_conversation_items_without_new_items_is_empty(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    session = _make_session(user, "session-cursor-empty")
+    AgentSessionItem.objects.create(
+        session=session,
+        sequence=1,
+        payload={"role": "user", "content": "Hello"},
+    )
+
+    response = client_logged_in.get(
+        reverse("sample_app:conversation-items", kwargs={"session_key": session.session_key}),
+        {"after": 1},
+    )
+
+    assert response.status_code == 200
+    assert response.content.decode().strip() == ""
+
+
+def test_conversation_items_rejects_invalid_cursor(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    session = _make_session(user, "session-cursor-invalid")
+
+    response = client_logged_in.get(
+        reverse("sample_app:conversation-items", kwargs={"session_key": session.session_key}),
+        {"after": "latest"},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["error"] == "after must be an integer"
+
+
+def test_conversation_items_requires_owner(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    user_model = get_user_model()
+    other_user = user_model.objects.create_user(username="other-user", password="pass")
+    session = _make_session(other_user, "session-cursor-owner")
+
+    response = client_logged_in.get(
+        reverse("sample_app:conversation-items", kwargs={"session_key": session.session_key}),
+    )
+
+    assert response.status_code == 404
+
+
+def _add_messages(session: AgentSession, count: int) -> None:
+    AgentSessionItem.objects.bulk_create(
+        AgentSessionItem(
+            session=session,
+            sequence=index,
+            payload={"role": "user", "content": f"Message {index}"},
+        )
+        for index in range(1, count + 1)
+    )
+
+
+@override_settings(SAMPLE_APP_CONVERSATION_PAGE_SIZE=3)
+def test_home_renders_only_the_latest_page(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    client_logged_in.get(reverse("sample_app:home"))
+    session = AgentSession.objects.get(owner=user)
+    _add_messages(session, 5)
+
+    content = client_logged_in.get(reverse("sample_app:home")).content.decode()
+
+    assert "Message 1<" not in content
+    assert "Message 2<" not in content
+    assert "Message 3" in content
+    assert "Message 5" in content
+    assert f"/sessions/{session.session_key}/items/?before=3" in content
+
+
+@override_settings(SAMPLE_APP_CONVERSATION_PAGE_SIZE=2)
+def test_conversation_items_pages_backwards_by_sequence(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    session = _make_session(user, "paged-session")
+    _add_messages(session, 5)
+    url = reverse("sample_app:conversation-items", kwargs={"session_key": session.session_key})
+
+    middle = client_logged_in.get(url, {"before": 4}).content.decode()
+    first = client_logged_in.get(url, {"before": 2}).content.decode()
+
+    assert 'data-sequence="2"' in middle
+    assert 'data-sequence="3"' in middle
+    assert 'data-sequence="4"' not in middle
+    assert "?before=2" in middle
+    assert 'data-sequence="1"' in first
+    assert "data-earlier" not in first
+
+
+def test_conversation_items_rejects_after_and_before_together(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    session = _make_session(user, "both-cursors")
+    url = reverse("sample_app:conversation-items", kwargs={"session_key": session.session_key})
+
+    assert client_logged_in.get(url, {"before": "x"}).status_code == 400
+    assert client_logged_in.get(url, {"before": 3, "after": 1}).status_code == 400
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AbstractBaseUser
+from django.test.utils import override_settings
+from prometheus_client import REGISTRY
+
+from agents import ModelSettings
+from agents.models.interface import Model, ModelTracing
+
+from agentic_django.conf import get_settings
+from agentic_django.models import AgentSession, AgentSessionItem
+from agentic_django.registry import get_agent
+from agentic_django.sessions import get_session
+from sample_app.sessions import (
+    TRUNCATED_MARKER,
+    CompactingModel,
+    CompactionPolicy,
+    compact_history,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def _turn(index: int, output_chars: int = 40) -> list[dict[str, Any]]:
+    call_id = f"call-{index}"
+    return [
+        {"role": "user", "content": f"Find flights for trip {index}"},
+        {
+            "type": "function_call",
+            "name": "find_flight",
+            "arguments": f'{{"origin": "SFO", "trip": {index}}}',
+            "call_id": call_id,
+        },
+        {"type": "function_call_output", "call_id": call_id, "output": "x" * output_chars},
+        {
+            "type": "message",
+            "role": "assistant",
+            "content": [{"type": "output_text", "text": f"Here are options for trip {index}."}],
+        },
+    ]
+
+
+def _history(turns: int, output_chars: int = 40) -> list[dict[str, Any]]:
+    return [item for index in range(turns) for item in _turn(index, output_chars)]
+
+
+def test_short_history_is_sent_unchanged() -> None:
+    items = _history(2)
+
+    compacted, report = compact_history(items, CompactionPolicy(max_items=20))
+
+    assert compacted is items
+    assert not report.compacted
+    assert report.items_before == report.items_after == 8
+
+
+def test_long_history_is_summarized_at_a_turn_boundary() -> None:
+    items = _history(10, output_chars=500)
+    policy = CompactionPolicy(max_items=20, keep_recent_items=8, tool_output_chars=100)
+
+    compacted, report = compact_history(items, policy)
+
+    summary = compacted[0]
+    assert summary["role"] == "system"
+    assert "User: Find flights for trip 0" in summary["content"]
+    assert "Tool call: find_flight" in summary["content"]
+    assert compacted[1] == {"role": "user", "content": "Find flights for trip 8"}
+    # Older tool output in the kept tail is truncated; the current turn is not.
+    assert compacted[3]["output"].endswith(TRUNCATED_MARKER)
+    assert compacted[-2]["output"] == "x" * 500
+    assert report.items_before == 40
+    assert report.items_after == 9
+    assert report.tokens_after < report.tokens_before
+
+
+def test_tool_outputs_stay_paired_with_their_calls() -> None:
+    items = _history(12)
+
+    compacted, _ = compact_history(items, CompactionPolicy(max_items=10, keep_recent_items=5))
+
+    call_ids = {item["call_id"] for item in compacted if item.get("type") == "function_call"}
+    output_ids = {
+        item["call_id"] for item in compacted if item.get("type") == "function_call_output"
+    }
+    assert output_ids == call_ids
+
+
+class RecordingModel(Model):
+    def __init__(self) -> None:
+        self.inputs: list[Any] = []
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: Any,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        self.inputs.append(input)
+        return None
+
+    def stream_response(self, *args: Any, **kwargs: Any) -> Any:
+        raise NotImplementedError
+
+
+def _observed(name: str, stage: str) -> float:
+    labels = {"agent_key": "demo", "stage": stage}
+    return REGISTRY.get_sample_value(f"{name}_sum", labels) or 0.0
+
+
+def _ask(model: CompactingModel, items: list[dict[str, Any]]) -> None:
+    async_to_sync(model.get_response)(
+        "Be brief.",
+        items,
+        ModelSettings(),
+        [],
+        None,
+        [],
+        ModelTracing.DISABLED,
+        previous_response_id=None,
+        conversation_id=None,
+        prompt=None,
+    )
+
+
+@override_settings(
+    SAMPLE_APP_COMPACTION_MAX_ITEMS=10,
+    SAMPLE_APP_COMPACTION_KEEP_ITEMS=4,
+)
+def test_agent_model_compacts_only_the_model_request(user: AbstractBaseUser) -> None:
+    session = AgentSession.objects.create(owner=user, session_key="long-chat")
+    AgentSessionItem.objects.bulk_create(
+        AgentSessionItem(session=session, sequence=index + 1, payload=payload)
+        for index, payload in enumerate(_history(6))
+    )
+    recorder = RecordingModel()
+    model = CompactingModel(recorder, "demo")
+    before = _observed("sample_app_model_input_items", "before")
+    after = _observed("sample_app_model_input_items", "after")
+
+    _ask(model, _history(6))
+    # ``get_items`` runs this in a worker thread; call it directly so the test
+    # transaction's connection is used.
+    stored = get_session("long-chat", user)._get_items(None)
+
+    assert len(recorder.inputs[0]) == 5
+    assert _observed("sample_app_model_input_items", "before") == before + 24
+    assert _observed("sample_app_model_input_items", "after") == after + 5
+    assert len(stored) == 24
+    assert stored == _history(6)
+    with override_settings(SAMPLE_APP_COMPACTION_ENABLED=False):
+        _ask(model, _history(6))
+    assert len(recorder.inputs[1]) == 24
+
+
+def test_compaction_is_part_of_the_agent_not_the_run_options() -> None:
+    assert isinstance(get_agent("demo").model, CompactingModel)
+    assert "run_config" not in get_settings().default_run_options
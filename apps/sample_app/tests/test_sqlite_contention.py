@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+
+from agentic_django_example import settings as project_settings
+from sample_app.benchmarks import sqlite_contention
+
+
+def test_sqlite_connections_use_wal_and_immediate_transactions() -> None:
+    assert "PRAGMA journal_mode=WAL" in project_settings.SQLITE_INIT_COMMAND
+    assert "PRAGMA synchronous=NORMAL" in project_settings.SQLITE_INIT_COMMAND
+    assert f"PRAGMA busy_timeout={project_settings.SQLITE_BUSY_TIMEOUT_MS}" in (
+        project_settings.SQLITE_INIT_COMMAND
+    )
+    assert project_settings.DATABASES["default"]["OPTIONS"]["transaction_mode"] == "IMMEDIATE"
+    assert project_settings.DATABASES["default"]["OPTIONS"] == project_settings.SQLITE_OPTIONS
+
+
+def test_tuned_sqlite_has_no_lock_errors(tmp_path: Path) -> None:
+    result = sqlite_contention(
+        str(tmp_path / "tuned.sqlite3"),
+        tuned=True,
+        writers=4,
+        readers=2,
+        operations=20,
+    )
+
+    assert result["operations"] == 120
+    assert result["errors"] == 0
+    assert result["p99_ms"] >= result["p50_ms"]
+
+
+def test_bench_sqlite_contention_command_reports_both_configs() -> None:
+    stdout = StringIO()
+    call_command("bench_sqlite_contention", writers=2, readers=1, operations=5, stdout=stdout)
+
+    lines = stdout.getvalue().strip().splitlines()
+    assert len(lines) == 3
+    assert lines[1].split()[0] == "default"
+    assert lines[2].split()[0] == "tuned"
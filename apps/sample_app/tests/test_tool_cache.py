@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import pytest
+from django.core.cache import cache
+
+from sample_app import tools
+from sample_app.tool_cache import ToolResultCache, cached_tool, get_tool_cache
+
+
+@pytest.fixture(autouse=True)
+def _fresh_tool_cache() -> Iterator[None]:
+    get_tool_cache.cache_clear()
+    cache.clear()
+    yield
+    get_tool_cache.cache_clear()
+
+
+def test_route_key_matches_equivalent_searches() -> None:
+    calls: list[tuple[str, str, str]] = []
+
+    @cached_tool(ttl=tools.FIND_FLIGHT_CACHE_TTL, key=tools._route_key)
+    def search(origin: str, destination: str, travel_date: str) -> int:
+        calls.append((origin, destination, travel_date))
+        return tools._seed_for_route(origin, destination, travel_date)
+
+    first = search("SFO", "JFK", "2026-05-01")
+    second = search(" sfo ", "jfk", travel_date="2026-05-01 ")
+    third = search("New  York", "JFK", "2026-05-01")
+    fourth = search(" new york", "jfk", "2026-05-01")
+
+    assert second == first
+    assert fourth == third
+    assert len(calls) == 2
+    assert get_tool_cache().stats()["hits"] == 2
+
+
+def test_equivalent_route_searches_return_the_same_flights() -> None:
+    first = tools._search_route(" sfo", "jfk ", "2026-05-01")
+    second = tools._search_route("SFO", "JFK", "2026-05-01")
+
+    assert second is first
+    assert {(flight["origin"], flight["destination"]) for flight in first} == {("SFO", "JFK")}
+
+
+def test_cached_tool_keeps_function_tool_schema() -> None:
+    assert tools.find_flight.name == "find_flight"
+    assert tools.find_flight.description == "Return mock flight options for a given route and date."
+    assert set(tools.find_flight.params_json_schema["properties"]) == {
+        "origin",
+        "destination",
+        "travel_date",
+    }
+
+
+def test_tool_results_expire_after_ttl() -> None:
+    now = [0.0]
+    result_cache = ToolResultCache(max_entries=8, clock=lambda: now[0])
+    calls: list[int] = []
+
+    def _quote() -> int:
+        calls.append(1)
+        return len(calls)
+
+    assert result_cache.get_or_call("quote", 30, _quote) == 1
+    now[0] = 29.0
+    assert result_cache.get_or_call("quote", 30, _quote) == 1
+    now[0] = 31.0
+    assert result_cache.get_or_call("quote", 30, _quote) == 2
+
+
+def test_tool_result_cache_is_bounded() -> None:
+    result_cache = ToolResultCache(max_entries=2)
+
+    for key in ("a", "b", "c"):
+        result_cache.get_or_call(key, 60, lambda: key)
+
+    assert result_cache.stats()["size"] == 2
+    assert result_cache.stats()["evictions"] == 1
+
+
+def test_cached_tool_shares_results_through_django_cache(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[str] = []
+
+    @cached_tool(ttl=60)
+    def lookup(code: str) -> dict[str, str]:
+        calls.append(code)
+        return {"code": code}
+
+    monkeypatch.setattr(
+        "sample_app.tool_cache.get_tool_cache",
+        lambda: ToolResultCache(max_entries=8, cache_alias="default"),
+    )
+
+    assert lookup("DL123") == {"code": "DL123"}
+    assert lookup("DL123") == {"code": "DL123"}
+    assert lookup("UA456") == {"code": "UA456"}
+    assert calls == ["DL123", "UA456"]
+
+
+def test_shared_hit_is_kept_locally_only_until_the_shared_entry_expires() -> None:
+    now = [0.0]
+    wall = [1000.0]
+    calls: list[str] = []
+
+    def _result_cache() -> ToolResultCache:
+        return ToolResultCache(
+            max_entries=8,
+            cache_alias="default",
+            clock=lambda: now[0],
+            wall_clock=lambda: wall[0],
+        )
+
+    def _search() -> int:
+        calls.append("search")
+        return len(calls)
+
+    writer = _result_cache()
+    assert writer.get_or_call("route", 60, _search) == 1
+    # Another process reads the shared entry 50 seconds later: 10 seconds left.
+    wall[0] += 50
+    reader = _result_cache()
+    assert reader.get_or_call("route", 60, _search) == 1
+    now[0] += 11
+    wall[0] += 11
+
+    assert reader.get_or_call("route", 60, _search) == 2
+    assert calls == ["search", "search"]
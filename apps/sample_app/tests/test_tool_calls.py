@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+from django.contrib.auth.models import AbstractBaseUser
+from django.test import Client
+from django.urls import reverse
+
+from agentic_django.models import AgentRun, AgentSession
+from agentic_django.signals import agent_run_completed, agent_run_started
+from sample_app import tools
+from sample_app.tool_calls import (
+    instrumented_tool,
+    payload_size,
+    start_recording,
+    stop_recording,
+    summarize_tool_calls,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@instrumented_tool
+async def echo(text: str) -> dict[str, Any]:
+    return {"text": text}
+
+
+@instrumented_tool
+async def explode(code: int) -> None:
+    raise ValueError(f"bad code {code}")
+
+
+async def _call_tools() -> None:
+    await echo("hello")
+    with pytest.raises(ValueError):
+        await explode(7)
+
+
+def test_instrumented_tool_records_timing_sizes_and_errors() -> None:
+    async def scenario() -> list[dict[str, Any]]:
+        recorder = start_recording()
+        await _call_tools()
+        assert stop_recording() is recorder
+        return recorder.calls
+
+    ok, failed = asyncio.run(scenario())
+
+    assert ok["tool"] == "echo"
+    assert ok["args_bytes"] == payload_size({"text": "hello"})
+    assert ok["result_bytes"] == payload_size({"text": "hello"})
+    assert ok["error"] is None
+    assert ok["duration_ms"] >= 0
+    assert failed["tool"] == "explode"
+    assert failed["offset_ms"] >= ok["offset_ms"]
+    assert failed["result_bytes"] is None
+    assert failed["error"] == "ValueError: bad code 7"
+
+
+def test_calls_outside_a_run_are_not_recorded() -> None:
+    assert asyncio.run(echo("hi")) == {"text": "hi"}
+    assert stop_recording() is None
+
+
+def test_instrumentation_keeps_tool_schemas() -> None:
+    assert set(tools.find_flight.params_json_schema["properties"]) == {
+        "origin",
+        "destination",
+        "travel_date",
+    }
+
+
+def test_summarize_tool_calls_reports_percentiles_per_tool() -> None:
+    calls = [{"tool": "echo", "duration_ms": float(ms), "error": None} for ms in range(1, 21)]
+    calls.append({"tool": "explode", "duration_ms": 3.0, "error": "ValueError: bad"})
+
+    summary = summarize_tool_calls(calls)
+
+    assert summary["echo"] == {
+        "count": 20,
+        "errors": 0,
+        "total_ms": 210.0,
+        "p50_ms": 11.0,
+        "p95_ms": 20.0,
+    }
+    assert summary["explode"]["errors"] == 1
+
+
+def test_run_signals_store_calls_and_fragment_shows_timeline(
+    client_logged_in: Client,
+    user: AbstractBaseUser,
+) -> None:
+    session = AgentSession.objects.create(owner=user, session_key="tool-calls-session")
+    run = AgentRun.objects.create(
+        session=session,
+        owner=user,
+        agent_key="demo",
+        input_payload="Hello",
+    )
+
+    agent_run_started.send(sender=AgentRun, run=run)
+    asyncio.run(_call_tools())
+    run.status = AgentRun.Status.COMPLETED
+    run.save(update_fields=["status"])
+    agent_run_completed.send(sender=AgentRun, run=run, result=None)
+
+    run.refresh_from_db()
+    assert [call["tool"] for call in run.metadata["tool_calls"]] == ["echo", "explode"]
+    assert set(run.metadata["tool_call_summary"]) == {"echo", "explode"}
+
+    response = client_logged_in.get(reverse("agents:run-fragment", kwargs={"run_id": run.id}))
+    content = response.content.decode()
+    assert 'class="agent-run__timeline"' in content
+    assert "2 tool calls" in content
+    assert "ValueError: bad code 7" in content
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Iterator
+
+import pytest
+from django.conf import settings
+
+from sample_app import tools
+from sample_app.agent_registry import build_demo_agent
+from sample_app.tool_cache import get_tool_cache
+from sample_app.tool_runtime import run_blocking
+from sample_app.tools import RouteSearch, quote_flights, search_routes
+
+
+@pytest.fixture(autouse=True)
+def _fresh_tool_cache() -> Iterator[None]:
+    get_tool_cache.cache_clear()
+    yield
+    get_tool_cache.cache_clear()
+
+
+def test_search_routes_returns_one_result_per_search_in_order() -> None:
+    searches = [
+        RouteSearch(origin="SFO", destination="JFK", travel_date=f"2026-05-0{day}")
+        for day in range(1, 6)
+    ]
+
+    results = asyncio.run(search_routes(searches))
+
+    assert [result["travel_date"] for result in results] == [
+        search.travel_date for search in searches
+    ]
+    assert all(result["flights"] for result in results)
+    assert results[0]["flights"][0]["date"] == "2026-05-01"
+
+
+def test_quote_flights_matches_single_quotes() -> None:
+    quotes = asyncio.run(quote_flights(["DL123", "UA456"]))
+
+    assert [quote["flight_number"] for quote in quotes] == ["DL123", "UA456"]
+    assert quotes[0]["amount"] == tools._price_for_flight_number("DL123")
+
+
+def test_batch_tools_reject_oversized_batches() -> None:
+    with pytest.raises(ValueError, match="at most 10"):
+        asyncio.run(quote_flights([f"DL{number}" for number in range(11)]))
+
+
+def test_demo_agent_registers_batch_tools() -> None:
+    tool_names = {tool.name for tool in build_demo_agent().tools}
+
+    assert {"find_flights", "get_flight_prices"} <= tool_names
+    assert tools.find_flights.params_json_schema["properties"]["searches"]["type"] == "array"
+
+
+def test_every_tool_has_a_timeout() -> None:
+    for tool in (
+        tools.find_flight,
+        tools.find_flights,
+        tools.get_flight_price,
+        tools.get_flight_prices,
+        tools.book_flight,
+    ):
+        assert tool.timeout_seconds == settings.SAMPLE_APP_TOOL_TIMEOUT
+
+
+def test_run_blocking_overlaps_slow_backends() -> None:
+    thread_names: list[str] = []
+
+    def _slow_backend(value: int) -> int:
+        thread_names.append(threading.current_thread().name)
+        time.sleep(0.2)
+        return value
+
+    async def _run_parallel() -> list[int]:
+        calls = (run_blocking(_slow_backend, value) for value in range(4))
+        return list(await asyncio.gather(*calls))
+
+    started = time.perf_counter()
+    assert asyncio.run(_run_parallel()) == [0, 1, 2, 3]
+
+    assert time.perf_counter() - started < 0.6
+    assert all(name.startswith("sample-app-tool") for name in thread_names)
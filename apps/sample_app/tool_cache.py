@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from functools import lru_cache
+from typing import Any, TypeVar, cast
+
+from django.conf import settings
+from django.core.cache import caches
+
+DEFAULT_MAX_ENTRIES = 512
+SHARED_KEY_PREFIX = "sample_app:tool-result:v2"
+
+F = TypeVar("F", bound=Callable[..., Any])
+_MISSING = object()
+
+
+class ToolResultCache:
+    """Bounded LRU of tool results with a per-entry time to live.
+
+    Results live in-process first and, when a Django cache alias is configured
+    (for example a Redis cache shared by the RQ workers), are shared across
+    processes through it with the same TTL. A result read from the shared
+    cache is kept locally only until the shared entry expires.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        cache_alias: str | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.max_entries = max_entries
+        self.cache_alias = cache_alias
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_call(self, key: str, ttl: float, call: Callable[[], Any]) -> Any:
+        now = self._clock()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                expires_at, value = cached
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        remaining, value = self._shared_get(key)
+        if value is _MISSING:
+            value = call()
+            self._shared_set(key, value, ttl)
+            remaining = ttl
+            with self._lock:
+                self.misses += 1
+        else:
+            with self._lock:
+                self.hits += 1
+        self._store(key, value, now + min(ttl, remaining))
+        return value
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def _store(self, key: str, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _shared_get(self, key: str) -> tuple[float, Any]:
+        # Returns the seconds the shared entry has left and its value.
+        if not self.cache_alias:
+            return 0.0, _MISSING
+        entry = caches[self.cache_alias].get(f"{SHARED_KEY_PREFIX}:{key}")
+        if entry is None:
+            return 0.0, _MISSING
+        expires_at, value = entry
+        remaining = expires_at - self._wall_clock()
+        if remaining <= 0:
+            return 0.0, _MISSING
+        return remaining, value
+
+    def _shared_set(self, key: str, value: Any, ttl: float) -> None:
+        if not self.cache_alias:
+            return
+        # Backends do not report an entry's remaining TTL, so store the wall
+        # clock expiry with the value for other processes to honour.
+        entry = (self._wall_clock() + ttl, value)
+        caches[self.cache_alias].set(f"{SHARED_KEY_PREFIX}:{key}", entry, timeout=ttl)
+
+
+def tool_cache_key(tool_name: str, key_parts: Any) -> str:
+    """Return the cache key for ``tool_name`` called with normalized ``key_parts``."""
+
+    encoded = json.dumps(key_parts, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{tool_name}:{digest}"
+
+
+def cached_tool(
+    *,
+    ttl: float,
+    key: Callable[..., Hashable] | None = None,
+) -> Callable[[F], F]:
+    """Cache a deterministic tool's results for ``ttl`` seconds.
+
+    Apply it to the plain function behind a tool, or directly below
+    ``@function_tool`` so the tool schema still comes from the wrapped signature
+    and docstring. ``key`` receives the call's arguments and
+    returns the normalized value that identifies equivalent calls; without it
+    arguments are compared exactly. Cached results are shared between callers,
+    so treat them as read-only.
+    """
+
+    def decorator(func: F) -> F:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key_parts = key(**bound.arguments) if key else list(bound.arguments.values())
+            return get_tool_cache().get_or_call(
+                tool_cache_key(func.__name__, key_parts),
+                ttl,
+                lambda: func(*args, **kwargs),
+            )
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+@lru_cache(maxsize=None)
+def get_tool_cache() -> ToolResultCache:
+    """Return the process-wide tool result cache configured from settings."""
+
+    return ToolResultCache(
+        max_entries=getattr(settings, "SAMPLE_APP_TOOL_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES),
+        cache_alias=getattr(settings, "SAMPLE_APP_TOOL_CACHE_ALIAS", None),
+    )
+
+
+__all__ = ["ToolResultCache", "cached_tool", "get_tool_cache", "tool_cache_key"]
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import json
+import time
+from collections.abc import Callable, Coroutine
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, TypeVar, cast
+
+from django.dispatch import receiver
+from django.utils import timezone
+
+from agentic_django.models import AgentRun
+from agentic_django.signals import agent_run_completed, agent_run_failed, agent_run_started
+from sample_app.metrics import TOOL_CALL_DURATION
+
+TOOL_CALLS_KEY = "tool_calls"
+TOOL_CALL_SUMMARY_KEY = "tool_call_summary"
+MAX_RECORDED_CALLS = 200
+
+F = TypeVar("F", bound=Callable[..., Coroutine[Any, Any, Any]])
+
+
+@dataclass
+class ToolCallRecorder:
+    """Tool calls made during one run, with offsets from the run's start."""
+
+    started: float = field(default_factory=time.perf_counter)
+    calls: list[dict[str, Any]] = field(default_factory=list)
+    dropped: int = 0
+
+    def record(
+        self,
+        *,
+        tool: str,
+        started: float,
+        ended: float,
+        args_bytes: int,
+        result_bytes: int | None,
+        error: str | None,
+    ) -> None:
+        TOOL_CALL_DURATION.labels(tool, "error" if error else "ok").observe(ended - started)
+        if len(self.calls) >= MAX_RECORDED_CALLS:
+            self.dropped += 1
+            return
+        self.calls.append(
+            {
+                "tool": tool,
+                "started_at": timezone.now().isoformat(timespec="milliseconds"),
+                "offset_ms": round((started - self.started) * 1000, 3),
+                "duration_ms": round((ended - started) * 1000, 3),
+                "args_bytes": args_bytes,
+                "result_bytes": result_bytes,
+                "error": error,
+            }
+        )
+
+
+_recorder: ContextVar[ToolCallRecorder | None] = ContextVar(
+    "sample_app_tool_call_recorder",
+    default=None,
+)
+
+
+def start_recording() -> ToolCallRecorder:
+    """Record tool calls made from this context (and tasks it starts) from now on."""
+
+    recorder = ToolCallRecorder()
+    _recorder.set(recorder)
+    return recorder
+
+
+def stop_recording() -> ToolCallRecorder | None:
+    recorder = _recorder.get()
+    _recorder.set(None)
+    return recorder
+
+
+def _jsonable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    return str(value)
+
+
+def payload_size(value: Any) -> int:
+    """Return the UTF-8 size of ``value`` serialized as JSON."""
+
+    encoded = json.dumps(value, default=_jsonable, ensure_ascii=False, separators=(",", ":"))
+    return len(encoded.encode("utf-8"))
+
+
+def instrumented_tool(func: F) -> F:
+    """Time an async tool and measure its argument and result sizes.
+
+    Apply it directly below ``@function_tool`` so the tool schema still comes
+    from the wrapped signature. Calls outside a recorded run pass straight
+    through. Errors, including timeouts (which cancel the call), are recorded
+    and re-raised for the Agents SDK to report to the model.
+    """
+
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        recorder = _recorder.get()
+        if recorder is None:
+            return await func(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        args_bytes = payload_size(bound.arguments)
+        started = time.perf_counter()
+        result_bytes: int | None = None
+        error: str | None = None
+        try:
+            result = await func(*args, **kwargs)
+            result_bytes = payload_size(result)
+            return result
+        except asyncio.CancelledError:
+            error = "Cancelled (timed out)"
+            raise
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            recorder.record(
+                tool=func.__name__,
+                started=started,
+                ended=time.perf_counter(),
+                args_bytes=args_bytes,
+                result_bytes=result_bytes,
+                error=error,
+            )
+
+    return cast(F, wrapper)
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def summarize_tool_calls(calls: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """Return call count, error count, total, p50, and p95 milliseconds per tool."""
+
+    durations: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    for call in calls:
+        durations.setdefault(call["tool"], []).append(call["duration_ms"])
+        errors[call["tool"]] = errors.get(call["tool"], 0) + (1 if call.get("error") else 0)
+    return {
+        tool: {
+            "count": len(samples),
+            "errors": errors[tool],
+            "total_ms": round(sum(samples), 3),
+            "p50_ms": _percentile(samples, 0.5),
+            "p95_ms": _percentile(samples, 0.95),
+        }
+        for tool, samples in sorted(durations.items())
+    }
+
+
+def save_tool_calls(run: AgentRun, recorder: ToolCallRecorder) -> None:
+    """Store the recorded calls and their per-tool summary in ``run.metadata``."""
+
+    if not recorder.calls:
+        return
+    metadata = {
+        **run.metadata,
+        TOOL_CALLS_KEY: recorder.calls,
+        TOOL_CALL_SUMMARY_KEY: summarize_tool_calls(recorder.calls),
+    }
+    if recorder.dropped:
+        metadata["tool_calls_dropped"] = recorder.dropped
+    # The package has already saved the run; update only the metadata column.
+    # updated_at moves too, so the run fragment's ETag changes with the timeline.
+    AgentRun.objects.filter(pk=run.pk).update(metadata=metadata, updated_at=timezone.now())
+    run.metadata = metadata
+
+
+@receiver(agent_run_started, dispatch_uid="sample_app.tool_calls.run_started")
+def _start_run_recording(sender: Any, run: AgentRun, **kwargs: Any) -> None:
+    start_recording()
+
+
+@receiver(agent_run_completed, dispatch_uid="sample_app.tool_calls.run_completed")
+@receiver(agent_run_failed, dispatch_uid="sample_app.tool_calls.run_failed")
+def _finish_run_recording(sender: Any, run: AgentRun, **kwargs: Any) -> None:
+    recorder = stop_recording()
+    if recorder is not None:
+        save_tool_calls(run, recorder)
+
+
+__all__ = [
+    "MAX_RECORDED_CALLS",
+    "TOOL_CALLS_KEY",
+    "TOOL_CALL_SUMMARY_KEY",
+    "ToolCallRecorder",
+    "instrumented_tool",
+    "payload_size",
+    "save_tool_calls",
+    "start_recording",
+    "stop_recording",
+    "summarize_tool_calls",
+]
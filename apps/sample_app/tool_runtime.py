@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, TypeVar
+
+from django.conf import settings
+
+DEFAULT_TOOL_THREADS = 8
+DEFAULT_TOOL_TIMEOUT = 10.0
+
+T = TypeVar("T")
+
+
+@lru_cache(maxsize=None)
+def get_tool_executor() -> ThreadPoolExecutor:
+    """Return the bounded thread pool that runs blocking tool work."""
+
+    return ThreadPoolExecutor(
+        max_workers=getattr(settings, "SAMPLE_APP_TOOL_THREADS", DEFAULT_TOOL_THREADS),
+        thread_name_prefix="sample-app-tool",
+    )
+
+
+def tool_timeout() -> float:
+    """Return the per-call timeout, in seconds, applied to every sample tool."""
+
+    return getattr(settings, "SAMPLE_APP_TOOL_TIMEOUT", DEFAULT_TOOL_TIMEOUT)
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a synchronous tool backend on the tool pool without blocking the loop.
+
+    Parallel tool calls from one model turn then overlap instead of queueing on
+    the worker's event loop, and they do not compete with other users of the
+    default executor. Context variables (tracing spans) follow the call into
+    the pool. A timed-out call stops being awaited, but its thread runs on.
+    """
+
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_tool_executor(), call)
+
+
+__all__ = ["get_tool_executor", "run_blocking", "tool_timeout"]
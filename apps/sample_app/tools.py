@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import random
 from datetime import date, datetime, time, timedelta, timezone
 from typing import Any
 
 from agents.tool import function_tool
+from pydantic import BaseModel
+
+from sample_app.tool_cache import cached_tool
+from sample_app.tool_calls import instrumented_tool
+from sample_app.tool_runtime import run_blocking, tool_timeout
 
 AIRLINES: list[dict[str, str]] = [
     {"name": "Delta Air Lines", "code": "DL"},
@@ -17,10 +23,31 @@ AIRLINES: list[dict[str, str]] = [
 ]
 FARE_CLASSES = ["Economy", "Premium Economy", "Business", "First"]
 AIRCRAFT = ["A220", "A320", "A321neo", "B737", "B787-8", "E175"]
+# Searches are deterministic per route, so they can be reused for a while;
+# quotes stamp ``last_updated`` and should stay fresh.
+FIND_FLIGHT_CACHE_TTL = 600
+FLIGHT_PRICE_CACHE_TTL = 30
+MAX_BATCH_SIZE = 10
+
+
+class RouteSearch(BaseModel):
+    origin: str
+    destination: str
+    travel_date: str
+
+
+def _route_key(origin: str, destination: str, travel_date: str) -> tuple[str, str, str]:
+    # Case and runs of whitespace never change the search, so they never split
+    # the cache either.
+    return (
+        " ".join(origin.split()).lower(),
+        " ".join(destination.split()).lower(),
+        travel_date.strip(),
+    )
 
 
 def _seed_for_route(origin: str, destination: str, travel_date: str) -> int:
-    seed_text = f"{origin.strip().lower()}|{destination.strip().lower()}|{travel_date.strip()}"
+    seed_text = "|".join(_route_key(origin, destination, travel_date))
     digest = hashlib.sha256(seed_text.encode("utf-8")).hexdigest()
     return int(digest[:8], 16)
 
@@ -38,10 +65,11 @@ def _price_for_flight_number(flight_number: str) -> float:
     return round(base + 24.95, 2)
 
 
-@function_tool
-def find_flight(origin: str, destination: str, travel_date: str) -> list[dict[str, Any]]:
-    """Return mock flight options for a given route and date."""
-
+@cached_tool(ttl=FIND_FLIGHT_CACHE_TTL, key=_route_key)
+def _search_route(origin: str, destination: str, travel_date: str) -> list[dict[str, Any]]:
+    # Build the result from the cache key alone so every equivalent search
+    # gets the same flights back, whichever spelling filled the cache.
+    origin, destination, travel_date = _route_key(origin, destination, travel_date)
     seed = _seed_for_route(origin, destination, travel_date)
     rng = random.Random(seed)
     flight_count = rng.randint(3, 5)
@@ -63,8 +91,8 @@ def find_flight(origin: str, destination: str, travel_date: str) -> list[dict[st
             {
                 "flight_number": flight_number,
                 "airline": airline["name"],
-                "origin": origin,
-                "destination": destination,
+                "origin": origin.upper(),
+                "destination": destination.upper(),
                 "date": depart_day.isoformat(),
                 "depart_time": depart_time.isoformat(timespec="minutes"),
                 "arrive_time": arrive_time.isoformat(timespec="minutes"),
@@ -78,10 +106,8 @@ def find_flight(origin: str, destination: str, travel_date: str) -> list[dict[st
     return flights
 
 
-@function_tool
-def get_flight_price(flight_number: str) -> dict[str, Any]:
-    """Return a mock price quote for a flight number."""
-
+@cached_tool(ttl=FLIGHT_PRICE_CACHE_TTL)
+def _quote_flight(flight_number: str) -> dict[str, Any]:
     amount = _price_for_flight_number(flight_number)
     return {
         "flight_number": flight_number,
@@ -92,10 +118,7 @@ def get_flight_price(flight_number: str) -> dict[str, Any]:
     }
 
 
-@function_tool
-def book_flight(flight_number: str) -> dict[str, Any]:
-    """Return a mock booking confirmation for a flight number."""
-
+def _book(flight_number: str) -> dict[str, Any]:
     digest = hashlib.sha256(f"book|{flight_number}".encode("utf-8")).hexdigest()
     booking_id = f"PNR-{digest[:6].upper()}"
     amount = _price_for_flight_number(flight_number)
@@ -112,4 +135,94 @@ def book_flight(flight_number: str) -> dict[str, Any]:
     }
 
 
-__all__ = ["book_flight", "find_flight", "get_flight_price"]
+def _check_batch_size(count: int) -> None:
+    if count > MAX_BATCH_SIZE:
+        raise ValueError(f"Send at most {MAX_BATCH_SIZE} items per call; got {count}.")
+
+
+async def search_routes(searches: list[RouteSearch]) -> list[dict[str, Any]]:
+    """Run every search concurrently and pair each with its flights."""
+
+    _check_batch_size(len(searches))
+    results = await asyncio.gather(
+        *(
+            run_blocking(_search_route, search.origin, search.destination, search.travel_date)
+            for search in searches
+        )
+    )
+    return [
+        {**search.model_dump(), "flights": flights}
+        for search, flights in zip(searches, results)
+    ]
+
+
+async def quote_flights(flight_numbers: list[str]) -> list[dict[str, Any]]:
+    """Quote every flight number concurrently, in request order."""
+
+    _check_batch_size(len(flight_numbers))
+    return list(
+        await asyncio.gather(
+            *(run_blocking(_quote_flight, number) for number in flight_numbers)
+        )
+    )
+
+
+@function_tool(timeout=tool_timeout())
+@instrumented_tool
+async def find_flight(origin: str, destination: str, travel_date: str) -> list[dict[str, Any]]:
+    """Return mock flight options for a given route and date."""
+
+    return await run_blocking(_search_route, origin, destination, travel_date)
+
+
+@function_tool(timeout=tool_timeout())
+@instrumented_tool
+async def find_flights(searches: list[RouteSearch]) -> list[dict[str, Any]]:
+    """Search several routes or dates in one call, e.g. to compare days or airports.
+
+    Args:
+        searches: Up to 10 searches, each with origin, destination, and travel_date
+            (YYYY-MM-DD).
+    """
+
+    return await search_routes(searches)
+
+
+@function_tool(timeout=tool_timeout())
+@instrumented_tool
+async def get_flight_price(flight_number: str) -> dict[str, Any]:
+    """Return a mock price quote for a flight number."""
+
+    return await run_blocking(_quote_flight, flight_number)
+
+
+@function_tool(timeout=tool_timeout())
+@instrumented_tool
+async def get_flight_prices(flight_numbers: list[str]) -> list[dict[str, Any]]:
+    """Return mock price quotes for several flight numbers in one call.
+
+    Args:
+        flight_numbers: Up to 10 flight numbers to quote.
+    """
+
+    return await quote_flights(flight_numbers)
+
+
+@function_tool(timeout=tool_timeout())
+@instrumented_tool
+async def book_flight(flight_number: str) -> dict[str, Any]:
+    """Return a mock booking confirmation for a flight number."""
+
+    return await run_blocking(_book, flight_number)
+
+
+__all__ = [
+    "RouteSearch",
+    "book_flight",
+    "find_flight",
+    "find_flights",
+    "get_flight_price",
+    "get_flight_prices",
+    "quote_flights",
+    "search_routes",
+]
@@ -11,6 +11,14 @@ urlpatterns = [
     path("", views.home, name="home"),
     path("demo-login/", views.demo_login, name="demo-login"),
     path("reset/", views.reset_session, name="reset"),
+    path(
+        "sessions/<slug:session_key>/items/",
+        views.conversation_items,
+        name="conversation-items",
+    ),
+    path("sessions/export/", views.session_export, name="session-export"),
+    path("runs/<uuid:run_id>/stream/", views.run_stream, name="run-stream"),
+    path("metrics", views.metrics, name="metrics"),
     path(
         "login/",
         auth_views.LoginView.as_view(template_name="sample_app/login.html"),
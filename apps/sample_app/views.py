@@ -1,19 +1,35 @@
 from __future__ import annotations
 
+import hmac
+import logging
+import re
 import uuid
+from datetime import datetime
 from typing import Any
 
-from asgiref.sync import async_to_sync
 from django.conf import settings
 from django.contrib.auth import get_user_model, login
 from django.contrib.auth.decorators import login_required
-from django.http import HttpRequest, HttpResponse
-from django.shortcuts import redirect, render
-from django.views.decorators.http import require_POST
+from django.http import Http404, HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+from django.views.decorators.http import require_GET, require_POST
+from django_tasks.backends.immediate import ImmediateBackend
 
 from agentic_django.models import AgentRun, AgentSession, AgentSessionItem
 from agentic_django.signals import agent_session_created
-from agentic_django.sessions import get_session
+from sample_app.conditional import conditional_poll, session_items_etag
+from sample_app.conversation import conversation_page
+from sample_app.events import run_event_stream
+from sample_app.exports import export_items, ndjson_chunks, parse_bound
+from sample_app.metrics import render_metrics
+from sample_app.purge import purge_after_commit, retire_session
+from sample_app.tasks import purge_agent_session
+
+logger = logging.getLogger(__name__)
+
+_ACCEPTS_GZIP = re.compile(r"\bgzip\b")
 
 
 def demo_login(request: HttpRequest) -> HttpResponse:
@@ -29,29 +45,72 @@ def demo_login(request: HttpRequest) -> HttpResponse:
     return redirect("sample_app:home")
 
 
-@login_required
-def home(request: HttpRequest) -> HttpResponse:
-    session_key = request.session.get("agent_session_key")
-    if not session_key:
-        session_key = uuid.uuid4().hex
-        request.session["agent_session_key"] = session_key
+AGENT_SESSION_KEY = "agent_session_key"
+AGENT_SESSION_ID = "agent_session_id"
+
+
+def _remember_agent_session(request: HttpRequest, session: AgentSession) -> None:
+    request.session[AGENT_SESSION_KEY] = session.session_key
+    request.session[AGENT_SESSION_ID] = str(session.pk)
+
+
+def _create_agent_session(request: HttpRequest) -> AgentSession:
+    # A fresh random key cannot collide, so a plain INSERT replaces get_or_create.
+    session = AgentSession.objects.create(owner=request.user, session_key=uuid.uuid4().hex)
+    agent_session_created.send(sender=AgentSession, session=session)
+    _remember_agent_session(request, session)
+    return session
+
+
+def _load_home_state(request: HttpRequest) -> tuple[AgentSession, AgentRun | None]:
+    """Return the visitor's agent session and latest run in as few queries as possible.
+
+    The session pk is cached in the Django session. The latest run is read
+    through the (owner, session, created_at) index and brings its session along,
+    so a session with history costs one query; a session without runs costs two.
+    """
+
+    session_key = request.session.get(AGENT_SESSION_KEY)
+    session_id = request.session.get(AGENT_SESSION_ID)
+    if session_key and session_id:
+        latest_run = (
+            AgentRun.objects.filter(owner=request.user, session_id=session_id)
+            .select_related("session")
+            .order_by("-created_at")
+            .first()
+        )
+        if latest_run is not None and latest_run.session.session_key == session_key:
+            return latest_run.session, latest_run
+        session = AgentSession.objects.filter(
+            pk=session_id,
+            owner=request.user,
+            session_key=session_key,
+        ).first()
+        if session is not None:
+            return session, None
 
+    if not session_key:
+        return _create_agent_session(request), None
     session, created = AgentSession.objects.get_or_create(
         owner=request.user,
         session_key=session_key,
     )
     if created:
         agent_session_created.send(sender=AgentSession, session=session)
-    latest_run = None
-    if session:
-        latest_run = (
-            AgentRun.objects.filter(owner=request.user, session=session)
-            .order_by("-created_at")
-            .first()
-        )
+    _remember_agent_session(request, session)
+    latest_run = (
+        AgentRun.objects.filter(owner=request.user, session=session)
+        .order_by("-created_at")
+        .first()
+    )
+    return session, latest_run
+
 
+@login_required
+def home(request: HttpRequest) -> HttpResponse:
+    session, latest_run = _load_home_state(request)
     context: dict[str, Any] = {
-        "session_key": session_key,
+        "session_key": session.session_key,
         "latest_run": latest_run,
         "session": session,
     }
@@ -61,22 +120,153 @@ def home(request: HttpRequest) -> HttpResponse:
 @login_required
 @require_POST
 def reset_session(request: HttpRequest) -> HttpResponse:
-    session_key = request.POST.get("session_key") or request.session.get("agent_session_key")
+    session_key = request.POST.get("session_key") or request.session.get(AGENT_SESSION_KEY)
+    old_session = None
     if session_key:
-        session = AgentSession.objects.filter(
+        old_session = AgentSession.objects.filter(
             owner=request.user,
             session_key=session_key,
         ).first()
-        if session:
-            backend_session = get_session(session_key, request.user)
-            async_to_sync(backend_session.clear_session)()
-            AgentSessionItem.objects.filter(session=session).delete()
-    new_session_key = uuid.uuid4().hex
-    request.session["agent_session_key"] = new_session_key
-    session, created = AgentSession.objects.get_or_create(
+    # Switch the browser to a fresh session first; the old history is purged
+    # in the background in bounded chunks.
+    _create_agent_session(request)
+    if old_session is not None:
+        retire_session(old_session)
+        _enqueue_purge(old_session)
+    return redirect("sample_app:home")
+
+
+def _enqueue_purge(session: AgentSession) -> None:
+    # A retired session whose purge is lost is still purged by
+    # sweep_agent_sessions.
+    if isinstance(purge_agent_session.get_backend(), ImmediateBackend):
+        # The immediate backend would run the whole purge inside this request.
+        purge_after_commit(session.pk)
+        return
+    try:
+        purge_agent_session.enqueue(str(session.pk))
+    except Exception:
+        logger.exception("Could not enqueue purge for agent session %s", session.pk)
+
+
+@login_required
+@require_GET
+@conditional_poll(session_items_etag)
+def conversation_items(request: HttpRequest, session_key: str) -> HttpResponse:
+    session = get_object_or_404(
+        AgentSession,
         owner=request.user,
-        session_key=new_session_key,
+        session_key=session_key,
     )
-    if created:
-        agent_session_created.send(sender=AgentSession, session=session)
-    return redirect("sample_app:home")
+    try:
+        after = _int_param(request, "after")
+        before = _int_param(request, "before")
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    if after is not None and before is not None:
+        return JsonResponse({"error": "use either after or before"}, status=400)
+
+    if before is not None:
+        # "Load earlier" pages replace their sentinel with older items and,
+        # while more history remains, a new sentinel.
+        items, earlier_before = conversation_page(session, before=before)
+        return render(
+            request,
+            "agentic_django/partials/conversation.html#page",
+            {"session": session, "items": items, "earlier_before": earlier_before},
+        )
+
+    items = AgentSessionItem.objects.filter(
+        session=session,
+        sequence__gt=after or 0,
+    ).order_by("sequence")
+    return render(
+        request,
+        "agentic_django/partials/conversation.html#items",
+        {"session": session, "items": items},
+    )
+
+
+@login_required
+@require_GET
+def session_export(request: HttpRequest) -> HttpResponse:
+    """Stream the caller's session items as NDJSON, gzipped when accepted.
+
+    Staff may export another user's history with ``owner=<username>``.
+    """
+
+    owner: Any = request.user
+    owner_name = request.GET.get("owner")
+    if owner_name and owner_name != request.user.get_username():
+        if not request.user.is_staff:
+            return JsonResponse({"error": "owner is restricted to staff"}, status=403)
+        user_model = get_user_model()
+        owner = get_object_or_404(user_model, **{user_model.USERNAME_FIELD: owner_name})
+    try:
+        since = _bound_param(request, "since")
+        until = _bound_param(request, "until")
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    items = export_items(
+        owner=owner,
+        session_keys=request.GET.getlist("session"),
+        since=since,
+        until=until,
+    )
+    chunks = ndjson_chunks(items)
+    response = StreamingHttpResponse(content_type="application/x-ndjson")
+    patch_vary_headers(response, ["Accept-Encoding"])
+    if _ACCEPTS_GZIP.search(request.headers.get("Accept-Encoding", "")):
+        chunks = compress_sequence(chunks)
+        response["Content-Encoding"] = "gzip"
+    response.streaming_content = chunks
+    response["Content-Disposition"] = 'attachment; filename="session-items.ndjson"'
+    return response
+
+
+def _bound_param(request: HttpRequest, name: str) -> datetime | None:
+    value = request.GET.get(name)
+    return parse_bound(value, name) if value else None
+
+
+def _int_param(request: HttpRequest, name: str) -> int | None:
+    value = request.GET.get(name)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+
+
+@login_required
+@require_GET
+async def run_stream(request: HttpRequest, run_id: uuid.UUID) -> StreamingHttpResponse:
+    user = await request.auser()
+    run = await AgentRun.objects.filter(id=run_id, owner=user).afirst()
+    if run is None:
+        raise Http404("Run not found")
+    response = StreamingHttpResponse(
+        run_event_stream(
+            run,
+            poll_interval=settings.SAMPLE_APP_RUN_STREAM_POLL_INTERVAL,
+            timeout=settings.SAMPLE_APP_RUN_STREAM_TIMEOUT,
+            max_poll_interval=settings.SAMPLE_APP_RUN_STREAM_MAX_POLL_INTERVAL,
+        ),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@require_GET
+def metrics(request: HttpRequest) -> HttpResponse:
+    token = getattr(settings, "SAMPLE_APP_METRICS_TOKEN", "")
+    if token:
+        supplied = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+            return HttpResponse("Unauthorized", status=401, content_type="text/plain")
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
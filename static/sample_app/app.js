@@ -7,13 +7,152 @@
       form.dataset.lastRequest = textarea.value.trim();
     });
 
+    // Admission control answers 429 with a notice retargeted to #run-notice;
+    // swap it in and keep the prompt so it can be sent again.
+    form.addEventListener("htmx:beforeSwap", (event) => {
+      if (event.detail.xhr.status === 429) {
+        event.detail.shouldSwap = true;
+        event.detail.isError = false;
+      }
+    });
+
     form.addEventListener("htmx:afterRequest", (event) => {
-      if (event.detail && event.detail.failed) {
+      if (!event.detail || event.detail.failed || event.detail.xhr.status === 429) {
         return;
       }
       textarea.value = "";
       form.dataset.lastRequest = "";
+      const notice = document.getElementById("run-notice");
+      if (notice) {
+        notice.replaceChildren();
+      }
+    });
+  }
+
+  const conversation = document.getElementById("conversation-panel");
+
+  if (conversation) {
+    // Refreshes only ask for items newer than the last rendered sequence and
+    // append them, so each run-update costs the new items rather than the
+    // whole history.
+    const lastSequence = () => {
+      const items = conversation.querySelectorAll("[data-sequence]");
+      const last = items.length ? items[items.length - 1] : null;
+      return last ? last.dataset.sequence : "0";
+    };
+
+    conversation.addEventListener("htmx:configRequest", (event) => {
+      if (event.detail.elt !== conversation) {
+        return;
+      }
+      event.detail.parameters.after = lastSequence();
+    });
+
+    // Earlier pages are inserted above what the reader is looking at; keep
+    // the viewport anchored so the next "load earlier" sentinel ends up
+    // above the fold instead of immediately triggering another page.
+    let heightBeforeEarlierPage = null;
+
+    conversation.addEventListener("htmx:beforeSwap", (event) => {
+      const source = event.detail.requestConfig && event.detail.requestConfig.elt;
+      if (source && source.closest("[data-earlier]")) {
+        heightBeforeEarlierPage = document.documentElement.scrollHeight;
+      }
+    });
+
+    conversation.addEventListener("htmx:afterSwap", () => {
+      if (heightBeforeEarlierPage !== null) {
+        window.scrollBy(0, document.documentElement.scrollHeight - heightBeforeEarlierPage);
+        heightBeforeEarlierPage = null;
+      }
+      if (!conversation.querySelector("[data-sequence]")) {
+        return;
+      }
+      conversation
+        .querySelectorAll(".agent-conversation__empty")
+        .forEach((placeholder) => placeholder.remove());
     });
   }
 
+  // Running fragments carry a data-run-stream URL. The stream tells the page
+  // when to re-fetch the fragment, when new conversation items exist, and
+  // forwards text deltas as they arrive. While it is open the fragment is
+  // marked data-stream-open, which pauses its fallback "every 2s" poll; the
+  // poll resumes whenever the stream errors or closes.
+  const runStreams = new Map();
+
+  const markStreamOpen = (container, open) => {
+    if (!container) {
+      return;
+    }
+    if (open) {
+      container.dataset.streamOpen = "true";
+    } else {
+      delete container.dataset.streamOpen;
+    }
+  };
+
+  const connectRunStreams = (root) => {
+    if (!window.EventSource || !window.htmx || !root.querySelectorAll) {
+      return;
+    }
+    const containers = Array.from(root.querySelectorAll("[data-run-stream]"));
+    if (root.matches && root.matches("[data-run-stream]")) {
+      containers.push(root);
+    }
+    containers.forEach((container) => {
+      const url = container.dataset.runStream;
+      const existing = runStreams.get(url);
+      if (existing) {
+        // A swapped-in fragment for a run whose stream is already open.
+        markStreamOpen(container, existing.readyState === EventSource.OPEN);
+        return;
+      }
+      const currentContainer = () => document.getElementById(container.id);
+      const source = new EventSource(url);
+      runStreams.set(url, source);
+
+      source.addEventListener("open", () => {
+        markStreamOpen(currentContainer(), true);
+      });
+
+      source.addEventListener("error", () => {
+        markStreamOpen(currentContainer(), false);
+        if (source.readyState === EventSource.CLOSED) {
+          runStreams.delete(url);
+        }
+      });
+
+      source.addEventListener("status", (event) => {
+        const { status } = JSON.parse(event.data);
+        const current = currentContainer();
+        if (current && current.dataset.status !== status) {
+          htmx.trigger(current, "run-status");
+        }
+      });
+
+      source.addEventListener("items", () => {
+        htmx.trigger(document.body, "run-update");
+      });
+
+      source.addEventListener("delta", (event) => {
+        const current = currentContainer();
+        const preview = current ? current.querySelector("[data-run-preview]") : null;
+        if (preview) {
+          preview.textContent += JSON.parse(event.data).delta;
+        }
+      });
+
+      source.addEventListener("end", () => {
+        source.close();
+        runStreams.delete(url);
+        markStreamOpen(currentContainer(), false);
+      });
+    });
+  };
+
+  document.addEventListener("htmx:load", (event) => {
+    connectRunStreams(event.detail.elt);
+  });
+  connectRunStreams(document);
 })();